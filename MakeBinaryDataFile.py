@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+# --- Import libraries ---
+
+import os
+import numpy as np
+
+from MakeDataFile import ReadHeader
+
+"""
+
+Binary cache for the per-plotfile text files written by MakeDataFile.
+
+For each field, the text files
+
+  DataDirectory/<plotfile>/<Field>.dat
+
+of all plotfiles in a run are packed into
+
+  DataDirectory/<Field>.npy     : all snapshots, flattened and concatenated
+  DataDirectory/<Field>_hdr.npz : per-snapshot offsets into <Field>.npy,
+                                  shapes, min and max values, and units
+                                  (what ReadHeader returns per file), and
+                                  the mtime and size of each text file
+
+so that a run is read with two file opens and no text parsing. The data
+file is memory-mapped, so every snapshot is a zero-copy view.
+
+"""
+
+def GetBinaryFileNames( DataDirectory, Field ):
+
+    if not DataDirectory[-1] == '/': DataDirectory += '/'
+
+    DataFileName   = DataDirectory + '{:}.npy'.format( Field )
+    HeaderFileName = DataDirectory + '{:}_hdr.npz'.format( Field )
+
+    return DataFileName, HeaderFileName
+
+# End of GetBinaryFileNames
+
+def GetTextFileStats( DataDirectory, PlotFiles, Field ):
+
+    # ( nSS, 2 ) array of [ mtime (ns), size ] of the text file of Field of
+    # each plotfile, -1 where the file does not exist
+
+    if not DataDirectory[-1] == '/': DataDirectory += '/'
+
+    Stats = np.full( (len( PlotFiles ),2), -1, np.int64 )
+
+    for iSS in range( len( PlotFiles ) ):
+
+        DataFile = DataDirectory + PlotFiles[iSS] + '/{:}.dat'.format( Field )
+
+        if not os.path.isfile( DataFile ): continue
+
+        Stat = os.stat( DataFile )
+
+        Stats[iSS] = [ Stat.st_mtime_ns, Stat.st_size ]
+
+    return Stats
+
+# End of GetTextFileStats
+
+def ReadTextDataFile( DataFile ):
+
+    # Returns the data, shape and units of a single MakeDataFile text file.
+    # Files without a header (e.g., Time.dat) take the shape of their data.
+
+    with open( DataFile ) as f:
+        HasHeader = f.readline().startswith( '#' )
+
+    Data = np.loadtxt( DataFile )
+
+    if HasHeader:
+
+        DataShape, DataUnits, MinVal, MaxVal = ReadHeader( DataFile )
+
+        DataShape = np.atleast_1d( np.int64( DataShape ) )
+        Data      = Data.reshape( DataShape )
+
+    else:
+
+        DataShape = np.array( Data.shape, np.int64 )
+        DataUnits = ''
+
+    return Data, DataShape, str( DataUnits )
+
+# End of ReadTextDataFile
+
+def MakeBinaryDataFile( Field, DataDirectory, PlotFileArray, \
+                        Overwrite = False, Verbose = False ):
+
+    # Pack DataDirectory/<plotfile>/<Field>.dat for every plotfile in
+    # PlotFileArray into the binary cache. Nothing is done if the cache
+    # already holds exactly these plotfiles and none of their text files
+    # changed since it was packed (text files removed since are not
+    # needed), unless Overwrite is True.
+
+    if not DataDirectory[-1] == '/': DataDirectory += '/'
+
+    DataFileName, HeaderFileName = GetBinaryFileNames( DataDirectory, Field )
+
+    PlotFiles = np.array( [ str( PlotFile ) for PlotFile in PlotFileArray ] )
+
+    # Taken before the files are read, so that a file rewritten while it
+    # is packed is packed again next time
+
+    FileStats = GetTextFileStats( DataDirectory, PlotFiles, Field )
+
+    if not Overwrite \
+         and os.path.isfile( DataFileName ) \
+         and os.path.isfile( HeaderFileName ):
+
+        with np.load( HeaderFileName ) as Header:
+
+            # Caches packed before the stats were stored are repacked
+
+            if      np.array_equal( Header['PlotFiles'], PlotFiles ) \
+                and 'FileStats' in Header.files:
+
+                Packed = Header['FileStats']
+
+                if not np.any( ( FileStats >= 0 ) & ( FileStats != Packed ) ):
+                    return
+
+                if Verbose:
+                    print( '    {:} changed since it was packed'.format \
+                           ( Field ) )
+
+    nSS = PlotFiles.shape[0]
+
+    Data    = np.empty( nSS, object )
+    Offsets = np.zeros( nSS + 1, np.int64 )
+    Ranks   = np.empty( nSS, np.int64 )
+    Shapes  = np.empty( nSS, object )
+    MinVals = np.empty( nSS, np.float64 )
+    MaxVals = np.empty( nSS, np.float64 )
+
+    for iSS in range( nSS ):
+
+        if Verbose:
+            print( '\r    Packing {:}: {:}/{:}'.format( Field, iSS+1, nSS ), \
+                   end = '\r' )
+
+        DataFile = DataDirectory + PlotFiles[iSS] + '/{:}.dat'.format( Field )
+
+        Data[iSS], Shapes[iSS], DataUnits = ReadTextDataFile( DataFile )
+
+        Ranks  [iSS]   = Shapes[iSS].shape[0]
+        Offsets[iSS+1] = Offsets[iSS] + Data[iSS].size
+        MinVals[iSS]   = Data[iSS].min()
+        MaxVals[iSS]   = Data[iSS].max()
+
+    # Pad shapes to a common rank so they fit in one array
+    ShapeArray = np.ones( (nSS,max( 1, Ranks.max() )), np.int64 )
+    for iSS in range( nSS ):
+        ShapeArray[iSS,:Ranks[iSS]] = Shapes[iSS]
+
+    np.save( DataFileName, \
+             np.concatenate( [ np.ravel( d ) for d in Data ] ) )
+
+    np.savez( HeaderFileName, \
+              PlotFiles = PlotFiles, \
+              Offsets   = Offsets, \
+              Ranks     = Ranks, \
+              Shapes    = ShapeArray, \
+              MinVal    = MinVals, \
+              MaxVal    = MaxVals, \
+              DataUnits = np.array( DataUnits ), \
+              FileStats = FileStats )
+
+    if Verbose: print( '\n    Wrote {:}'.format( DataFileName ) )
+
+    return
+
+# End of MakeBinaryDataFile
+
+def ReadBinaryHeader( DataDirectory, Field ):
+
+    # Returns the per-snapshot DataShape, DataUnits, MinVal and MaxVal,
+    # as ReadHeader does for a single text file
+
+    DataFileName, HeaderFileName = GetBinaryFileNames( DataDirectory, Field )
+
+    with np.load( HeaderFileName ) as Header:
+
+        DataShape = [ Header['Shapes'][iSS,:Header['Ranks'][iSS]] \
+                      for iSS in range( Header['Ranks'].shape[0] ) ]
+        DataUnits = str( Header['DataUnits'] )
+        MinVal    = Header['MinVal']
+        MaxVal    = Header['MaxVal']
+
+    return DataShape, DataUnits, MinVal, MaxVal
+
+# End of ReadBinaryHeader
+
+def GetWindowSlice( X1, X1Window ):
+
+    # Slice of the cells with increasing centers X1 that cover the radial
+    # window X1Window = [ x1L, x1H ]. Only the centers are stored, so a cell
+    # is taken to reach the centers of its neighbors; the slice may hold one
+    # cell more than needed at each end.
+
+    iLo = np.searchsorted( X1, X1Window[0], side = 'right' ) - 1
+    iHi = np.searchsorted( X1, X1Window[1], side = 'left'  ) + 1
+
+    return slice( max( 0, iLo ), min( X1.shape[0], iHi ) )
+
+# End of GetWindowSlice
+
+def ReadBinaryDataFile( DataDirectory, Field, X1Window = None ):
+
+    # Returns an object array whose iSS-th entry is the data of snapshot
+    # iSS, a zero-copy view into the memory-mapped cache. With X1Window,
+    # each entry on the grid of X1 is flattened and restricted to the cells
+    # covering the window (see GetWindowSlice), so only their pages are
+    # ever read; other entries (e.g., Time) are returned whole. The X1
+    # cache must then be packed from the same plotfiles as Field.
+
+    DataFileName, HeaderFileName = GetBinaryFileNames( DataDirectory, Field )
+
+    if X1Window is not None:
+
+        X1FileName, X1HeaderFileName \
+          = GetBinaryFileNames( DataDirectory, 'X1' )
+
+        if not os.path.isfile( X1HeaderFileName ):
+
+            print( 'ReadBinaryDataFile: X1Window needs {:}'.format \
+                   ( X1FileName ) )
+            exit()
+
+        with np.load( HeaderFileName ) as Header, \
+             np.load( X1HeaderFileName ) as X1Header:
+
+            if not np.array_equal( Header  ['PlotFiles'], \
+                                   X1Header['PlotFiles'] ):
+
+                print( 'ReadBinaryDataFile: {:} and X1 were packed from' \
+                       .format( Field ) \
+                       + ' different plotfiles' )
+                exit()
+
+        X1 = ReadBinaryDataFile( DataDirectory, 'X1' )
+
+    Flat = np.load( DataFileName, mmap_mode = 'r' )
+
+    with np.load( HeaderFileName ) as Header:
+
+        Offsets = Header['Offsets']
+        Ranks   = Header['Ranks']
+        Shapes  = Header['Shapes']
+
+    nSS = Ranks.shape[0]
+
+    Data = np.empty( nSS, object )
+
+    for iSS in range( nSS ):
+
+        Data[iSS] \
+          = Flat[Offsets[iSS]:Offsets[iSS+1]] \
+              .reshape( Shapes[iSS,:Ranks[iSS]] )
+
+        if X1Window is not None and Data[iSS].size == X1[iSS].size:
+            Data[iSS] \
+              = Data[iSS].ravel() \
+                  [GetWindowSlice( X1[iSS].ravel(), X1Window )]
+
+    return Data
+
+# End of ReadBinaryDataFile
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+# --- Import libraries ---
+
+import numpy as np
+
+"""
+
+Comparison of two runs of the same problem (e.g., native thornado vs.
+thornado-AMReX) given as time series Data[iSS,iX] on a common spatial grid.
+The runs need not write snapshots at the same times: one run is
+interpolated (linearly in time) to the snapshot times of the other.
+
+"""
+
+def GetInterpolationWeights( Time, TimeTarget ):
+
+    # Indices i and weights w such that ( 1 - w ) * Data[i] + w * Data[i+1]
+    # is the linear interpolation to the times TimeTarget of Data given at
+    # the increasing times Time ( nSS >= 2 ). Targets outside
+    # [ Time[0], Time[-1] ] are extrapolated from the first or last
+    # interval.
+
+    nSS = Time.shape[0]
+
+    # Index of the interval [ Time[i], Time[i+1] ] holding each target
+    i = np.searchsorted( Time, TimeTarget, side = 'right' ) - 1
+    i = np.clip( i, 0, nSS - 2 )
+
+    # Weight of Data[i+1]; zero for repeated times
+    dt = Time[i+1] - Time[i]
+    w  = np.zeros( TimeTarget.shape, np.float64 )
+    np.divide( TimeTarget - Time[i], dt, out = w, where = dt > 0.0 )
+
+    return i, w
+
+# End of GetInterpolationWeights
+
+def InterpolateInTime( Time, Data, TimeTarget ):
+
+    # Linearly interpolate the rows of Data, given at the times Time, to the
+    # times TimeTarget. Rows at times outside [ Time.min(), Time.max() ] are
+    # set to NaN.
+    #
+    # Time       : ( nSS, )
+    # Data       : ( nSS, ... )
+    # TimeTarget : ( nSS_Target, )
+    # Returns      ( nSS_Target, ... )
+
+    Time       = np.asarray( Time, np.float64 )
+    TimeTarget = np.asarray( TimeTarget, np.float64 )
+
+    if np.any( np.diff( Time ) < 0.0 ):
+        Sort = np.argsort( Time, kind = 'stable' )
+        Time = Time[Sort]
+        Data = Data[Sort]
+
+    nSS = Time.shape[0]
+
+    if nSS == 1:
+
+        Interpolated = np.repeat( Data[:1], TimeTarget.shape[0], axis = 0 ) \
+                         .astype( np.float64 )
+        Interpolated[TimeTarget != Time[0]] = np.nan
+
+        return Interpolated
+
+    i, w = GetInterpolationWeights( Time, TimeTarget )
+
+    Shape = ( -1, ) + ( 1, ) * ( Data.ndim - 1 )
+    w     = w.reshape( Shape )
+
+    Interpolated = ( 1.0 - w ) * Data[i] + w * Data[i+1]
+
+    Outside = ( TimeTarget < Time[0] ) | ( TimeTarget > Time[-1] )
+    Interpolated[Outside] = np.nan
+
+    return Interpolated
+
+# End of InterpolateInTime
+
+def ComputeNorms( Difference, Weights = None ):
+
+    # Per-snapshot L1, L2 and LInf norms of Difference ( nSS, nX ), each
+    # normalized by the sum of Weights ( nX, ) (default: uniform), so that
+    # L1 and L2 are means and do not grow with resolution
+
+    Difference = np.abs( Difference )
+
+    if Weights is None: Weights = np.ones( Difference.shape[1], np.float64 )
+
+    Weights = Weights / Weights.sum()
+
+    Norms = {}
+
+    Norms['L1'  ] = Difference @ Weights
+    Norms['L2'  ] = np.sqrt( Difference**2 @ Weights )
+    Norms['LInf'] = Difference.max( axis = 1 )
+
+    return Norms
+
+# End of ComputeNorms
+
+def CompareRuns( TimeA, DataA, TimeB, DataB, Weights = None, \
+                 Floor = 1.0e-17 ):
+
+    # Compare run B to run A at the snapshot times of A. Run B is
+    # interpolated in time; snapshots of A outside the time span of B are
+    # dropped.
+    #
+    # TimeA ( nSS_A, ), DataA ( nSS_A, nX ), TimeB ( nSS_B, ),
+    # DataB ( nSS_B, nX )
+    #
+    # Returns a dictionary with
+    #   'Index'    : indices into TimeA of the compared snapshots
+    #   'Time'     : their times
+    #   'DataA'    : DataA at those times
+    #   'DataB'    : DataB interpolated to those times
+    #   'Absolute' : |A-B|
+    #   'Relative' : max( |A-B| / ( |A+B| / 2 ), Floor ), Floor where A = B
+    #   'Norms'    : { 'Absolute' | 'Relative' :
+    #                  { 'L1' | 'L2' | 'LInf' : ( nSS, ) } }
+
+    TimeA = np.asarray( TimeA, np.float64 )
+
+    DataBA = InterpolateInTime( TimeB, DataB, TimeA )
+
+    Index = np.where( ~np.all( np.isnan( DataBA ), axis = 1 ) )[0]
+
+    DataA  = DataA [Index]
+    DataBA = DataBA[Index]
+
+    Comparison = {}
+
+    Comparison['Index'] = Index
+    Comparison['Time' ] = TimeA[Index]
+    Comparison['DataA'] = DataA
+    Comparison['DataB'] = DataBA
+
+    Absolute = np.abs( DataA - DataBA )
+
+    Relative = np.zeros( Absolute.shape, np.float64 )
+    with np.errstate( divide = 'ignore' ):
+        np.divide( Absolute, 0.5 * np.abs( DataA + DataBA ), \
+                   out = Relative, where = Absolute > 0.0 )
+    np.maximum( Relative, Floor, out = Relative )
+
+    Comparison['Absolute'] = Absolute
+    Comparison['Relative'] = Relative
+
+    Comparison['Norms'] \
+      = { 'Absolute' : ComputeNorms( Absolute, Weights ), \
+          'Relative' : ComputeNorms( Relative, Weights ) }
+
+    return Comparison
+
+# End of CompareRuns
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+# --- Import libraries ---
+
+import numpy as np
+
+"""
+
+Streaming reduction of a time series Data[iSS,...] to the extrema used
+to choose plot limits: the global minimum and maximum, the minimum and
+maximum at each point (e.g., each radius) over all snapshots, and
+percentiles of all values, which give limits robust to a few outliers
+(e.g., Percentiles = [ 0.1, 99.9 ]).
+
+The data are passed a chunk of snapshots at a time,
+
+  Extrema = ExtremaReduction( Percentiles = [ 0.1, 99.9 ] )
+  for Chunk in Chunks:
+      Extrema.Update( Chunk )
+  yMin, yMax = Extrema.GetLimits( [ 0.1, 99.9 ] )
+
+so only one chunk is ever held in memory. Percentiles are taken from a
+histogram with BinsPerDecadeExtrema bins per decade of |value| (and one
+bin for zero), i.e., to a relative accuracy of about 0.1%.
+
+"""
+
+BinsPerDecadeExtrema = 1000
+
+# Decades of |value| covered by the histogram; values outside are counted
+# in the first or last bin
+DecadesExtrema = [ -330, 310 ]
+
+class ExtremaReduction:
+
+    # If Percentiles is None, only the extrema are computed (no histogram)
+
+    def __init__( self, Percentiles = None ):
+
+        self.Min  = +np.inf
+        self.Max  = -np.inf
+        self.MinX = None
+        self.MaxX = None
+
+        self.nValues = 0
+
+        self.PerPoint = True
+
+        self.Counts = None
+
+        if Percentiles is not None:
+
+            self.nK = ( DecadesExtrema[1] - DecadesExtrema[0] ) \
+                        * BinsPerDecadeExtrema + 1
+
+            # Bins ordered by value: negative, zero (at nK), positive
+            self.Counts = np.zeros( 2 * self.nK + 1, np.int64 )
+
+        return
+
+    def Update( self, Data, PerPoint = True ):
+
+        # Add the snapshots Data ( nSS_Chunk, ... ). Point-wise extrema are
+        # kept while every chunk has the same shape and PerPoint is True.
+
+        Data = np.asarray( Data )
+
+        if Data.size == 0: return
+
+        self.Min = min( self.Min, float( np.nanmin( Data ) ) )
+        self.Max = max( self.Max, float( np.nanmax( Data ) ) )
+
+        if PerPoint and self.PerPoint and Data.ndim > 1:
+
+            MinX = np.nanmin( Data, axis = 0 ).astype( np.float64 )
+            MaxX = np.nanmax( Data, axis = 0 ).astype( np.float64 )
+
+            if self.MinX is None:
+
+                self.MinX = MinX
+                self.MaxX = MaxX
+
+            elif self.MinX.shape == MinX.shape:
+
+                np.minimum( self.MinX, MinX, out = self.MinX )
+                np.maximum( self.MaxX, MaxX, out = self.MaxX )
+
+            else:
+
+                self.PerPoint = False
+
+        else:
+
+            self.PerPoint = False
+
+        if not self.PerPoint: self.MinX = self.MaxX = None
+
+        if self.Counts is not None:
+
+            Values = Data[np.isfinite( Data )].astype( np.float64 )
+
+            self.nValues += Values.size
+
+            Magnitude = np.abs( Values )
+            NonZero   = Magnitude > 0.0
+
+            k = np.zeros( Values.shape, np.int64 )
+            k[NonZero] \
+              = np.clip( np.floor( np.log10( Magnitude[NonZero] ) \
+                                     * BinsPerDecadeExtrema ) \
+                           - DecadesExtrema[0] * BinsPerDecadeExtrema, \
+                         0, self.nK - 1 )
+
+            iBin = np.full( Values.shape, self.nK, np.int64 )
+            iBin[Values > 0.0] = self.nK + 1 + k[Values > 0.0]
+            iBin[Values < 0.0] = self.nK - 1 - k[Values < 0.0]
+
+            self.Counts += np.bincount( iBin, minlength = self.Counts.size )
+
+        return
+
+    def GetPercentile( self, q ):
+
+        # The q-th percentile ( 0 <= q <= 100 ) of all values added
+
+        if self.Counts is None:
+
+            print( 'ExtremaReduction: create with Percentiles for' \
+                   + ' GetPercentile' )
+            exit()
+
+        if self.nValues == 0: return np.nan
+
+        # Interpolate linearly between the values of neighboring ranks,
+        # as np.percentile does
+
+        Rank = q / 100.0 * ( self.nValues - 1 )
+
+        iLo = int( np.floor( Rank ) )
+        iHi = min( iLo + 1, self.nValues - 1 )
+
+        w = Rank - iLo
+
+        return ( 1.0 - w ) * self.GetValueOfRank( iLo ) \
+                 + w * self.GetValueOfRank( iHi )
+
+    def GetValueOfRank( self, iRank ):
+
+        # The iRank-th smallest value added, to the resolution of the
+        # histogram; the smallest and largest are exact
+
+        if iRank == 0               : return self.Min
+        if iRank == self.nValues - 1: return self.Max
+
+        iBin = int( np.searchsorted( np.cumsum( self.Counts ), iRank, \
+                                     side = 'right' ) )
+
+        # Geometric center of the bin
+
+        if iBin == self.nK: return 0.0
+
+        k = abs( iBin - self.nK ) - 1
+
+        Value = 10.0**( ( k + 0.5 ) / BinsPerDecadeExtrema \
+                          + DecadesExtrema[0] )
+
+        if iBin < self.nK: Value = -Value
+
+        return min( max( Value, self.Min ), self.Max )
+
+    def GetLimits( self, Percentiles = None ):
+
+        # [ Min, Max ], or the percentiles [ qLo, qHi ] = Percentiles
+
+        if Percentiles is None: return [ self.Min, self.Max ]
+
+        return [ self.GetPercentile( Percentiles[0] ), \
+                 self.GetPercentile( Percentiles[1] ) ]
+
+# End of ExtremaReduction
@@ -8,8 +8,19 @@ warnings.simplefilter( action = 'ignore' , category = FutureWarning )
 import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm, SymLogNorm
 
+import os
+import mmap
+import glob
+import json
+import hashlib
+import tempfile
 import numpy as np
 import h5py as h5
+from collections.abc import Mapping
+import multiprocessing as mp
+
+from UtilitiesModuleTiming import Timer, AddBytes
+from UtilitiesModuleExtrema import ExtremaReduction
 
 # --- Get rid of "Too many open files" error ---
 
@@ -40,351 +51,2028 @@ def GetNorm( UseLogScale, Data, vmin = +1.0e100, vmax = -1.0e100 ):
 
 # End of GetNorm
 
-def ReadFieldsHDF( PathToData, Snapshots, CoordinateSystem, \
-                   UsePhysicalUnits, UseGeometryFields = True ):
-
-    FF_root = PathToData + '_FluidFields_'
-    GF_root = PathToData + '_GeometryFields_'
-
-    nFiles = len( Snapshots )
-
-    TimeSteps              = np.empty( nFiles, object )
-    DataFileNames_Fluid    = np.empty( nFiles, object )
-    DataFileNames_Geometry = np.empty( nFiles, object )
-
-    # Arrays to hold data
-    Data_FF = np.empty( nFiles, object )
-    Data_GF = np.empty( nFiles, object )
-
-    for i in range( 1 ):
-
-        TimeSteps[i] = str( Snapshots[i] ).zfill( 6 )
-
-        DataFileNames_Fluid[i] = FF_root + str( TimeSteps[i] ) + '.h5'
-        Data_FF[i]             = h5.File( DataFileNames_Fluid[i], 'r' )
-
-        if( UseGeometryFields ):
-            DataFileNames_Geometry[i] \
-              = GF_root + str( TimeSteps[i] ) + '.h5'
-            Data_GF[i] \
-              = h5.File( DataFileNames_Geometry[i], 'r' )
-
-    # Get the spatial grid
-    X    = Data_FF[0][ 'Spatial Grid' ]
-    X1   = np.array( X[ 'X1' ] )
-    X2   = np.array( X[ 'X2' ] )
-    X3   = np.array( X[ 'X3' ] )
-    X1_C = np.array( X[ 'X1_C' ] )
-    X2_C = np.array( X[ 'X2_C' ] )
-    X3_C = np.array( X[ 'X3_C' ] )
-
-    T  = np.empty( nFiles, float  )
-    FF = np.empty( nFiles, object )
-    PF = np.empty( nFiles, object )
-    CF = np.empty( nFiles, object )
-    AF = np.empty( nFiles, object )
-    DF = np.empty( nFiles, object )
-    GF = np.empty( nFiles, object )
-
-    # Conserved fields
-
-    CF_D  = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    CF_S1 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    CF_S2 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    CF_S3 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    CF_E  = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    CF_Ne = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-
-    # Primitive fields
-
-    PF_D  = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    PF_V1 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    PF_V2 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    PF_V3 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    PF_E  = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    PF_Ne = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-
-    # Auxiliary fields
-
-    AF_P  = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    AF_Cs = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    AF_Gm = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    AF_Ye = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-
-    # Diagnostic fields
-
-    DF_TCI   \
-      = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    DF_Sh_X1 \
-      = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    DF_Sh_X2 \
-      = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    DF_Sh_X3 \
-      = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-
-    # Geometry fields
-
-    GF_CF = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_al = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_NP = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_b1 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_b2 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_b3 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_g1 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_g2 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_g3 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_h1 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_h2 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_h3 = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-    GF_Sg = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-
-    # Derived fields
-
-    LorentzFactor \
-      = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-
-    SpecificEnthalpy \
-      = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-
-    PolytropicConstant \
-      = np.empty( (nFiles,X3.shape[0],X2.shape[0],X1.shape[0]), np.float64 )
-
-    # Set units
-
-    if UsePhysicalUnits:
-
-        TimeUnit               = 'ms'
-        MassDensityUnit        = 'g/cm**3'
-        EnergyDensityUnit      = 'erg/cm**3'
-        NumberDensityUnit      = '1/cm**3'
-        PressureUnit           = 'erg/cm**3'
-        PolytropicConstantUnit = 'erg/cm**3/(g/cm**3)**Gamma'
-
-        if CoordinateSystem == 'CARTESIAN':
-
-            X1Unit                = 'km'
-            X2Unit                = 'km'
-            X3Unit                = 'km'
-            MomentumDensityX1Unit = 'g/cm**2/s'
-            MomentumDensityX2Unit = 'g/cm**2/s'
-            MomentumDensityX3Unit = 'g/cm**2/s'
-            VelocityX1Unit        = 'km/s'
-            VelocityX2Unit        = 'km/s'
-            VelocityX3Unit        = 'km/s'
-            Gm11Unit              = ''
-            Gm22Unit              = ''
-            Gm33Unit              = ''
-            h1Unit                = ''
-            h2Unit                = ''
-            h3Unit                = ''
-            SqrtGmUnit            = ''
-
-        elif CoordinateSystem == 'CYLINDRICAL':
-
-            X1Unit                = 'km'
-            X2Unit                = 'km'
-            X3Unit                = 'rad'
-            MomentumDensityX1Unit = 'g/cm**2/s'
-            MomentumDensityX2Unit = 'g/cm**2/s'
-            MomentumDensityX3Unit = 'g/cm/s'
-            VelocityX1Unit        = 'km/s'
-            VelocityX2Unit        = 'km/s'
-            VelocityX3Unit        = 'rad/s'
-            Gm11Unit              = ''
-            Gm22Unit              = ''
-            Gm33Unit              = 'km**2'
-            h1Unit                = ''
-            h2Unit                = ''
-            h3Unit                = 'km'
-            SqrtGmUnit            = 'km'
-
-        elif CoordinateSystem == 'SPHERICAL':
-
-            X1Unit                = 'km'
-            X2Unit                = 'rad'
-            X3Unit                = 'rad'
-            MomentumDensityX1Unit = 'g/cm**2/s'
-            MomentumDensityX2Unit = 'g/cm/s'
-            MomentumDensityX3Unit = 'g/cm/s'
-            VelocityX1Unit        = 'km/s'
-            VelocityX2Unit        = 'rad/s'
-            VelocityX3Unit        = 'rad/s'
-            Gm11Unit              = ''
-            Gm22Unit              = 'km**2'
-            Gm33Unit              = 'km**2'
-            h1Unit                = ''
-            h2Unit                = 'km'
-            h3Unit                = 'km'
-            SqrtGmUnit            = 'km**2'
+# --- Fields stored in thornado's native HDF5 output ---
+#     Field : [ File, Group, Dataset, Unit ]
+#     ( File is 'FF' for _FluidFields_ and 'GF' for _GeometryFields_ )
+
+FieldsTableHDF = \
+{ \
+  'Time'      : [ 'FF', '', 'Time', 'TimeUnit' ], \
+  'CF_D'      : [ 'FF', 'Fluid Fields/Conserved', \
+                  'Conserved Baryon Density', 'MassDensityUnit' ], \
+  'CF_S1'     : [ 'FF', 'Fluid Fields/Conserved', \
+                  'Conserved Momentum Density (1)', 'MomentumDensityX1Unit' ], \
+  'CF_S2'     : [ 'FF', 'Fluid Fields/Conserved', \
+                  'Conserved Momentum Density (2)', 'MomentumDensityX2Unit' ], \
+  'CF_S3'     : [ 'FF', 'Fluid Fields/Conserved', \
+                  'Conserved Momentum Density (3)', 'MomentumDensityX3Unit' ], \
+  'CF_E'      : [ 'FF', 'Fluid Fields/Conserved', \
+                  'Conserved Energy Density', 'EnergyDensityUnit' ], \
+  'CF_Ne'     : [ 'FF', 'Fluid Fields/Conserved', \
+                  'Conserved Electron Density', 'NumberDensityUnit' ], \
+  'PF_D'      : [ 'FF', 'Fluid Fields/Primitive', \
+                  'Comoving Baryon Density', 'MassDensityUnit' ], \
+  'PF_V1'     : [ 'FF', 'Fluid Fields/Primitive', \
+                  'Three-Velocity (1)', 'VelocityX1Unit' ], \
+  'PF_V2'     : [ 'FF', 'Fluid Fields/Primitive', \
+                  'Three-Velocity (2)', 'VelocityX2Unit' ], \
+  'PF_V3'     : [ 'FF', 'Fluid Fields/Primitive', \
+                  'Three-Velocity (3)', 'VelocityX3Unit' ], \
+  'PF_E'      : [ 'FF', 'Fluid Fields/Primitive', \
+                  'Internal Energy Density', 'EnergyDensityUnit' ], \
+  'PF_Ne'     : [ 'FF', 'Fluid Fields/Primitive', \
+                  'Comoving Electron Density', 'NumberDensityUnit' ], \
+  'AF_P'      : [ 'FF', 'Fluid Fields/Auxiliary', \
+                  'Pressure', 'PressureUnit' ], \
+  'AF_Cs'     : [ 'FF', 'Fluid Fields/Auxiliary', \
+                  'Sound Speed', 'VelocityX1Unit' ], \
+  'AF_Gm'     : [ 'FF', 'Fluid Fields/Auxiliary', \
+                  'Ratio of Specific Heats (Gamma)', '' ], \
+  'AF_Ye'     : [ 'FF', 'Fluid Fields/Auxiliary', \
+                  'Electron Fraction', '' ], \
+  'DF_TCI'    : [ 'FF', 'Fluid Fields/Diagnostic', 'TCI'       , '' ], \
+  'DF_Sh_X1'  : [ 'FF', 'Fluid Fields/Diagnostic', 'Shock (X1)', '' ], \
+  'DF_Sh_X2'  : [ 'FF', 'Fluid Fields/Diagnostic', 'Shock (X2)', '' ], \
+  'DF_Sh_X3'  : [ 'FF', 'Fluid Fields/Diagnostic', 'Shock (X3)', '' ], \
+  'GF_Psi'    : [ 'GF', 'Geometry Fields', \
+                  'Conformal Factor', '' ], \
+  'GF_Alpha'  : [ 'GF', 'Geometry Fields', \
+                  'Lapse Function', '' ], \
+  'GF_Phi_N'  : [ 'GF', 'Geometry Fields', \
+                  'Newtonian Potential', '' ], \
+  'GF_Beta_1' : [ 'GF', 'Geometry Fields', \
+                  'Shift Vector (1)', 'VelocityX1Unit' ], \
+  'GF_Beta_2' : [ 'GF', 'Geometry Fields', \
+                  'Shift Vector (2)', 'VelocityX2Unit' ], \
+  'GF_Beta_3' : [ 'GF', 'Geometry Fields', \
+                  'Shift Vector (3)', 'VelocityX3Unit' ], \
+  'GF_Gm_11'  : [ 'GF', 'Geometry Fields', \
+                  'Spatial Metric Component (11)', 'Gm11Unit' ], \
+  'GF_Gm_22'  : [ 'GF', 'Geometry Fields', \
+                  'Spatial Metric Component (22)', 'Gm22Unit' ], \
+  'GF_Gm_33'  : [ 'GF', 'Geometry Fields', \
+                  'Spatial Metric Component (33)', 'Gm33Unit' ], \
+  'GF_h_1'    : [ 'GF', 'Geometry Fields', \
+                  'Spatial Scale Factor (1)', 'h1Unit' ], \
+  'GF_h_2'    : [ 'GF', 'Geometry Fields', \
+                  'Spatial Scale Factor (2)', 'h2Unit' ], \
+  'GF_h_3'    : [ 'GF', 'Geometry Fields', \
+                  'Spatial Scale Factor (3)', 'h3Unit' ], \
+  'GF_SqrtGm' : [ 'GF', 'Geometry Fields', \
+                  'Sqrt Spatial Metric Determinant', 'SqrtGmUnit' ] \
+}
+
+# --- Spatial grid, read once from the first fluid file ---
+#     Field : Unit
+
+GridFieldsHDF = \
+{ \
+  'X1'   : 'X1Unit', \
+  'X2'   : 'X2Unit', \
+  'X3'   : 'X3Unit', \
+  'X1_C' : 'X1Unit', \
+  'X2_C' : 'X2Unit', \
+  'X3_C' : 'X3Unit' \
+}
+
+# --- Fields derived from other fields, see RegisterDerivedFieldHDF ---
+#     Field : [ Dependencies, Unit, Function ]
+
+DerivedFieldsTableHDF = {}
+
+def GetUnitsHDF( CoordinateSystem, UsePhysicalUnits ):
+
+    Units = { '' : '' }
+
+    for Unit in [ 'TimeUnit', 'MassDensityUnit', 'EnergyDensityUnit', \
+                  'NumberDensityUnit', 'PressureUnit', \
+                  'PolytropicConstantUnit', \
+                  'X1Unit', 'X2Unit', 'X3Unit', \
+                  'MomentumDensityX1Unit', 'MomentumDensityX2Unit', \
+                  'MomentumDensityX3Unit', \
+                  'VelocityX1Unit', 'VelocityX2Unit', 'VelocityX3Unit', \
+                  'Gm11Unit', 'Gm22Unit', 'Gm33Unit', \
+                  'h1Unit', 'h2Unit', 'h3Unit', 'SqrtGmUnit' ]:
+        Units[Unit] = ''
+
+    if not UsePhysicalUnits: return Units
+
+    Units['TimeUnit'              ] = 'ms'
+    Units['MassDensityUnit'       ] = 'g/cm**3'
+    Units['EnergyDensityUnit'     ] = 'erg/cm**3'
+    Units['NumberDensityUnit'     ] = '1/cm**3'
+    Units['PressureUnit'          ] = 'erg/cm**3'
+    Units['PolytropicConstantUnit'] = 'erg/cm**3/(g/cm**3)**Gamma'
+
+    if CoordinateSystem == 'CARTESIAN':
+
+        Units['X1Unit'               ] = 'km'
+        Units['X2Unit'               ] = 'km'
+        Units['X3Unit'               ] = 'km'
+        Units['MomentumDensityX1Unit'] = 'g/cm**2/s'
+        Units['MomentumDensityX2Unit'] = 'g/cm**2/s'
+        Units['MomentumDensityX3Unit'] = 'g/cm**2/s'
+        Units['VelocityX1Unit'       ] = 'km/s'
+        Units['VelocityX2Unit'       ] = 'km/s'
+        Units['VelocityX3Unit'       ] = 'km/s'
+
+    elif CoordinateSystem == 'CYLINDRICAL':
+
+        Units['X1Unit'               ] = 'km'
+        Units['X2Unit'               ] = 'km'
+        Units['X3Unit'               ] = 'rad'
+        Units['MomentumDensityX1Unit'] = 'g/cm**2/s'
+        Units['MomentumDensityX2Unit'] = 'g/cm**2/s'
+        Units['MomentumDensityX3Unit'] = 'g/cm/s'
+        Units['VelocityX1Unit'       ] = 'km/s'
+        Units['VelocityX2Unit'       ] = 'km/s'
+        Units['VelocityX3Unit'       ] = 'rad/s'
+        Units['Gm33Unit'             ] = 'km**2'
+        Units['h3Unit'               ] = 'km'
+        Units['SqrtGmUnit'           ] = 'km'
+
+    elif CoordinateSystem == 'SPHERICAL':
+
+        Units['X1Unit'               ] = 'km'
+        Units['X2Unit'               ] = 'rad'
+        Units['X3Unit'               ] = 'rad'
+        Units['MomentumDensityX1Unit'] = 'g/cm**2/s'
+        Units['MomentumDensityX2Unit'] = 'g/cm/s'
+        Units['MomentumDensityX3Unit'] = 'g/cm/s'
+        Units['VelocityX1Unit'       ] = 'km/s'
+        Units['VelocityX2Unit'       ] = 'rad/s'
+        Units['VelocityX3Unit'       ] = 'rad/s'
+        Units['Gm22Unit'             ] = 'km**2'
+        Units['Gm33Unit'             ] = 'km**2'
+        Units['h2Unit'               ] = 'km'
+        Units['h3Unit'               ] = 'km'
+        Units['SqrtGmUnit'           ] = 'km**2'
+
+    else:
+
+        print( 'Invalid coordinate system: {:s}'.format( CoordinateSystem ) )
+        exit()
+
+    return Units
+
+# End of GetUnitsHDF
+
+def RegisterDerivedFieldHDF( Field, Dependencies, Unit, Function ):
+
+    # Make Field available from ReadFieldsHDF (and friends), computed on
+    # request from the fields in Dependencies (stored or derived).
+    # Function( Out, *Dependencies ) must write the field into Out in
+    # place; it is called on blocks of at most BlockSizeHDF elements, so
+    # any temporaries it creates stay cache-sized. Unit is a key of the
+    # dict returned by GetUnitsHDF ( '' for dimensionless ).
+
+    DerivedFieldsTableHDF[Field] = [ Dependencies, Unit, Function ]
+
+    return
+
+# End of RegisterDerivedFieldHDF
+
+def ComputeLorentzFactor( Out, V1, V2, V3, Gm11, Gm22, Gm33 ):
+
+    c_km = 2.99792458e5
+
+    # BetaSq
+    np.multiply( V1, V1, out = Out )
+    Out *= Gm11
+    Out += Gm22 * V2**2
+    Out += Gm33 * V3**2
+    Out /= c_km**2
+
+    np.subtract( 1.0, Out, out = Out )
+    np.sqrt( Out, out = Out )
+    np.divide( 1.0, Out, out = Out )
+
+    return
+
+# End of ComputeLorentzFactor
+
+def ComputeSpecificEnthalpy( Out, D, E, P ):
+
+    c_cm = 2.99792458e10
+
+    np.add( E, P, out = Out )
+    Out /= D
+    Out += c_cm**2
+    Out /= c_cm**2
+
+    return
+
+# End of ComputeSpecificEnthalpy
+
+def ComputePolytropicConstant( Out, D, P, Gm ):
+
+    np.power( D, Gm, out = Out )
+    np.divide( P, Out, out = Out )
+
+    return
+
+# End of ComputePolytropicConstant
+
+RegisterDerivedFieldHDF \
+  ( 'LorentzFactor', \
+    [ 'PF_V1', 'PF_V2', 'PF_V3', 'GF_Gm_11', 'GF_Gm_22', 'GF_Gm_33' ], \
+    '', ComputeLorentzFactor )
+
+RegisterDerivedFieldHDF \
+  ( 'SpecificEnthalpy', [ 'PF_D', 'PF_E', 'AF_P' ], \
+    '', ComputeSpecificEnthalpy )
+
+RegisterDerivedFieldHDF \
+  ( 'PolytropicConstant', [ 'PF_D', 'AF_P', 'AF_Gm' ], \
+    'PolytropicConstantUnit', ComputePolytropicConstant )
+
+def GetDependenciesHDF( Fields ):
+
+    # Returns Fields with the fields needed by any derived field prepended
+    # (recursively), so that dependencies are always loaded first
+
+    Dependencies = []
+
+    for Field in Fields:
+
+        if Field in DerivedFieldsTableHDF:
+
+            for Dependency \
+              in GetDependenciesHDF( DerivedFieldsTableHDF[Field][0] ):
+
+                if not Dependency in Dependencies:
+                    Dependencies.append( Dependency )
+
+    for Field in Fields:
+
+        if not Field in Dependencies:
+            Dependencies.append( Field )
+
+    return Dependencies
+
+# End of GetDependenciesHDF
+
+# Number of elements per block when evaluating derived fields
+BlockSizeHDF = 2**14
+
+def ComputeDerivedFieldHDF( Field, Data, Out = None, dtype = np.float64 ):
+
+    # Evaluate Field from the arrays in Data, block by block over the
+    # flattened arrays, writing into Out (allocated with dtype if not
+    # given). Each block is computed in double precision and only then
+    # cast to the type of Out.
+
+    Dependencies, Unit, Function = DerivedFieldsTableHDF[Field]
+
+    if Out is None:
+        Out = np.empty( Data[Dependencies[0]].shape, dtype )
+
+    OutFlat = Out.reshape( -1 )
+    DepFlat = [ Data[Dependency].reshape( -1 ) \
+                for Dependency in Dependencies ]
+
+    Double = Out.dtype == np.float64 \
+               and all( [ Dependency.dtype == np.float64 \
+                          for Dependency in DepFlat ] )
+
+    if not Double:
+        Block = np.empty( min( BlockSizeHDF, OutFlat.shape[0] ), np.float64 )
+
+    for iLo in range( 0, OutFlat.shape[0], BlockSizeHDF ):
+
+        iHi = iLo + BlockSizeHDF
+
+        if Double:
+
+            Function( OutFlat[iLo:iHi], \
+                      *[ Dependency[iLo:iHi] for Dependency in DepFlat ] )
 
         else:
 
-          print( 'Invalid coordinate system: {:s}'.format( CoordinateSytem ) )
-          exit()
+            n = OutFlat[iLo:iHi].shape[0]
 
-    else:
+            Function( Block[:n], \
+                      *[ Dependency[iLo:iHi].astype( np.float64 ) \
+                         for Dependency in DepFlat ] )
+
+            OutFlat[iLo:iHi] = Block[:n]
+
+    return Out
 
-        TimeUnit               = ''
-        MassDensityUnit        = ''
-        EnergyDensityUnit      = ''
-        NumberDensityUnit      = ''
-        PressureUnit           = ''
-        PolytropicConstantUnit = ''
-        X1Unit                 = ''
-        X2Unit                 = ''
-        X3Unit                 = ''
-        MomentumDensityX1Unit  = ''
-        MomentumDensityX2Unit  = ''
-        MomentumDensityX3Unit  = ''
-        VelocityX1Unit         = ''
-        VelocityX2Unit         = ''
-        VelocityX3Unit         = ''
-        Gm11Unit               = ''
-        Gm22Unit               = ''
-        Gm33Unit               = ''
-        h1Unit                 = ''
-        h2Unit                 = ''
-        h3Unit                 = ''
-        SqrtGmUnit             = ''
+# End of ComputeDerivedFieldHDF
+
+def ReadSnapshotsHDF( FileNames_Fluid, FileNames_Geometry, Fields, Data, \
+                      X1Slice = slice( None ), Verbose = True ):
+
+    # Fill Data[Field][i] for each file i with the datasets in Fields,
+    # opening a fluid (geometry) file only if a fluid (geometry) field
+    # is requested. Only the X1 nodes X1Slice are read (a hyperslab).
+
+    FieldsFF = [ Field for Field in Fields \
+                   if FieldsTableHDF[Field][0] == 'FF' ]
+    FieldsGF = [ Field for Field in Fields \
+                   if FieldsTableHDF[Field][0] == 'GF' ]
+
+    nFiles = len( FileNames_Fluid )
 
     for i in range( nFiles ):
 
-        print( '\r         Generating data: {:}/{:}'.format( i+1, nFiles ), end = '\r' )
+        if Verbose:
+            print( '\r         Generating data: {:}/{:}'.format( i+1, nFiles ), \
+                   end = '\r' )
 
-        TimeSteps[i] = str( Snapshots[i] ).zfill( 6 )
+        if len( FieldsGF ) > 0:
 
-        DataFileNames_Fluid[i] = FF_root + str( TimeSteps[i] ) + '.h5'
+            with Timer( 'HDF5 open' ):
+                f = h5.File( FileNames_Geometry[i], 'r' )
 
-        if( UseGeometryFields ):
+            with f, Timer( 'HDF5 read' ):
 
-            DataFileNames_Geometry[i] = GF_root + str( TimeSteps[i] ) + '.h5'
+                for Field in FieldsGF:
 
-            with h5.File( DataFileNames_Geometry[i], 'r' ) as f:
+                    File, Group, Dataset, Unit = FieldsTableHDF[Field]
 
-                Data_GF[i] = f
+                    Dataset = f[Group][Dataset]
 
-                GF[i] = Data_GF[i]['Geometry Fields']
-
-                GF_CF[i] = GF[i][ 'Conformal Factor'                 ][:][:][:]
-                GF_al[i] = GF[i][ 'Lapse Function'                   ][:][:][:]
-                GF_NP[i] = GF[i][ 'Newtonian Potential'              ][:][:][:]
-                GF_b1[i] = GF[i][ 'Shift Vector (1)'                 ][:][:][:]
-                GF_b2[i] = GF[i][ 'Shift Vector (2)'                 ][:][:][:]
-                GF_b3[i] = GF[i][ 'Shift Vector (3)'                 ][:][:][:]
-                GF_g1[i] = GF[i][ 'Spatial Metric Component (11)'    ][:][:][:]
-                GF_g2[i] = GF[i][ 'Spatial Metric Component (22)'    ][:][:][:]
-                GF_g3[i] = GF[i][ 'Spatial Metric Component (33)'    ][:][:][:]
-                GF_h1[i] = GF[i][ 'Spatial Scale Factor (1)'         ][:][:][:]
-                GF_h2[i] = GF[i][ 'Spatial Scale Factor (2)'         ][:][:][:]
-                GF_h3[i] = GF[i][ 'Spatial Scale Factor (3)'         ][:][:][:]
-                GF_Sg[i] = GF[i][ 'Sqrt Spatial Metric Determinant'  ][:][:][:]
-
-        with h5.File( DataFileNames_Fluid[i], 'r' ) as f:
-
-            Data_FF[i] = f
-
-            # First level groups
-
-            FF[i] = Data_FF[i]['Fluid Fields']
-
-            # Second level groups
-
-            PF[i] = FF[i][ 'Primitive' ]
-            CF[i] = FF[i][ 'Conserved' ]
-            AF[i] = FF[i][ 'Auxiliary' ]
-            DF[i] = FF[i][ 'Diagnostic' ]
-
-            # Third level groups
-
-            CF_D [i] = CF[i][ 'Conserved Baryon Density'       ][:][:][:]
-            CF_S1[i] = CF[i][ 'Conserved Momentum Density (1)' ][:][:][:]
-            CF_S2[i] = CF[i][ 'Conserved Momentum Density (2)' ][:][:][:]
-            CF_S3[i] = CF[i][ 'Conserved Momentum Density (3)' ][:][:][:]
-            CF_E [i] = CF[i][ 'Conserved Energy Density'       ][:][:][:]
-            CF_Ne[i] = CF[i][ 'Conserved Electron Density'     ][:][:][:]
-
-            PF_D [i] = PF[i][ 'Comoving Baryon Density'   ][:][:][:]
-            PF_V1[i] = PF[i][ 'Three-Velocity (1)'        ][:][:][:]
-            PF_V2[i] = PF[i][ 'Three-Velocity (2)'        ][:][:][:]
-            PF_V3[i] = PF[i][ 'Three-Velocity (3)'        ][:][:][:]
-            PF_E [i] = PF[i][ 'Internal Energy Density'   ][:][:][:]
-            PF_Ne[i] = PF[i][ 'Comoving Electron Density' ][:][:][:]
-
-            AF_P [i] = AF[i][ 'Pressure'                        ][:][:][:]
-            AF_Cs[i] = AF[i][ 'Sound Speed'                     ][:][:][:]
-            AF_Gm[i] = AF[i][ 'Ratio of Specific Heats (Gamma)' ][:][:][:]
-            AF_Ye[i] = AF[i][ 'Electron Fraction'               ][:][:][:]
-
-            DF_TCI  [i] = DF[i][ 'TCI'        ][:][:][:]
-            DF_Sh_X1[i] = DF[i][ 'Shock (X1)' ][:][:][:]
-            DF_Sh_X2[i] = DF[i][ 'Shock (X2)' ][:][:][:]
-            DF_Sh_X3[i] = DF[i][ 'Shock (X3)' ][:][:][:]
-
-            T[i] = Data_FF[i][ 'Time' ][0]
-
-            # Derived fields
-
-            c_cm = 2.99792458e10
-            c_km = 2.99792458e5
-
-            BetaSq = (   GF_g1[i] * PF_V1[i]**2 \
-                       + GF_g2[i] * PF_V2[i]**2 \
-                       + GF_g3[i] * PF_V3[i]**2 ) / c_km**2
-
-            LorentzFactor[i] = 1.0 / np.sqrt( 1.0 - BetaSq )
-
-            SpecificEnthalpy[i] \
-              = ( c_cm**2 + ( PF_E[i] + AF_P[i] ) / PF_D[i] ) / c_cm**2
-
-            PolytropicConstant[i] = AF_P[i] / PF_D[i]**( AF_Gm[i] )
-
-    names =\
-    { \
-      'Time'               : [ TimeUnit              , T        ], \
-      'X1'                 : [ X1Unit                , X1       ], \
-      'X2'                 : [ X2Unit                , X2       ], \
-      'X3'                 : [ X3Unit                , X3       ], \
-      'X1_C'               : [ X1Unit                , X1_C     ], \
-      'X2_C'               : [ X2Unit                , X2_C     ], \
-      'X3_C'               : [ X3Unit                , X3_C     ], \
-      'CF_D'               : [ MassDensityUnit       , CF_D     ]  , \
-      'CF_S1'              : [ MomentumDensityX1Unit , CF_S1    ], \
-      'CF_S2'              : [ MomentumDensityX2Unit , CF_S2    ], \
-      'CF_S3'              : [ MomentumDensityX3Unit , CF_S3    ], \
-      'CF_E'               : [ EnergyDensityUnit     , CF_E     ], \
-      'CF_Ne'              : [ NumberDensityUnit     , CF_Ne    ], \
-      'PF_D'               : [ MassDensityUnit       , PF_D     ], \
-      'PF_V1'              : [ VelocityX1Unit        , PF_V1    ], \
-      'PF_V2'              : [ VelocityX2Unit        , PF_V2    ], \
-      'PF_V3'              : [ VelocityX3Unit        , PF_V3    ], \
-      'PF_E'               : [ EnergyDensityUnit     , PF_E     ], \
-      'PF_Ne'              : [ NumberDensityUnit     , PF_Ne    ], \
-      'AF_P'               : [ PressureUnit          , AF_P     ], \
-      'AF_Cs'              : [ VelocityX1Unit        , AF_Cs    ], \
-      'AF_Gm'              : [ ''                    , AF_Gm    ], \
-      'AF_Ye'              : [ ''                    , AF_Ye    ], \
-      'GF_Psi'             : [ ''                    , GF_CF    ], \
-      'GF_Alpha'           : [ ''                    , GF_al    ], \
-      'GF_Phi_N'           : [ ''                    , GF_NP    ], \
-      'GF_Beta_1'          : [ VelocityX1Unit        , GF_b1    ], \
-      'GF_Beta_2'          : [ VelocityX2Unit        , GF_b2    ], \
-      'GF_Beta_2'          : [ VelocityX3Unit        , GF_b3    ], \
-      'GF_Gm_11'           : [ Gm11Unit              , GF_g1    ], \
-      'GF_Gm_22'           : [ Gm22Unit              , GF_g2    ], \
-      'GF_Gm_33'           : [ Gm33Unit              , GF_g3    ], \
-      'GF_h_1'             : [ h1Unit                , GF_h1    ], \
-      'GF_h_2'             : [ h2Unit                , GF_h2    ], \
-      'GF_h_3'             : [ h3Unit                , GF_h3    ], \
-      'GF_SqrtGm'          : [ SqrtGmUnit            , GF_Sg    ], \
-      'DF_TCI'             : [ ''                    , DF_TCI   ], \
-      'DF_Sh_X1'           : [ ''                    , DF_Sh_X1 ], \
-      'DF_Sh_X2'           : [ ''                    , DF_Sh_X2 ], \
-      'DF_Sh_X3'           : [ ''                    , DF_Sh_X3 ], \
-      'LorentzFactor'      : [ ''                    , LorentzFactor ], \
-      'SpecificEnthalpy'   : [ ''                    , SpecificEnthalpy ], \
-      'PolytropicConstant' : [ PolytropicConstantUnit, PolytropicConstant ]
-    }
+                    Data[Field][i] = Dataset[:,:,X1Slice]
 
-    return names
+                    AddBytes( 'HDF5 read', \
+                              Data[Field][i].size * Dataset.dtype.itemsize )
 
-# End of ReadFieldsHDF
+        if len( FieldsFF ) > 0:
+
+            with Timer( 'HDF5 open' ):
+                f = h5.File( FileNames_Fluid[i], 'r' )
+
+            with f, Timer( 'HDF5 read' ):
+
+                for Field in FieldsFF:
+
+                    File, Group, Dataset, Unit = FieldsTableHDF[Field]
+
+                    if Field == 'Time':
+                        Dataset = f[Dataset]
+                        Data[Field][i] = Dataset[0]
+                    else:
+                        Dataset = f[Group][Dataset]
+                        Data[Field][i] = Dataset[:,:,X1Slice]
+
+                    AddBytes( 'HDF5 read', \
+                              Data[Field][i].size * Dataset.dtype.itemsize )
+
+    return
+
+# End of ReadSnapshotsHDF
+
+def InitializeWorkerHDF( FileNames_Fluid, FileNames_Geometry, Fields, \
+                         Data, X1Slice ):
+
+    # Runs once in each forked worker: keep the caller's output arrays
+    # (inherited, not copied, since they are shared mappings) for
+    # ReadSnapshotsWorkerHDF
+
+    global SharedReadHDF
+
+    SharedReadHDF = ( FileNames_Fluid, FileNames_Geometry, Fields, \
+                      Data, X1Slice )
+
+    return
+
+# End of InitializeWorkerHDF
+
+def ReadSnapshotsWorkerHDF( iLo, iHi ):
+
+    # Runs in a worker process: fill rows iLo:iHi of the caller's arrays
+
+    FileNames_Fluid, FileNames_Geometry, Fields, Data, X1Slice \
+      = SharedReadHDF
+
+    Rows = {}
+    for Field in Fields:
+        Rows[Field] = Data[Field][iLo:iHi]
+
+    ReadSnapshotsHDF( FileNames_Fluid[iLo:iHi], FileNames_Geometry[iLo:iHi], \
+                      Fields, Rows, X1Slice = X1Slice, Verbose = False )
+
+    return iHi - iLo
+
+# End of ReadSnapshotsWorkerHDF
+
+def IsSharedArrayHDF( Array ):
+
+    # Whether writes to Array by a forked process are seen by its parent,
+    # i.e., Array lives in a shared mapping (CreateSharedArrayHDF or
+    # CreateMemmapHDF)
+
+    Base = Array
+    while isinstance( Base, np.ndarray ):
+        Base = Base.base
+
+    if isinstance( Base, memoryview ): Base = Base.obj
+
+    return isinstance( Base, mmap.mmap )
+
+# End of IsSharedArrayHDF
+
+def ReadSnapshotsParallelHDF( FileNames_Fluid, FileNames_Geometry, Fields, \
+                              Data, nWorkers, X1Slice = slice( None ), \
+                              Verbose = True ):
+
+    # Same as ReadSnapshotsHDF, but the snapshots are spread over a pool of
+    # nWorkers processes, each writing its rows of Data in place. The
+    # arrays in Data must be shared mappings (see IsSharedArrayHDF), which
+    # forked workers inherit, so nothing is copied back. Workers are
+    # forked so that scripts without a __main__ guard are not re-executed.
+
+    for Field in Fields:
+
+        if not IsSharedArrayHDF( Data[Field] ):
+
+            print( 'ReadSnapshotsParallelHDF: {:} is not in shared memory' \
+                   .format( Field ) )
+            exit()
+
+    nFiles = len( FileNames_Fluid )
+
+    # Several chunks per worker to balance the load
+    nChunks = min( nFiles, 4 * nWorkers )
+    Bounds  = np.linspace( 0, nFiles, nChunks + 1, dtype = np.int64 )
+
+    Tasks = [ ( Bounds[i], Bounds[i+1] ) for i in range( nChunks ) ]
+
+    # Reads in the workers are timed as a whole
+
+    with Timer( 'HDF5 read (parallel)', \
+                sum( [ Data[Field].nbytes for Field in Fields ] ) ), \
+         mp.get_context( 'fork' ).Pool \
+           ( nWorkers, initializer = InitializeWorkerHDF, \
+             initargs = ( FileNames_Fluid, FileNames_Geometry, Fields, \
+                          Data, X1Slice ) ) as Pool:
+
+        nDone = 0
+        for n in Pool.starmap( ReadSnapshotsWorkerHDF, Tasks ):
+            nDone += n
+
+    if Verbose:
+        print( '\r         Generating data: {:}/{:}'.format( nDone, nFiles ), \
+               end = '\r' )
+
+    return
+
+# End of ReadSnapshotsParallelHDF
+
+def ProbeSnapshotHDF( PathToData, Snapshot, Fields, Indices = [ 0 ] ):
+
+    # Read stored Fields of a single snapshot at the X1 nodes Indices
+    # ( at iX2 = iX3 = 0 ) only, e.g. Indices = [ 0 ] for central values.
+    # Returns { Field : values at Indices } and the time of the snapshot.
+
+    Indices = np.array( Indices, np.int64 )
+
+    # HDF5 point selections must be strictly increasing
+    Unique, Inverse = np.unique( Indices, return_inverse = True )
+
+    Values = {}
+
+    for Kind, Root in [ [ 'FF', '_FluidFields_' ], \
+                        [ 'GF', '_GeometryFields_' ] ]:
+
+        FieldsF = [ Field for Field in Fields \
+                      if FieldsTableHDF[Field][0] == Kind ]
+
+        if Kind == 'FF': FieldsF.append( 'Time' )
+
+        if len( FieldsF ) == 0: continue
+
+        FileName = PathToData + Root + str( Snapshot ).zfill( 6 ) + '.h5'
+
+        with h5.File( FileName, 'r' ) as f:
+
+            for Field in FieldsF:
+
+                File, Group, Dataset, Unit = FieldsTableHDF[Field]
+
+                if Field == 'Time':
+                    Time = f[Dataset][0]
+                else:
+                    Values[Field] = f[Group][Dataset][0,0,Unique][Inverse]
+
+    return Values, Time
+
+# End of ProbeSnapshotHDF
+
+def GetCubeFileNameHDF( PathToData ):
+
+    return PathToData + '_Cube.h5'
+
+# End of GetCubeFileNameHDF
+
+def GetSnapshotStatsHDF( PathToData, Snapshots ):
+
+    # ( nSS, 4 ) array of mtime (ns) and size of the fluid and geometry
+    # files of each of Snapshots, -1 for files not on disk
+
+    Stats = np.full( (len( Snapshots ),4), -1, np.int64 )
+
+    for i in range( len( Snapshots ) ):
+
+        for j, Root in enumerate( [ '_FluidFields_', '_GeometryFields_' ] ):
+
+            FileName \
+              = PathToData + Root + str( Snapshots[i] ).zfill( 6 ) + '.h5'
+
+            if not os.path.isfile( FileName ): continue
+
+            st = os.stat( FileName )
+
+            Stats[i,2*j:2*j+2] = [ st.st_mtime_ns, st.st_size ]
+
+    return Stats
+
+# End of GetSnapshotStatsHDF
+
+def ReadCubeHDF( CubeFileName, Fields, Indices, Data, \
+                 X1Slice = slice( None ) ):
+
+    # Fill Data[Field] with rows Indices, X1 nodes X1Slice, of the
+    # time-series cube
+
+    # HDF5 point selections must be strictly increasing
+    Unique, Inverse = np.unique( Indices, return_inverse = True )
+
+    Contiguous = Unique.shape[0] == Indices.shape[0] \
+                   and np.all( np.diff( Indices ) == 1 )
+
+    with Timer( 'HDF5 open' ):
+        f = h5.File( CubeFileName, 'r' )
+
+    with f, Timer( 'HDF5 read (cube)' ):
+
+        for Field in Fields:
+
+            AddBytes( 'HDF5 read (cube)', Data[Field].nbytes )
+
+            # Selection along ( nX3, nX2, nX1 ), after the time axis
+
+            if Field == 'Time':
+                Slab = ()
+            else:
+                Slab = np.s_[:,:,X1Slice]
+
+            if Contiguous:
+                f[Field].read_direct \
+                  ( Data[Field], \
+                    ( slice( Indices[0], Indices[-1]+1 ), ) + Slab )
+            else:
+                Data[Field][...] = f[Field][(Unique,)+Slab][Inverse]
+
+    return
+
+# End of ReadCubeHDF
+
+def MakeCubeHDF( PathToData, Snapshots, UseGeometryFields = True, \
+                 nSS_Chunk = 512, nX_Chunk = 64, nWorkers = 1 ):
+
+    # Pack the snapshot files PathToData_(Fluid|Geometry)Fields_######.h5
+    # into the single file PathToData_Cube.h5, holding Time, the spatial
+    # grid and one ( nSS, nX3, nX2, nX1 ) dataset per stored field, chunked
+    # along time, and the mtime and size of the snapshot files packed
+    # (FileStats, see GetSnapshotStatsHDF). ReadFieldsHDF reads from this
+    # file when it exists and its snapshot files have not changed since.
+
+    Snapshots = np.array( Snapshots, np.int64 )
+    nSS       = Snapshots.shape[0]
+
+    CubeFileName = GetCubeFileNameHDF( PathToData )
+
+    Fields = [ Field for Field in FieldsTableHDF \
+                 if UseGeometryFields or FieldsTableHDF[Field][0] == 'FF' ]
+
+    names = FieldsHDF( PathToData, Snapshots[:1], 'CARTESIAN', False, \
+                       UseGeometryFields = UseGeometryFields, \
+                       Fields = Fields, UseCube = False, Verbose = False )
+
+    Shape = names.Shape[1:]
+    Chunk = ( min( nSS, nSS_Chunk ), 1, 1, min( Shape[2], nX_Chunk ) )
+
+    # Taken before reading, so that files rewritten meanwhile do not match
+    FileStats = GetSnapshotStatsHDF( PathToData, Snapshots )
+
+    with h5.File( CubeFileName, 'w' ) as f:
+
+        f.create_dataset( 'Snapshots', data = Snapshots, maxshape = (None,) )
+        f.create_dataset( 'FileStats', data = FileStats, \
+                          maxshape = (None,4) )
+
+        X = f.create_group( 'Spatial Grid' )
+        for Field in GridFieldsHDF:
+            X.create_dataset( Field, data = names.Data[Field] )
+
+        for Field in Fields:
+
+            if Field == 'Time':
+
+                f.create_dataset( Field, (nSS,), np.float64, \
+                                  maxshape = (None,) )
+
+            else:
+
+                f.create_dataset( Field, (nSS,) + Shape, np.float64, \
+                                  chunks = Chunk, \
+                                  maxshape = (None,) + Shape )
+
+        # Read and write one time-chunk of snapshots at a time
+
+        for iLo in range( 0, nSS, Chunk[0] ):
+
+            iHi = min( nSS, iLo + Chunk[0] )
+
+            names = FieldsHDF( PathToData, Snapshots[iLo:iHi], \
+                               'CARTESIAN', False, \
+                               UseGeometryFields = UseGeometryFields, \
+                               Fields = Fields, nWorkers = nWorkers, \
+                               UseCube = False )
+            names.Load( Fields )
+
+            for Field in Fields:
+                f[Field][iLo:iHi] = names.Data[Field]
+
+    print( '\n  Wrote {:}'.format( CubeFileName ) )
+
+    return CubeFileName
+
+# End of MakeCubeHDF
+
+# Largest number of bytes ReadFieldsHDF may hold in memory before it falls
+# back to disk-backed arrays; None means half of the physical memory
+MemoryBudgetHDF = None
+
+def GetMemoryBudgetHDF( MemoryBudget = None ):
+
+    if MemoryBudget is None: MemoryBudget = MemoryBudgetHDF
+
+    if MemoryBudget is None:
+        MemoryBudget \
+          = os.sysconf( 'SC_PAGE_SIZE' ) * os.sysconf( 'SC_PHYS_PAGES' ) // 2
+
+    return MemoryBudget
+
+# End of GetMemoryBudgetHDF
+
+def FormatBytesHDF( nBytes ):
+
+    for Unit in [ 'B', 'kB', 'MB', 'GB' ]:
+        if nBytes < 1024.0: return '{:.1f} {:}'.format( nBytes, Unit )
+        nBytes /= 1024.0
+
+    return '{:.1f} TB'.format( nBytes )
+
+# End of FormatBytesHDF
+
+def CreateMemmapHDF( Shape, dtype, Directory = None ):
+
+    # Zero-filled array backed by a temporary file in Directory (default:
+    # the system temporary directory, see $TMPDIR). The file is unlinked
+    # right away; its pages live on until the array is garbage collected.
+
+    Descriptor, FileName \
+      = tempfile.mkstemp( suffix = '.npy', dir = Directory )
+    os.close( Descriptor )
+
+    Array = np.lib.format.open_memmap \
+              ( FileName, mode = 'w+', dtype = dtype, shape = Shape )
+
+    os.remove( FileName )
+
+    return Array
+
+# End of CreateMemmapHDF
+
+def CreateSharedArrayHDF( Shape, dtype ):
+
+    # Zero-filled array in anonymous shared memory, which processes forked
+    # afterwards write into directly. The memory is released when the
+    # array is garbage collected.
+
+    Count = int( np.prod( Shape ) )
+
+    Buffer = mmap.mmap( -1, max( 1, Count * np.dtype( dtype ).itemsize ) )
+
+    return np.frombuffer( Buffer, dtype, count = Count ).reshape( Shape )
+
+# End of CreateSharedArrayHDF
+
+def GetX1WindowHDF( X1, X1_C, X1Window ):
+
+    # Range iLo:iHi of the elements (centers X1_C, nodes X1) that overlap
+    # the radial window X1Window = [ x1L, x1H ]. The element widths are
+    # recovered from the Gauss-Legendre nodes; with one node per element,
+    # an element is taken to reach the centers of its neighbors.
+
+    nX     = X1_C.shape[0]
+    nNodes = X1.shape[0] // nX
+
+    if nNodes > 1:
+
+        eta = 0.5 * np.polynomial.legendre.leggauss( nNodes )[0]
+
+        XN  = X1.reshape( nX, nNodes )
+        dX1 = ( XN[:,-1] - XN[:,0] ) / ( eta[-1] - eta[0] )
+
+        X1L = X1_C - 0.5 * dX1
+        X1H = X1_C + 0.5 * dX1
+
+    else:
+
+        X1L = np.concatenate( ( [ -np.inf ], X1_C[:-1] ) )
+        X1H = np.concatenate( ( X1_C[1:], [ +np.inf ] ) )
+
+    Covering = np.flatnonzero( ( X1H > X1Window[0] ) & ( X1L < X1Window[1] ) )
+
+    if Covering.shape[0] == 0:
+
+        print( 'No elements in X1Window = {:}'.format( X1Window ) )
+        exit()
+
+    return int( Covering[0] ), int( Covering[-1] ) + 1
+
+# End of GetX1WindowHDF
+
+class FieldsHDF( Mapping ):
+
+    # Read-only mapping Field -> [ Unit, Data ] returned by ReadFieldsHDF.
+    # Only the spatial grid is read up front; every other array is read
+    # from disk the first time it is accessed. Accessing any of the
+    # fields passed to ReadFieldsHDF reads all of them (and the fields
+    # they depend on) in a single pass over the snapshot files.
+    # Stored and derived fields are held as dtype; the spatial grid and
+    # Time are always double precision.
+    # Fields that would take the arrays held in memory beyond MemoryBudget
+    # bytes are instead held in disk-backed arrays in MemmapDirectory and
+    # read in windows of snapshots that fit the budget.
+    # With X1Window = [ x1L, x1H ], every array holds only the elements
+    # covering the window (see GetX1WindowHDF), and only those are read.
+
+    def __init__( self, PathToData, Snapshots, CoordinateSystem, \
+                  UsePhysicalUnits, UseGeometryFields = True, \
+                  Fields = None, nWorkers = 1, UseCube = True, \
+                  Grid = None, Verbose = True, dtype = np.float64, \
+                  MemoryBudget = None, MemmapDirectory = None, \
+                  X1Window = None ):
+
+        self.PathToData        = PathToData
+        self.nWorkers          = nWorkers
+        self.Verbose           = Verbose
+        self.Snapshots         = np.array( Snapshots, np.int64 )
+        self.UseGeometryFields = UseGeometryFields
+        self.UseCube           = UseCube
+        self.dtype             = np.dtype( dtype )
+        self.MemoryBudget      = GetMemoryBudgetHDF( MemoryBudget )
+        self.MemmapDirectory   = MemmapDirectory
+
+        self.nFiles = self.Snapshots.shape[0]
+        self.Offset = 0
+
+        self.FileNames_Fluid \
+          = [ PathToData + '_FluidFields_' + str( SS ).zfill( 6 ) + '.h5' \
+              for SS in self.Snapshots ]
+        self.FileNames_Geometry \
+          = [ PathToData + '_GeometryFields_' + str( SS ).zfill( 6 ) + '.h5' \
+              for SS in self.Snapshots ]
+
+        self.Units = GetUnitsHDF( CoordinateSystem, UsePhysicalUnits )
+
+        self.Data = {}
+
+        # Use the time-series cube written by MakeCubeHDF if it exists,
+        # holds every requested snapshot and none of their files on disk
+        # has changed since it was written (files no longer on disk are
+        # served from the cube)
+
+        self.CubeFileName = None
+        self.CubeFields   = []
+
+        CubeFileName = GetCubeFileNameHDF( PathToData )
+
+        if UseCube and os.path.isfile( CubeFileName ):
+
+            with h5.File( CubeFileName, 'r' ) as f:
+
+                CubeSnapshots = f['Snapshots'][()]
+
+                Sort = np.argsort( CubeSnapshots )
+                iSS  = np.searchsorted( CubeSnapshots, self.Snapshots, \
+                                        sorter = Sort )
+                iSS  = np.minimum( iSS, CubeSnapshots.shape[0] - 1 )
+
+                if np.all( CubeSnapshots[Sort[iSS]] == self.Snapshots ):
+
+                    CubeFields = [ Field for Field in FieldsTableHDF \
+                                     if Field in f ]
+
+                    # Compare the geometry files only if the cube holds
+                    # geometry fields
+
+                    if any( [ FieldsTableHDF[Field][0] == 'GF' \
+                              for Field in CubeFields ] ):
+                        Columns = [ 0, 1, 2, 3 ]
+                    else:
+                        Columns = [ 0, 1 ]
+
+                    Current = GetSnapshotStatsHDF \
+                                ( PathToData, self.Snapshots )[:,Columns]
+
+                    # Cubes written before FileStats match no file
+                    if 'FileStats' in f:
+                        Packed = f['FileStats'][()][Sort[iSS]][:,Columns]
+                    else:
+                        Packed = np.full( Current.shape, -1, np.int64 )
+
+                    Changed = np.any( ( Current >= 0 ) \
+                                        & ( Current != Packed ), axis = 1 )
+
+                    if np.any( Changed ) and not 'FileStats' in f:
+
+                        print( '  WARNING: {:} has no FileStats '.format \
+                                 ( CubeFileName ) \
+                               + 'to check against the snapshot files; ' \
+                               + 'reading the snapshot files instead ' \
+                               + '(rerun MakeCubeHDF)' )
+
+                    elif np.any( Changed ):
+
+                        print( '  WARNING: {:} of {:} snapshots changed ' \
+                               .format( np.count_nonzero( Changed ), \
+                                        self.nFiles ) \
+                               + 'since {:} was written; '.format \
+                                   ( CubeFileName ) \
+                               + 'reading the snapshot files instead ' \
+                               + '(rerun MakeCubeHDF)' )
+
+                    else:
+
+                        self.CubeFileName = CubeFileName
+                        self.CubeIndices  = Sort[iSS]
+                        self.CubeFields   = CubeFields
+
+        # Get the spatial grid, unless passed in by IterFieldsHDF
+
+        if self.CubeFileName is None:
+            GridFileName = self.FileNames_Fluid[0]
+        else:
+            GridFileName = self.CubeFileName
+
+        if Grid is None:
+
+            Grid = {}
+
+            with h5.File( GridFileName, 'r' ) as f:
+
+                X = f[ 'Spatial Grid' ]
+
+                for Field in GridFieldsHDF:
+                    Grid[Field] = np.array( X[Field] )
+
+        self.Grid = Grid
+
+        # Restrict X1 to the elements covering X1Window; only their nodes
+        # ( X1Slice ) are read from the files
+
+        self.X1Window = X1Window
+
+        nX     = Grid['X1_C'].shape[0]
+        nNodes = Grid['X1'  ].shape[0] // nX
+
+        if X1Window is None:
+            iLo, iHi = 0, nX
+        else:
+            iLo, iHi = GetX1WindowHDF( Grid['X1'], Grid['X1_C'], X1Window )
+
+        self.X1Slice = slice( iLo * nNodes, iHi * nNodes )
+
+        for Field in GridFieldsHDF:
+            self.Data[Field] = Grid[Field]
+
+        self.Data['X1'  ] = Grid['X1'  ][self.X1Slice]
+        self.Data['X1_C'] = Grid['X1_C'][iLo:iHi]
+
+        self.Shape = ( self.nFiles, \
+                       self.Data['X3'].shape[0], \
+                       self.Data['X2'].shape[0], \
+                       self.Data['X1'].shape[0] )
+
+        Available = [ Field for Field in FieldsTableHDF \
+                        if UseGeometryFields \
+                             or FieldsTableHDF[Field][0] == 'FF' ]
+
+        for Field in DerivedFieldsTableHDF:
+
+            if all( [ Dependency in Available for Dependency \
+                        in DerivedFieldsTableHDF[Field][0] ] ):
+                Available.append( Field )
+
+        if Fields is None:
+
+            self.Requested = []
+
+            Fields = Available
+
+        else:
+
+            for Field in Fields:
+
+                if not Field in Available:
+
+                    print( 'Invalid field: {:}'.format( Field ) )
+                    exit()
+
+            self.Requested = GetDependenciesHDF( [ 'Time' ] + list( Fields ) )
+
+            Fields = self.Requested
+
+        self.Keys = list( GridFieldsHDF ) + [ 'Time' ]
+        for Field in Fields:
+            if not Field in self.Keys: self.Keys.append( Field )
+
+        if Verbose:
+
+            if len( self.Requested ) > 0:
+                Label = '{:} fields'.format( len( self.Requested ) )
+            else:
+                Label = 'all {:} fields, if accessed'.format( len( Fields ) )
+
+            print( '  Estimated memory: {:} ({:}, {:} snapshots, ' \
+                   .format( FormatBytesHDF( self.GetBytes( Fields ) ), \
+                            Label, self.nFiles ) \
+                   + 'budget {:})'.format \
+                       ( FormatBytesHDF( self.MemoryBudget ) ) )
+
+        return
+
+    def __getitem__( self, Field ):
+
+        if not Field in self.Keys: raise KeyError( Field )
+
+        if not Field in self.Data:
+
+            # Time is read on its own, so that it can be used without
+            # reading the fields (e.g., with cached cell averages)
+
+            if Field in self.Requested and not Field == 'Time':
+                self.Load( self.Requested )
+            else:
+                self.Load( [ Field ] )
+
+        return [ self.Units[self.GetUnit( Field )], self.Data[Field] ]
+
+    def __iter__( self ):
+
+        return iter( self.Keys )
+
+    def __len__( self ):
+
+        return len( self.Keys )
+
+    def GetUnit( self, Field ):
+
+        if   Field in GridFieldsHDF:
+            return GridFieldsHDF[Field]
+        elif Field in FieldsTableHDF:
+            return FieldsTableHDF[Field][3]
+        else:
+            return DerivedFieldsTableHDF[Field][1]
+
+    def GetShape( self, Field ):
+
+        if Field == 'Time': return ( self.nFiles, )
+
+        return self.Shape
+
+    def GetDtype( self, Field ):
+
+        if Field == 'Time': return np.float64
+
+        return self.dtype
+
+    def GetBytes( self, Fields ):
+
+        # Bytes needed to hold Fields (and their dependencies) in memory
+
+        nBytes = 0
+        for Field in GetDependenciesHDF( Fields ):
+
+            if Field in GridFieldsHDF: continue
+
+            nBytes += int( np.prod( self.GetShape( Field ) ) ) \
+                        * np.dtype( self.GetDtype( Field ) ).itemsize
+
+        return nBytes
+
+    def GetResidentBytes( self ):
+
+        # Bytes held in memory (not disk-backed) by the fields read so far
+
+        return sum( [ self.Data[Field].nbytes for Field in self.Data \
+                        if not isinstance( self.Data[Field], np.memmap ) ] )
+
+    def Load( self, Fields ):
+
+        # Materialize Fields (and their dependencies) that have not yet
+        # been read
+
+        Fields = [ Field for Field in GetDependenciesHDF( Fields ) \
+                     if not Field in self.Data ]
+
+        Stored  = [ Field for Field in Fields if Field in FieldsTableHDF ]
+        Derived = [ Field for Field in Fields \
+                      if Field in DerivedFieldsTableHDF ]
+
+        UseMemmap = self.GetResidentBytes() + self.GetBytes( Fields ) \
+                      > self.MemoryBudget
+
+        if UseMemmap and self.Verbose:
+
+            print( '  Reading {:} fields ({:}) into disk-backed arrays, ' \
+                   .format( len( Fields ), \
+                            FormatBytesHDF( self.GetBytes( Fields ) ) ) \
+                   + 'over the memory budget of {:}'.format \
+                       ( FormatBytesHDF( self.MemoryBudget ) ) )
+
+        if len( Stored ) > 0:
+
+            Data = {}
+            for Field in Stored:
+
+                if UseMemmap and Field != 'Time':
+                    Data[Field] \
+                      = CreateMemmapHDF( self.GetShape( Field ), \
+                                         self.GetDtype( Field ), \
+                                         self.MemmapDirectory )
+                elif self.nWorkers > 1:
+                    # Shared so that the workers read into it in place
+                    Data[Field] \
+                      = CreateSharedArrayHDF( self.GetShape( Field ), \
+                                              self.GetDtype( Field ) )
+                else:
+                    Data[Field] = np.empty( self.GetShape( Field ), \
+                                            self.GetDtype( Field ) )
+
+            # Read all snapshots at once or, for disk-backed arrays, in
+            # windows of snapshots whose buffers fit the memory budget
+
+            if UseMemmap:
+                BytesPerSnapshot = max( 1, self.GetBytes( Stored ) \
+                                             // self.nFiles )
+                WindowSize = max( 1, self.MemoryBudget // BytesPerSnapshot )
+            else:
+                WindowSize = self.nFiles
+
+            for iLo in range( 0, self.nFiles, WindowSize ):
+
+                iHi = min( self.nFiles, iLo + WindowSize )
+
+                Window = {}
+                for Field in Stored:
+                    Window[Field] = Data[Field][iLo:iHi]
+
+                if all( [ Field in self.CubeFields for Field in Stored ] ):
+
+                    ReadCubeHDF \
+                      ( self.CubeFileName, Stored, \
+                        self.CubeIndices[iLo:iHi], Window, \
+                        X1Slice = self.X1Slice )
+
+                elif self.nWorkers > 1 and iHi - iLo > 1:
+
+                    ReadSnapshotsParallelHDF \
+                      ( self.FileNames_Fluid   [iLo:iHi], \
+                        self.FileNames_Geometry[iLo:iHi], Stored, \
+                        Window, self.nWorkers, X1Slice = self.X1Slice, \
+                        Verbose = self.Verbose )
+
+                else:
+
+                    ReadSnapshotsHDF \
+                      ( self.FileNames_Fluid   [iLo:iHi], \
+                        self.FileNames_Geometry[iLo:iHi], Stored, \
+                        Window, X1Slice = self.X1Slice, \
+                        Verbose = self.Verbose )
+
+            self.Data.update( Data )
+
+        for Field in Derived:
+
+            if UseMemmap:
+                Out = CreateMemmapHDF( self.GetShape( Field ), \
+                                       self.GetDtype( Field ), \
+                                       self.MemmapDirectory )
+            else:
+                Out = None
+
+            with Timer( 'Derived fields' ):
+                self.Data[Field] \
+                  = ComputeDerivedFieldHDF( Field, self.Data, Out = Out, \
+                                            dtype = self.GetDtype( Field ) )
+
+        return
+
+# End of FieldsHDF
+
+def GetQuadratureWeights( nNodes ):
+
+    # Gauss-Legendre weights normalized to the unit interval
+    # ( nNodes = 2 -> [ 1/2, 1/2 ], nNodes = 3 -> [ 5/18, 8/18, 5/18 ] )
+
+    return 0.5 * np.polynomial.legendre.leggauss( nNodes )[1]
+
+# End of GetQuadratureWeights
+
+def ComputeCellAverageHDF( names, Fields, UseCache = False ):
+
+    # SqrtGm-weighted cell averages along X1 of names[Field][1][:,0,0,:]
+    # for every snapshot, returned as { Field : ( nSS, nX ) }.
+    # PolytropicConstant is computed from the cell averages of AF_P, PF_D
+    # and AF_Gm rather than averaged itself.
+    # UseCache: take the cell averages from, and add them to, the on-disk
+    #           cache (see GetCachedCellAverageHDF); names must then be a
+    #           FieldsHDF, and fields served from the cache are not read
+
+    if UseCache: return GetCachedCellAverageHDF( names, Fields )
+
+    nX     = names['X1_C'][1].shape[0]
+    nNodes = names['X1'][1].shape[0] // nX
+
+    wq = GetQuadratureWeights( nNodes )
+
+    Averaged = []
+    for Field in Fields:
+
+        if Field == 'PolytropicConstant':
+            Needed = [ 'AF_P', 'PF_D', 'AF_Gm' ]
+        else:
+            Needed = [ Field ]
+
+        for Need in Needed:
+            if not Need in Averaged: Averaged.append( Need )
+
+    # Read anything not yet loaded before timing the averaging
+    Values = {}
+    for Field in [ 'GF_SqrtGm' ] + Averaged:
+        Values[Field] = names[Field][1][:,0,0,:].reshape( -1, nX, nNodes )
+
+    with Timer( 'Cell averages' ):
+
+        # ( nSS, nX, nNodes )
+        wSqrtGm = wq * Values['GF_SqrtGm']
+        vK      = wSqrtGm.sum( axis = 2 )
+
+        # One field at a time, on the ( nSS, nX, nNodes ) views of the
+        # read arrays, so no copy of the fields is made
+
+        uK = {}
+        for Field in Averaged:
+            uK[Field] = np.einsum( 'sxn,sxn->sx', Values[Field], wSqrtGm ) / vK
+
+    CellAverages = {}
+    for Field in Fields:
+
+        if Field == 'PolytropicConstant':
+
+            pK   = uK['AF_P' ]
+            rhoK = uK['PF_D' ]
+            GmK  = uK['AF_Gm']
+
+            CellAverages[Field] = pK / rhoK**GmK
+
+        else:
+
+            CellAverages[Field] = uK[Field]
+
+    return CellAverages
+
+# End of ComputeCellAverageHDF
+
+# Directory and size cap (bytes) of the on-disk cache of cell averages
+CellAverageCacheDirectoryHDF \
+  = os.path.join( os.path.expanduser( '~' ), '.cache', 'CellAveragesHDF' )
+CellAverageCacheSizeHDF = 2**30
+
+def GetCellAverageCacheKeyHDF( names, Field ):
+
+    # Hash of everything the cell averages of Field in names depend on:
+    # path, mtime and size of each snapshot file (or of the cube, if the
+    # snapshot files are gone), quadrature weights, grid size, the X1
+    # nodes read (see X1Window) and dtype
+
+    nX     = names.Data['X1_C'].shape[0]
+    nNodes = names.Data['X1'  ].shape[0] // nX
+
+    Stats = []
+
+    for FileName in names.FileNames_Fluid + names.FileNames_Geometry:
+
+        if os.path.isfile( FileName ):
+            Stat = os.stat( FileName )
+            Stats.append( [ os.path.abspath( FileName ), \
+                            Stat.st_mtime_ns, Stat.st_size ] )
+        elif names.CubeFileName is not None:
+            Stat = os.stat( names.CubeFileName )
+            Stats.append( [ os.path.abspath( names.CubeFileName ), \
+                            Stat.st_mtime_ns, Stat.st_size, FileName ] )
+        else:
+            Stats.append( [ os.path.abspath( FileName ) ] )
+
+    Key = [ Field, names.dtype.str, names.Shape[1:], Stats, \
+            GetQuadratureWeights( nNodes ).tolist() ]
+
+    # With the grid size, the first node read fixes the window; keys of
+    # whole-grid reads are left as they were
+    if names.X1Window is not None: Key.append( names.X1Slice.start )
+
+    Key = json.dumps( Key )
+
+    return hashlib.sha1( Key.encode() ).hexdigest()
+
+# End of GetCellAverageCacheKeyHDF
+
+def GetCachedCellAverageHDF( names, Fields, CacheDirectory = None, \
+                             CacheSize = None ):
+
+    # ComputeCellAverageHDF( names, Fields ) through an on-disk cache of
+    # ( nSS, nX ) arrays, one file per field and set of snapshots, in
+    # CacheDirectory (default CellAverageCacheDirectoryHDF). Files are
+    # keyed by GetCellAverageCacheKeyHDF, so any change to a snapshot file
+    # invalidates them. Least recently used files are evicted once the
+    # cache exceeds CacheSize bytes (default CellAverageCacheSizeHDF).
+
+    if CacheDirectory is None: CacheDirectory = CellAverageCacheDirectoryHDF
+    if CacheSize      is None: CacheSize      = CellAverageCacheSizeHDF
+
+    os.makedirs( CacheDirectory, exist_ok = True )
+
+    CacheFileNames = {}
+    for Field in Fields:
+        CacheFileNames[Field] \
+          = os.path.join( CacheDirectory, '{:}_{:}.npy'.format \
+                            ( Field, GetCellAverageCacheKeyHDF( names, Field ) ) )
+
+    CellAverages = {}
+
+    for Field in Fields:
+
+        if os.path.isfile( CacheFileNames[Field] ):
+
+            CellAverages[Field] = np.load( CacheFileNames[Field] )
+
+            # Mark as recently used
+            os.utime( CacheFileNames[Field] )
+
+    Missing = [ Field for Field in Fields if not Field in CellAverages ]
+
+    if len( Missing ) == 0: return CellAverages
+
+    # Read what is missing in one pass over the snapshot files
+    names.Load( Missing + [ 'GF_SqrtGm' ] )
+
+    CellAverages.update( ComputeCellAverageHDF( names, Missing ) )
+
+    for Field in Missing:
+
+        if CellAverages[Field].nbytes > CacheSize: continue
+
+        TempFileName = '{:}.{:}.tmp'.format( CacheFileNames[Field], os.getpid() )
+
+        with open( TempFileName, 'wb' ) as f:
+            np.save( f, CellAverages[Field] )
+
+        os.replace( TempFileName, CacheFileNames[Field] )
+
+    # Evict least recently used files
+
+    CacheFiles = [ [ os.path.getmtime( FileName ), \
+                     os.path.getsize ( FileName ), FileName ] \
+                   for FileName \
+                   in glob.glob( os.path.join( CacheDirectory, '*.npy' ) ) ]
+    CacheFiles.sort()
+
+    TotalSize = sum( [ CacheFile[1] for CacheFile in CacheFiles ] )
+
+    for MTime, Size, FileName in CacheFiles:
+
+        if TotalSize <= CacheSize: break
+
+        try:
+            os.remove( FileName )
+        except FileNotFoundError:
+            pass
+
+        TotalSize -= Size
+
+    return CellAverages
+
+# End of GetCachedCellAverageHDF
+
+def ReadFieldsHDF( PathToData, Snapshots, CoordinateSystem, \
+                   UsePhysicalUnits, UseGeometryFields = True, \
+                   Fields = None, nWorkers = 1, UseCube = True, \
+                   dtype = np.float64, MemoryBudget = None, \
+                   MemmapDirectory = None, X1Window = None ):
+
+    # Fields: list of field names to read, e.g. [ 'PF_D', 'GF_SqrtGm' ].
+    #         Only these datasets (and those needed to compute any derived
+    #         field among them) are read. Default (None) makes every field
+    #         available, each read on first access.
+    # nWorkers: number of processes used to read the snapshot files
+    # UseCube:  read from PathToData_Cube.h5 (see MakeCubeHDF) if it exists
+    # dtype:    type of the stored and derived fields; np.float32 halves
+    #           memory use (see ReportPrecisionHDF for the error made)
+    # MemoryBudget: bytes that may be held in memory (default
+    #           MemoryBudgetHDF); fields beyond it are held in disk-backed
+    #           arrays in MemmapDirectory (default: $TMPDIR)
+    # X1Window: [ x1L, x1H ] (km); read only the elements covering this
+    #           radial window, e.g., [ xL, xH ] of a zoomed plot (default:
+    #           the whole grid)
+
+    names = FieldsHDF( PathToData, Snapshots, CoordinateSystem, \
+                       UsePhysicalUnits, \
+                       UseGeometryFields = UseGeometryFields, \
+                       Fields = Fields, nWorkers = nWorkers, \
+                       UseCube = UseCube, dtype = dtype, \
+                       MemoryBudget = MemoryBudget, \
+                       MemmapDirectory = MemmapDirectory, \
+                       X1Window = X1Window )
+
+    return names
+
+# End of ReadFieldsHDF
+
+def IterFieldsHDF( PathToData, Snapshots, CoordinateSystem, \
+                   UsePhysicalUnits, UseGeometryFields = True, \
+                   Fields = None, WindowSize = 1, nWorkers = 1, \
+                   UseCube = True, dtype = np.float64, MemoryBudget = None, \
+                   MemmapDirectory = None, X1Window = None ):
+
+    # Generator over consecutive windows of WindowSize entries of Snapshots.
+    # Each window is a FieldsHDF (as returned by ReadFieldsHDF) holding only
+    # its own snapshots, with the attribute Offset giving the index of its
+    # first snapshot in Snapshots, so reductions over a run of any length
+    # only ever hold one window in memory.
+
+    Snapshots = np.array( Snapshots, np.int64 )
+    nFiles    = Snapshots.shape[0]
+
+    Grid = None
+
+    for iLo in range( 0, nFiles, WindowSize ):
+
+        iHi = min( nFiles, iLo + WindowSize )
+
+        print( '\r         Reading snapshots: {:}/{:}'.format( iHi, nFiles ), \
+               end = '\r' )
+
+        names = FieldsHDF( PathToData, Snapshots[iLo:iHi], CoordinateSystem, \
+                           UsePhysicalUnits, \
+                           UseGeometryFields = UseGeometryFields, \
+                           Fields = Fields, nWorkers = nWorkers, \
+                           UseCube = UseCube, Grid = Grid, Verbose = False, \
+                           dtype = dtype, MemoryBudget = MemoryBudget, \
+                           MemmapDirectory = MemmapDirectory, \
+                           X1Window = X1Window )
+
+        names.Offset = iLo
+
+        if Grid is None: Grid = names.Grid
+
+        yield names
+
+# End of IterFieldsHDF
+
+def ReportPrecisionHDF( names, Fields = None, WindowSize = 100 ):
+
+    # Compare the fields of names (as returned by ReadFieldsHDF with a
+    # reduced dtype) against a double-precision read of the same snapshots,
+    # WindowSize snapshots at a time. A value is counted as not
+    # representable if its magnitude lies outside [ tiny, max ] of the
+    # reduced type (it is then flushed to zero or overflows); those values
+    # are left out of the relative error. Meant to be run once to validate
+    # a reduced-precision setup, as it reads every field a second time.
+    # Fields: default (None) every stored and derived field of names, i.e.,
+    #         those requested from ReadFieldsHDF (with their dependencies),
+    #         or every available field if none were requested. Fields not
+    #         yet read are loaded in one pass.
+    # Returns { Field : [ MaxRelativeError, nNotRepresentable ] }
+
+    if Fields is None:
+        Fields = [ Field for Field in names.Keys \
+                     if not ( Field in GridFieldsHDF or Field == 'Time' ) ]
+
+    if len( Fields ) == 0:
+
+        print( 'ReportPrecisionHDF: no fields to compare' )
+        exit()
+
+    names.Load( Fields )
+
+    Info = np.finfo( names.dtype )
+
+    Report = {}
+    for Field in Fields:
+        Report[Field] = [ 0.0, 0 ]
+
+    for iLo in range( 0, names.nFiles, WindowSize ):
+
+        iHi = min( names.nFiles, iLo + WindowSize )
+
+        Double = FieldsHDF( names.PathToData, names.Snapshots[iLo:iHi], \
+                            'CARTESIAN', False, \
+                            UseGeometryFields = names.UseGeometryFields, \
+                            Fields = Fields, UseCube = names.UseCube, \
+                            Grid = names.Grid, Verbose = False, \
+                            X1Window = names.X1Window )
+
+        for Field in Fields:
+
+            Exact   = Double[Field][1]
+            Reduced = names [Field][1][iLo:iHi]
+
+            Magnitude = np.abs( Exact )
+
+            NonZero = np.isfinite( Exact ) & ( Magnitude > 0.0 )
+            Outside = NonZero & (    ( Magnitude > Info.max ) \
+                                   | ( Magnitude < Info.tiny ) )
+            Inside  = NonZero & ~Outside
+
+            Report[Field][1] += int( np.count_nonzero( Outside ) )
+
+            if np.any( Inside ):
+
+                Error \
+                  = np.max( np.abs( Reduced[Inside].astype( np.float64 ) \
+                                      - Exact[Inside] ) / Magnitude[Inside] )
+
+                Report[Field][0] = max( Report[Field][0], float( Error ) )
+
+    print( '\n  Precision report ({:}, eps = {:.3e}):'.format \
+           ( Info.dtype.name, Info.eps ) )
+
+    for Field in Fields:
+
+        print( '    {:<20s} max. rel. error: {:.3e}, not representable: {:}' \
+               .format( Field, Report[Field][0], Report[Field][1] ) )
+
+        if Report[Field][1] > 0:
+            print( '    WARNING: {:} has values outside [{:.1e},{:.1e}]' \
+                   .format( Field, Info.tiny, Info.max ) )
+
+    return Report
+
+# End of ReportPrecisionHDF
+
+def ProbeFieldsHDF( PathToData, Snapshots, CoordinateSystem, \
+                    UsePhysicalUnits, Fields, Indices = None, Radii = None, \
+                    UseCube = True ):
+
+    # Time series of Fields at a few X1 nodes ( at iX2 = iX3 = 0 ), given
+    # either as node Indices or as Radii (mapped to the nearest node), e.g.
+    # Indices = [ 0 ] for central values. Only those nodes are read from
+    # each file (or from the cube written by MakeCubeHDF, if present).
+    # Derived fields are computed from their dependencies at the probes.
+    # Returns { Field : [ Unit, ( nSS, nProbes ) array ] }, plus 'Time'
+    # and 'X1', the radii of the probes.
+
+    Snapshots = np.array( Snapshots, np.int64 )
+    nSS       = Snapshots.shape[0]
+
+    names = FieldsHDF( PathToData, Snapshots, CoordinateSystem, \
+                       UsePhysicalUnits, UseGeometryFields = True, \
+                       Fields = Fields, UseCube = UseCube, Verbose = False )
+
+    X1 = names.Data['X1']
+
+    if Indices is None:
+        Indices = [ np.argmin( np.abs( X1 - Radius ) ) for Radius in Radii ]
+
+    Indices = np.array( Indices, np.int64 )
+    nProbes = Indices.shape[0]
+
+    Stored = [ Field for Field in names.Requested \
+                 if Field in FieldsTableHDF and not Field == 'Time' ]
+
+    Data = {}
+    for Field in Stored:
+        Data[Field] = np.empty( (nSS,nProbes), np.float64 )
+    Data['Time'] = np.empty( nSS, np.float64 )
+
+    if all( [ Field in names.CubeFields for Field in Stored + [ 'Time' ] ] ):
+
+        Unique, Inverse = np.unique( Indices, return_inverse = True )
+
+        with h5.File( names.CubeFileName, 'r' ) as f:
+
+            Data['Time'][:] = f['Time'][()][names.CubeIndices]
+
+            # One time-contiguous column per probe
+            for Field in Stored:
+
+                Columns = np.empty( (f[Field].shape[0],Unique.shape[0]), \
+                                    np.float64 )
+
+                for j in range( Unique.shape[0] ):
+                    Columns[:,j] = f[Field][:,0,0,Unique[j]]
+
+                Data[Field][:] = Columns[names.CubeIndices][:,Inverse]
+
+    else:
+
+        for iSS in range( nSS ):
+
+            print( '\r         Probing data: {:}/{:}'.format( iSS+1, nSS ), \
+                   end = '\r' )
+
+            Values, Data['Time'][iSS] \
+              = ProbeSnapshotHDF \
+                  ( PathToData, Snapshots[iSS], Stored, Indices = Indices )
+
+            for Field in Stored:
+                Data[Field][iSS] = Values[Field]
+
+    for Field in names.Requested:
+
+        if Field in DerivedFieldsTableHDF:
+            Data[Field] = ComputeDerivedFieldHDF( Field, Data )
+
+    Probes = {}
+
+    Probes['X1'] = [ names.Units[GridFieldsHDF['X1']], X1[Indices] ]
+
+    for Field in Data:
+        Probes[Field] = [ names.Units[names.GetUnit( Field )], Data[Field] ]
+
+    return Probes
+
+# End of ProbeFieldsHDF
+
+def GetIndexFileNameHDF( PathToData ):
+
+    return PathToData + '_Index.json'
+
+# End of GetIndexFileNameHDF
+
+def GetIndexStatsHDF( PathToData, Snapshot, UseGeometryFields ):
+
+    # The file name, mtime and size (also of the geometry file, if
+    # UseGeometryFields) an index record of Snapshot holds, or None if a
+    # file is not on disk
+
+    FileName = PathToData + '_FluidFields_' + str( Snapshot ).zfill( 6 ) + '.h5'
+
+    if not os.path.isfile( FileName ): return None
+
+    Stats = { 'FileName' : os.path.basename( FileName ), \
+              'MTime'    : os.path.getmtime( FileName ), \
+              'Size'     : os.path.getsize ( FileName ) }
+
+    if UseGeometryFields:
+
+        FileName_Geometry \
+          = PathToData + '_GeometryFields_' + str( Snapshot ).zfill( 6 ) + '.h5'
+
+        if not os.path.isfile( FileName_Geometry ): return None
+
+        Stats['GeometryMTime'] = os.path.getmtime( FileName_Geometry )
+        Stats['GeometrySize' ] = os.path.getsize ( FileName_Geometry )
+
+    return Stats
+
+# End of GetIndexStatsHDF
+
+def ReadSnapshotIndexHDF( PathToData, Validate = True ):
+
+    # Returns the index written by UpdateSnapshotIndexHDF ( { Snapshot :
+    # record } with integer keys ), or an empty dict if there is none.
+    # Validate: drop the records of snapshots whose files changed, or are
+    #           no longer on disk, since they were indexed, so that they
+    #           are read from the files rather than taken stale
+
+    IndexFileName = GetIndexFileNameHDF( PathToData )
+
+    if not os.path.isfile( IndexFileName ): return {}
+
+    with open( IndexFileName ) as f:
+        Index = json.load( f )
+
+    Index = { int( Snapshot ) : Index[Snapshot] for Snapshot in Index }
+
+    if not Validate: return Index
+
+    Current = {}
+    for Snapshot in Index:
+
+        Record = Index[Snapshot]
+
+        Stats = GetIndexStatsHDF( PathToData, Snapshot, \
+                                  'GeometryMTime' in Record )
+
+        if Stats is not None \
+             and all( [ Record.get( Key ) == Stats[Key] for Key in Stats ] ):
+            Current[Snapshot] = Record
+
+    if len( Current ) < len( Index ):
+
+        print( '  {:} of {:} records in {:} are out of date '.format \
+                 ( len( Index ) - len( Current ), len( Index ), \
+                   IndexFileName ) \
+               + '(rerun UpdateSnapshotIndexHDF)' )
+
+    return Current
+
+# End of ReadSnapshotIndexHDF
+
+def UpdateSnapshotIndexHDF( PathToData, Fields = [ 'PF_D' ], \
+                            Verbose = True ):
+
+    # Maintain PathToData_Index.json, which records for every snapshot
+    # PathToData_FluidFields_######.h5 on disk: file name, mtime and size
+    # (also of the geometry file, if geometry fields are indexed),
+    # simulation time, grid shape, and for each of the stored Fields its
+    # minimum, maximum and central ( [0,0,0] ) value.
+    #
+    # Only snapshots that are new, or whose files changed, since the last
+    # update are read; records of snapshots no longer on disk are dropped.
+    # Snapshots whose geometry file is not (yet) on disk, e.g., of a
+    # running simulation, are left out until a later update.
+    # Returns the index as from ReadSnapshotIndexHDF.
+
+    Index = ReadSnapshotIndexHDF( PathToData, Validate = False )
+
+    FileNames_Fluid \
+      = sorted( glob.glob( glob.escape( PathToData ) \
+                           + '_FluidFields_' + '[0-9]' * 6 + '.h5' ) )
+
+    UseGeometryFields \
+      = any( [ FieldsTableHDF[Field][0] == 'GF' for Field in Fields ] )
+
+    Updated  = {}
+    nRead    = 0
+    nSkipped = 0
+
+    for FileName in FileNames_Fluid:
+
+        Snapshot = int( FileName[-9:-3] )
+
+        Record = GetIndexStatsHDF( PathToData, Snapshot, UseGeometryFields )
+
+        if Record is None:
+
+            nSkipped += 1
+
+            continue
+
+        FileNames = [ FileName ]
+
+        if UseGeometryFields:
+            FileNames.append( PathToData + '_GeometryFields_' \
+                                + str( Snapshot ).zfill( 6 ) + '.h5' )
+
+        # Keep the old record if the files are unchanged and it already
+        # holds every requested field
+
+        if Snapshot in Index:
+
+            Old = Index[Snapshot]
+
+            if all( [ Old.get( Key ) == Record[Key] for Key in Record ] ) \
+                 and all( [ Field in Old['Fields'] for Field in Fields ] ):
+
+                Updated[Snapshot] = Old
+
+                continue
+
+        nRead += 1
+
+        if Verbose:
+            print( '\r         Indexing snapshot: {:}'.format( Snapshot ), \
+                   end = '\r' )
+
+        Record['Fields'] = {}
+
+        for FileName in FileNames:
+
+            with h5.File( FileName, 'r' ) as f:
+
+                if 'Time' in f:
+
+                    Record['Time' ] = float( f['Time'][0] )
+                    Record['Shape'] \
+                      = [ f['Spatial Grid'][X].shape[0] \
+                          for X in [ 'X3', 'X2', 'X1' ] ]
+
+                for Field in Fields:
+
+                    File, Group, Dataset, Unit = FieldsTableHDF[Field]
+
+                    if not Group in f: continue
+
+                    Data = f[Group][Dataset][()]
+
+                    Record['Fields'][Field] \
+                      = { 'Min'     : float( Data.min() ), \
+                          'Max'     : float( Data.max() ), \
+                          'Central' : float( Data[0,0,0] ) }
+
+        Updated[Snapshot] = Record
+
+    # Write to a temporary file first so an interrupted update never
+    # leaves a truncated index behind
+
+    IndexFileName = GetIndexFileNameHDF( PathToData )
+
+    with open( IndexFileName + '.tmp', 'w' ) as f:
+        json.dump( { str( Snapshot ) : Updated[Snapshot] \
+                     for Snapshot in sorted( Updated ) }, f, indent = 1 )
+
+    os.replace( IndexFileName + '.tmp', IndexFileName )
+
+    if Verbose:
+        print( '\n  Indexed {:} new or changed of {:} snapshots in {:}' \
+               .format( nRead, len( Updated ), IndexFileName ) )
+
+    if Verbose and nSkipped > 0:
+        print( '  Skipped {:} snapshots without a geometry file' \
+               .format( nSkipped ) )
+
+    return Updated
+
+# End of UpdateSnapshotIndexHDF
+
+def GetFromSnapshotIndexHDF( Index, Snapshots, Key, Field = None ):
+
+    # Array of Key ( 'Time', or 'Min', 'Max' or 'Central' of Field ) over
+    # Snapshots from an index returned by (Update|Read)SnapshotIndexHDF
+
+    if Field is None:
+        return np.array( [ Index[SS][Key] for SS in Snapshots ], np.float64 )
+
+    return np.array( [ Index[SS]['Fields'][Field][Key] for SS in Snapshots ], \
+                     np.float64 )
+
+# End of GetFromSnapshotIndexHDF
+
+def GetExtremaFromIndexHDF( PathToData, Snapshots, Fields ):
+
+    # { Field : ExtremaReduction } holding the global extrema over
+    # Snapshots of those Fields whose extrema the snapshot index (see
+    # UpdateSnapshotIndexHDF) holds, up to date, for every snapshot
+
+    Index = ReadSnapshotIndexHDF( PathToData )
+
+    Extrema = {}
+
+    for Field in Fields:
+
+        if not all( [ SS in Index and Field in Index[SS]['Fields'] \
+                      for SS in Snapshots ] ): continue
+
+        Extrema[Field] = ExtremaReduction()
+
+        for Key in [ 'Min', 'Max' ]:
+
+            Extrema[Field].Update \
+              ( GetFromSnapshotIndexHDF( Index, Snapshots, Key, Field ), \
+                PerPoint = False )
+
+    return Extrema
+
+# End of GetExtremaFromIndexHDF
+
+def ComputeExtremaHDF( PathToData, Snapshots, Fields, Percentiles = None, \
+                       PerRadius = False, UseIndex = True, WindowSize = 100, \
+                       nWorkers = 1, UseCube = True, X1Window = None, \
+                       names = None ):
+
+    # { Field : ExtremaReduction } (see UtilitiesModuleExtrema.py) of the
+    # nodal values of Fields over Snapshots, e.g., to choose plot limits.
+    #
+    # If neither Percentiles nor PerRadius is requested, fields whose
+    # extrema are in the snapshot index are not read. The others are read
+    # WindowSize snapshots at a time, so the run is never held in memory;
+    # the point-wise extrema MinX and MaxX are then ( nX3, nX2, nX1 ).
+    # With X1Window (see ReadFieldsHDF), only the elements covering the
+    # window are read; the index, which covers the whole grid, is not used.
+    # names: a FieldsHDF of Snapshots (and X1Window) already read, e.g.,
+    # by a movie script; fields not in the index are then reduced from it
+    # rather than read again.
+
+    Snapshots = np.array( Snapshots, np.int64 )
+
+    Extrema = {}
+
+    if UseIndex and Percentiles is None and not PerRadius \
+         and X1Window is None:
+        Extrema = GetExtremaFromIndexHDF( PathToData, Snapshots, Fields )
+
+    Missing = [ Field for Field in Fields if not Field in Extrema ]
+
+    if len( Missing ) == 0: return Extrema
+
+    for Field in Missing:
+        Extrema[Field] = ExtremaReduction( Percentiles = Percentiles )
+
+    if names is not None:
+
+        with Timer( 'Extrema' ):
+
+            for Field in Missing:
+                Extrema[Field].Update( names[Field][1] )
+
+        return Extrema
+
+    for names in IterFieldsHDF( PathToData, Snapshots, 'SPHERICAL', True, \
+                                Fields = Missing, WindowSize = WindowSize, \
+                                nWorkers = nWorkers, UseCube = UseCube, \
+                                X1Window = X1Window ):
+
+        with Timer( 'Extrema' ):
+
+            for Field in Missing:
+                Extrema[Field].Update( names[Field][1] )
+
+    return Extrema
+
+# End of ComputeExtremaHDF
+
+def GetFileStatsHDF( PathToData, Snapshots ):
+
+    # { Snapshot : [ mtime (ns), size ] of the fluid and geometry files }
+    # for those of Snapshots whose files are both on disk
+
+    Stats = {}
+
+    for Snapshot in Snapshots:
+
+        Stat = []
+
+        for Root in [ '_FluidFields_', '_GeometryFields_' ]:
+
+            FileName = PathToData + Root + str( Snapshot ).zfill( 6 ) + '.h5'
+
+            if not os.path.isfile( FileName ): break
+
+            st = os.stat( FileName )
+
+            Stat += [ st.st_mtime_ns, st.st_size ]
+
+        if len( Stat ) == 4: Stats[int( Snapshot )] = Stat
+
+    return Stats
+
+# End of GetFileStatsHDF
+
+def PlanIncrementalUpdateHDF( PathToData, Snapshots, StateFileName ):
+
+    # Plan the update of a product (exported time series, movie) built
+    # from Snapshots of a simulation that may still be running, given the
+    # state written by WriteIncrementalStateHDF when the product was last
+    # built.
+    #
+    # Returns ( Snapshots, iFirstNew, State ): the Snapshots whose files
+    # are on disk, the index into them of the first snapshot not yet in
+    # the product, and the stored state ( {} if there is none). iFirstNew
+    # is 0 (rebuild everything) if there is no state, or if a snapshot
+    # already in the product changed, disappeared or is no longer
+    # followed by the same snapshots.
+
+    Stats = GetFileStatsHDF( PathToData, Snapshots )
+
+    Snapshots = np.array( [ SS for SS in Snapshots if int( SS ) in Stats ], \
+                          np.int64 )
+
+    if not os.path.isfile( StateFileName ): return Snapshots, 0, {}
+
+    with open( StateFileName ) as f:
+        State = json.load( f )
+
+    Done = State['Snapshots']
+    nDone = len( Done )
+
+    if      nDone <= Snapshots.shape[0] \
+        and Snapshots[:nDone].tolist() == Done \
+        and all( [ Stats[SS] == Stat \
+                   for SS, Stat in zip( Done, State['Stats'] ) ] ):
+
+        return Snapshots, nDone, State
+
+    return Snapshots, 0, State
+
+# End of PlanIncrementalUpdateHDF
+
+def WriteIncrementalStateHDF( PathToData, Snapshots, StateFileName, \
+                              Extra = {} ):
+
+    # Record that the product now holds Snapshots, along with the stats of
+    # their files and any Extra (JSON-serializable) items needed to extend
+    # it consistently (e.g., axis limits, file sizes)
+
+    Stats = GetFileStatsHDF( PathToData, Snapshots )
+
+    State = dict( Extra )
+
+    State['Snapshots'] = [ int( SS ) for SS in Snapshots ]
+    State['Stats'    ] = [ Stats[int( SS )] for SS in Snapshots ]
+
+    with open( StateFileName + '.tmp', 'w' ) as f:
+        json.dump( State, f )
+
+    os.replace( StateFileName + '.tmp', StateFileName )
+
+    return
+
+# End of WriteIncrementalStateHDF
+
+def WriteTimeSeriesHDF( FileName, Field, XC, Time, Data, Units, Offset = 0, \
+                        yScale = 1.0 ):
+
+    # Write the time series Data[iSS,iX] of Field at the times Time and the
+    # cell centers XC to FileName as the datasets 'XC', 'Time' and Field,
+    # each with its unit in the attribute 'Unit' ( Units = [ XC unit,
+    # Time unit, Field unit ] ).
+    # yScale: the factor Data has been divided by (as by the yScale of the
+    #         makeMovie scripts), stored in the attribute 'yScale' of Field;
+    #         Field in Units is the unit of Data * yScale
+    #
+    # Offset = 0 creates the file. Offset > 0 writes the rows Offset, ...
+    # of an existing file and drops any rows after them, so a run can be
+    # exported a window of snapshots at a time, or extended.
+
+    nSS, nX = Data.shape
+
+    with Timer( 'Write time series' ):
+
+        if Offset == 0:
+
+            with h5.File( FileName, 'w' ) as f:
+
+                f.create_dataset( 'XC', data = np.asarray( XC, np.float64 ) )
+
+                # Chunks of 64 snapshots, so appending wastes little space
+
+                f.create_dataset( 'Time', shape = (0,), maxshape = (None,), \
+                                  dtype = np.float64, chunks = (64,) )
+
+                f.create_dataset( Field, shape = (0,nX), \
+                                  maxshape = (None,nX), \
+                                  dtype = np.float64, chunks = (64,nX) )
+
+                for Name, Unit in zip( [ 'XC', 'Time', Field ], Units ):
+                    f[Name].attrs['Unit'] = Unit
+
+                f[Field].attrs['yScale'] = np.float64( yScale )
+
+        with h5.File( FileName, 'r+' ) as f:
+
+            if Offset > f['Time'].shape[0]:
+
+                print( 'WriteTimeSeriesHDF: {:} has only {:} rows' \
+                       .format( FileName, f['Time'].shape[0] ) \
+                       + ', cannot write from row {:}'.format( Offset ) )
+                exit()
+
+            f['Time'].resize( ( Offset + nSS, ) )
+            f[Field ].resize( ( Offset + nSS, nX ) )
+
+            f['Time'][Offset:] = Time
+            f[Field ][Offset:] = Data
+
+    AddBytes( 'Write time series', Data.nbytes )
+
+    return
+
+# End of WriteTimeSeriesHDF
+
+def ReadTimeSeriesHDF( FileName, Field = None ):
+
+    # Read a time series written by WriteTimeSeriesHDF. Returns XC ( nX, ),
+    # Time ( nSS, ), Data ( nSS, nX ) and Units = [ XC unit, Time unit,
+    # Field unit ]. Field defaults to the one field in the file. Data is
+    # as written, i.e., divided by the attribute 'yScale' of Field (1 if
+    # the file has none).
+
+    with Timer( 'Read time series' ), h5.File( FileName, 'r' ) as f:
+
+        if Field is None:
+            Field = [ Name for Name in f if not Name in [ 'XC', 'Time' ] ][0]
+
+        XC   = f['XC'  ][()]
+        Time = f['Time'][()]
+        Data = f[Field ][()]
+
+        Units = [ f[Name].attrs['Unit'] for Name in [ 'XC', 'Time', Field ] ]
+
+    Units = [ Unit.decode() if isinstance( Unit, bytes ) else str( Unit ) \
+              for Unit in Units ]
+
+    AddBytes( 'Read time series', Data.nbytes )
+
+    return XC, Time, Data, Units
+
+# End of ReadTimeSeriesHDF
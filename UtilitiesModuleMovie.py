@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+
+# --- Import libraries ---
+
+import os
+import shutil
+import subprocess
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import animation
+
+from UtilitiesModuleTiming import Timer, AddBytes
+from UtilitiesModuleComparison import GetInterpolationWeights
+
+def RenderFrames( fig, UpdateFrame, InitializeFrame, Frames, SaveFileAs, \
+                  fps, dpi ):
+
+    # Render the frames Frames of fig into the movie SaveFileAs
+
+    Writer = animation.FFMpegWriter( fps = fps )
+
+    with Writer.saving( fig, SaveFileAs, dpi ):
+
+        InitializeFrame()
+
+        for t in Frames:
+
+            UpdateFrame( t )
+            Writer.grab_frame()
+
+    return
+
+# End of RenderFrames
+
+def ConcatenateMovies( FileNames, SaveFileAs ):
+
+    # Join the movies FileNames, in order, into SaveFileAs with ffmpeg's
+    # concat demuxer, without re-encoding; the movies must have been
+    # encoded with the same settings (figure size, dpi, fps)
+
+    Descriptor, ListFileName \
+      = tempfile.mkstemp \
+          ( suffix = '.txt', \
+            dir = os.path.dirname( os.path.abspath( SaveFileAs ) ) )
+
+    try:
+
+        with os.fdopen( Descriptor, 'w' ) as f:
+            for FileName in FileNames:
+                f.write( "file '{:}'\n".format( os.path.abspath( FileName ) ) )
+
+        with Timer( 'Concatenate parts' ):
+
+            subprocess.run \
+              ( [ plt.rcParams['animation.ffmpeg_path'], '-y', \
+                  '-loglevel', 'error', \
+                  '-f', 'concat', '-safe', '0', '-i', ListFileName, \
+                  '-c', 'copy', SaveFileAs ], \
+                check = True )
+
+    finally:
+
+        os.remove( ListFileName )
+
+    return
+
+# End of ConcatenateMovies
+
+def SaveMovie( fig, UpdateFrame, InitializeFrame, nFrames, SaveFileAs, \
+               fps, dpi = 300, nWorkers = 1, FirstFrame = 0 ):
+
+    # Save the movie of frames FirstFrame, ..., nFrames-1, drawn by
+    # UpdateFrame( t ).
+    #
+    # With nWorkers > 1, the frames are split into nWorkers contiguous
+    # ranges, each rendered by a forked process into its own part file
+    # (every process owns a copy of fig), and the parts are joined in order
+    # with ffmpeg's concat demuxer without re-encoding. Forking avoids
+    # re-executing the calling script in the workers.
+
+    nWorkers = max( 1, min( nWorkers, nFrames - FirstFrame ) )
+
+    if nWorkers == 1:
+
+        anim = animation.FuncAnimation \
+                 ( fig, \
+                   UpdateFrame, \
+                   init_func = InitializeFrame, \
+                   frames    = range( FirstFrame, nFrames ), \
+                   blit      = True )
+
+        with Timer( 'Frame encoding' ):
+            anim.save( SaveFileAs, fps = fps, dpi = dpi )
+
+        AddBytes( 'Frame encoding', os.path.getsize( SaveFileAs ) )
+
+        return
+
+    Extension = os.path.splitext( SaveFileAs )[1]
+
+    PartDirectory \
+      = tempfile.mkdtemp \
+          ( prefix = '.frames_', \
+            dir = os.path.dirname( os.path.abspath( SaveFileAs ) ) )
+
+    Bounds = np.linspace( FirstFrame, nFrames, nWorkers + 1, dtype = np.int64 )
+
+    PartFileNames \
+      = [ os.path.join( PartDirectory, 'part{:04d}{:}'.format( i, Extension ) ) \
+          for i in range( nWorkers ) ]
+
+    try:
+
+        Context = mp.get_context( 'fork' )
+
+        Workers \
+          = [ Context.Process \
+                ( target = RenderFrames, \
+                  args = ( fig, UpdateFrame, InitializeFrame, \
+                           range( Bounds[i], Bounds[i+1] ), \
+                           PartFileNames[i], fps, dpi ) ) \
+              for i in range( nWorkers ) ]
+
+        with Timer( 'Frame encoding' ):
+
+            for Worker in Workers: Worker.start()
+            for Worker in Workers: Worker.join()
+
+        for Worker in Workers:
+
+            if not Worker.exitcode == 0:
+
+                print( 'Frame rendering failed with exit code {:}' \
+                       .format( Worker.exitcode ) )
+                exit()
+
+        ConcatenateMovies( PartFileNames, SaveFileAs )
+
+        AddBytes( 'Frame encoding', os.path.getsize( SaveFileAs ) )
+
+    finally:
+
+        shutil.rmtree( PartDirectory, ignore_errors = True )
+
+    return
+
+# End of SaveMovie
+
+def ExtendMovie( fig, UpdateFrame, InitializeFrame, FirstFrame, nFrames, \
+                 SaveFileAs, fps, dpi = 300, nWorkers = 1 ):
+
+    # Append frames FirstFrame, ..., nFrames-1 to the movie SaveFileAs,
+    # which holds frames 0, ..., FirstFrame-1 rendered with the same fig,
+    # fps and dpi. Only the new frames are rendered; the movie is rendered
+    # from scratch if it does not exist or FirstFrame is 0.
+
+    if FirstFrame == 0 or not os.path.isfile( SaveFileAs ):
+
+        SaveMovie( fig, UpdateFrame, InitializeFrame, nFrames, SaveFileAs, \
+                   fps, dpi = dpi, nWorkers = nWorkers )
+
+        return
+
+    if FirstFrame >= nFrames: return
+
+    Root, Extension = os.path.splitext( SaveFileAs )
+
+    PartDirectory \
+      = tempfile.mkdtemp \
+          ( prefix = '.frames_', \
+            dir = os.path.dirname( os.path.abspath( SaveFileAs ) ) )
+
+    try:
+
+        PartFileName = os.path.join( PartDirectory, 'new' + Extension )
+        JoinFileName = os.path.join( PartDirectory, 'all' + Extension )
+
+        SaveMovie( fig, UpdateFrame, InitializeFrame, nFrames, PartFileName, \
+                   fps, dpi = dpi, nWorkers = nWorkers, \
+                   FirstFrame = FirstFrame )
+
+        ConcatenateMovies( [ SaveFileAs, PartFileName ], JoinFileName )
+
+        os.replace( JoinFileName, SaveFileAs )
+
+    finally:
+
+        shutil.rmtree( PartDirectory, ignore_errors = True )
+
+    return
+
+# End of ExtendMovie
+
+def PlanFramesByChange( Time, Data, nFrames, Limits, UseLogScale = False, \
+                        TimeWeight = 0.1 ):
+
+    # Choose at most nFrames snapshots for a movie so that the plotted
+    # lines move by about the same amount from one frame to the next.
+    #
+    # The change between consecutive snapshots is the largest displacement
+    # of any point of any of the lines Data (a list of ( nSS, nX ) arrays,
+    # or of sequences of nSS rows) on the y-axis with limits Limits, as a
+    # fraction of its height (in log10 if UseLogScale, which needs
+    # Limits[0] > 0). A fraction
+    # TimeWeight of the frames is spread uniformly in Time, so that slow
+    # phases are not skipped entirely.
+    #
+    # Returns ( Index, Weight ), to be used with GetFrame; Weight is zero.
+
+    Time = np.asarray( Time, np.float64 )
+
+    nSS = Time.shape[0]
+
+    def Transform( Y ):
+
+        Y = np.clip( np.asarray( Y, np.float64 ), Limits[0], Limits[1] )
+
+        if UseLogScale:
+            return np.log10( Y ) / np.log10( Limits[1] / Limits[0] )
+
+        return Y / ( Limits[1] - Limits[0] )
+
+    Change = np.zeros( nSS, np.float64 )
+
+    for Y in Data:
+
+        Previous = Transform( Y[0] )
+
+        for iSS in range( 1, nSS ):
+
+            Current = Transform( Y[iSS] )
+
+            if not Current.shape == Previous.shape:
+
+                print( 'PlanFramesByChange: the grid changes at snapshot' \
+                       + ' {:}'.format( iSS ) )
+                exit()
+
+            Change[iSS] = max( Change[iSS], \
+                               np.nanmax( np.abs( Current - Previous ) ) )
+
+            Previous = Current
+
+    # Cumulative measure, from 0 to 1
+
+    Measure = np.cumsum( Change )
+
+    if Measure[-1] > 0.0:
+        Measure *= ( 1.0 - TimeWeight ) / Measure[-1]
+    else:
+        TimeWeight = 1.0
+
+    if Time[-1] > Time[0]:
+        Measure += TimeWeight * ( Time - Time[0] ) / ( Time[-1] - Time[0] )
+    else:
+        Measure += TimeWeight * np.linspace( 0.0, 1.0, nSS )
+
+    Index = np.searchsorted( Measure, np.linspace( 0.0, Measure[-1], nFrames ) )
+    Index = np.unique( np.clip( Index, 0, nSS - 1 ) )
+
+    return Index, np.zeros( Index.shape, np.float64 )
+
+# End of PlanFramesByChange
+
+def PlanFramesInTime( Time, nFrames ):
+
+    # nFrames frames uniformly spaced in Time, each interpolated linearly
+    # between the two snapshots around it.
+    #
+    # Returns ( Index, Weight ), to be used with GetFrame
+
+    Time = np.asarray( Time, np.float64 )
+
+    if Time.shape[0] == 1:
+        return np.zeros( 1, np.int64 ), np.zeros( 1, np.float64 )
+
+    Index, Weight \
+      = GetInterpolationWeights \
+          ( Time, np.linspace( Time[0], Time[-1], nFrames ) )
+
+    return Index, Weight
+
+# End of PlanFramesInTime
+
+def GetFrame( Y, Index, Weight, iFrame ):
+
+    # Row iFrame of a movie planned with PlanFramesByChange or
+    # PlanFramesInTime, from the snapshots Y ( nSS, ... )
+
+    i = Index [iFrame]
+    w = Weight[iFrame]
+
+    if w == 0.0: return Y[i]
+
+    return ( 1.0 - w ) * Y[i] + w * Y[i+1]
+
+# End of GetFrame
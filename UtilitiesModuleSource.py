@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+
+# --- Import libraries ---
+
+import numpy as np
+
+from UtilitiesModuleHDF import ReadFieldsHDF, ComputeCellAverageHDF
+from UtilitiesModuleComparison import CompareRuns
+
+"""
+
+One interface to the snapshots of a run, whether written by native
+thornado (HDF5, see UtilitiesModuleHDF.py) or by thornado-AMReX (plotfiles,
+read through MakeDataFile.py and the binary cache of MakeBinaryDataFile.py).
+
+A SnapshotSource gives, for the same field names in both cases,
+
+  GetTime()          : ( nSS, )    snapshot times
+  GetX1()            : ( nX, )     cell centers
+  GetField( Field )  : ( nSS, nX ) cell values (cell averages for native
+                                   runs) of iX2 = iX3 = 0
+  GetUnit( Field )   : unit string
+
+Every array is read once and then served from the source's cache, so
+code written against a SnapshotSource (decade finding, movies,
+comparisons) works and is optimized for both kinds of run at once.
+
+Both backends accept X1Window = [ x1L, x1H ] (km), restricting every array
+to the cells covering that radial window; only those cells are read.
+
+"""
+
+class SnapshotSource:
+
+    # Base class; backends implement ReadTime, ReadX1, ReadFields and
+    # ReadUnit
+
+    def __init__( self ):
+
+        self.Cache = {}
+
+        return
+
+    def GetTime( self ):
+
+        if not 'Time' in self.Cache: self.Cache['Time'] = self.ReadTime()
+
+        return self.Cache['Time']
+
+    def GetX1( self ):
+
+        if not 'X1' in self.Cache: self.Cache['X1'] = self.ReadX1()
+
+        return self.Cache['X1']
+
+    def GetFields( self, Fields ):
+
+        # { Field : ( nSS, nX ) }, reading all fields not yet cached at once
+
+        Missing = [ Field for Field in Fields if not Field in self.Cache ]
+
+        if len( Missing ) > 0: self.Cache.update( self.ReadFields( Missing ) )
+
+        return { Field : self.Cache[Field] for Field in Fields }
+
+    def GetField( self, Field ):
+
+        return self.GetFields( [ Field ] )[Field]
+
+    def GetUnit( self, Field ):
+
+        return self.ReadUnit( Field )
+
+    def GetShape( self ):
+
+        return ( self.GetTime().shape[0], self.GetX1().shape[0] )
+
+# End of SnapshotSource
+
+class NativeSource( SnapshotSource ):
+
+    # Native thornado snapshots PathToData_(Fluid|Geometry)Fields_######.h5.
+    # Fields are cell-averaged (see ComputeCellAverageHDF), through the
+    # on-disk cache if UseCache is True; the remaining arguments are passed
+    # to ReadFieldsHDF.
+
+    def __init__( self, PathToData, Snapshots, nWorkers = 1, UseCube = True, \
+                  dtype = np.float64, UseCache = False, X1Window = None ):
+
+        SnapshotSource.__init__( self )
+
+        self.PathToData = PathToData
+        self.Snapshots  = np.array( Snapshots, np.int64 )
+        self.nWorkers   = nWorkers
+        self.UseCube    = UseCube
+        self.dtype      = dtype
+        self.UseCache   = UseCache
+        self.X1Window   = X1Window
+
+        self.names = None
+
+        return
+
+    def GetNames( self ):
+
+        # The FieldsHDF mapping behind this source; fields are read lazily,
+        # so creating it reads only the spatial grid
+
+        if self.names is None:
+
+            self.names = ReadFieldsHDF \
+                           ( self.PathToData, self.Snapshots, \
+                             CoordinateSystem = 'SPHERICAL', \
+                             UsePhysicalUnits = True, \
+                             UseGeometryFields = True, \
+                             nWorkers = self.nWorkers, \
+                             UseCube = self.UseCube, \
+                             dtype = self.dtype, \
+                             X1Window = self.X1Window )
+
+        return self.names
+
+    def ReadTime( self ):
+
+        return np.array( self.GetNames()['Time'][1], np.float64 )
+
+    def ReadX1( self ):
+
+        return np.array( self.GetNames()['X1_C'][1], np.float64 )
+
+    def ReadFields( self, Fields ):
+
+        names = self.GetNames()
+
+        if self.UseCache:
+            return ComputeCellAverageHDF( names, Fields, UseCache = True )
+
+        # One pass over the snapshot files for all fields
+        names.Load( Fields + [ 'GF_SqrtGm' ] )
+
+        return ComputeCellAverageHDF( names, Fields )
+
+    def ReadUnit( self, Field ):
+
+        return self.GetNames()[Field][0]
+
+# End of NativeSource
+
+class AMReXSource( SnapshotSource ):
+
+    # thornado-AMReX plotfiles plotFileDirectory/plotFileBaseName########.
+    # Each field is extracted once with MakeDataFile into DataDirectory,
+    # packed into the binary cache and memory-mapped. The remaining
+    # arguments, but X1Window, are those of MakeDataFile. All snapshots must
+    # share one grid; pass LeafElementLocations (MakeDataFile's LEL) to
+    # sample an adaptive mesh on a fixed grid.
+
+    def __init__( self, plotFileDirectory, plotFileBaseName, DataDirectory, \
+                  SSi = -1, SSf = -1, nSS = -1, plotEvery = 1, \
+                  MaxLevel = -1, LeafElementLocations = None, \
+                  X1Window = None, Verbose = False ):
+
+        SnapshotSource.__init__( self )
+
+        if not plotFileDirectory[-1] == '/': plotFileDirectory += '/'
+        if not DataDirectory    [-1] == '/': DataDirectory     += '/'
+
+        self.plotFileDirectory    = plotFileDirectory
+        self.plotFileBaseName     = plotFileBaseName
+        self.DataDirectory        = DataDirectory
+        self.SSi                  = SSi
+        self.SSf                  = SSf
+        self.nSS                  = nSS
+        self.plotEvery            = plotEvery
+        self.MaxLevel             = MaxLevel
+        self.LeafElementLocations = LeafElementLocations
+        self.X1Window             = X1Window
+        self.Verbose              = Verbose
+
+        self.plotFileArray = None
+
+        return
+
+    def MakeDataFiles( self, Field ):
+
+        # MakeDataFile needs yt, so it is only imported by this backend
+
+        from MakeDataFile import MakeDataFile
+
+        kwargs = {}
+        if self.LeafElementLocations is not None:
+            kwargs['LEL'] = self.LeafElementLocations
+
+        plotFileArray \
+          = MakeDataFile( Field, self.plotFileDirectory, self.DataDirectory, \
+                          self.plotFileBaseName, 'spherical', \
+                          SSi = self.SSi, SSf = self.SSf, nSS = self.nSS, \
+                          forceChoiceD = False, owD = False, \
+                          forceChoiceF = False, owF = False, \
+                          UsePhysicalUnits = True, \
+                          MaxLevel = self.MaxLevel, Verbose = self.Verbose, \
+                          **kwargs )
+
+        # The plotfiles of the run, as selected by the comparison scripts:
+        # every plotEvery-th of all, or of SSi to SSf if nSS is given
+
+        if self.plotFileArray is None:
+
+            if self.nSS < 0:
+                self.plotFileArray \
+                  = np.copy( plotFileArray[::self.plotEvery] )
+            else:
+                self.plotFileArray \
+                  = np.copy( plotFileArray[self.SSi:self.SSf+1:self.plotEvery] )
+
+        return
+
+    def MakeBinaryCache( self, Field ):
+
+        from MakeBinaryDataFile import MakeBinaryDataFile
+
+        # Time and X1 are written by MakeDataFile along with any field
+
+        if Field in [ 'Time', 'X1' ]:
+            if self.plotFileArray is None: self.MakeDataFiles( 'PF_D' )
+        else:
+            self.MakeDataFiles( Field )
+
+        MakeBinaryDataFile( Field, self.DataDirectory, self.plotFileArray, \
+                            Verbose = self.Verbose )
+
+        return
+
+    def ReadBinaryCache( self, Field ):
+
+        from MakeBinaryDataFile import ReadBinaryDataFile
+
+        self.MakeBinaryCache( Field )
+
+        # A window is cut on the cells of the X1 cache, which must then
+        # exist and hold the same plotfiles
+
+        if self.X1Window is not None and not Field == 'X1':
+            self.MakeBinaryCache( 'X1' )
+
+        return ReadBinaryDataFile( self.DataDirectory, Field, \
+                                   X1Window = self.X1Window )
+
+    def ReadTime( self ):
+
+        return np.array( self.ReadBinaryCache( 'Time' ), np.float64 )
+
+    def ReadX1( self ):
+
+        return np.array( self.ReadBinaryCache( 'X1' )[0], np.float64 ).ravel()
+
+    def ReadFields( self, Fields ):
+
+        Data = {}
+
+        for Field in Fields:
+
+            Views = self.ReadBinaryCache( Field )
+
+            if not len( set( [ View.size for View in Views ] ) ) == 1:
+
+                print( 'AMReXSource: the grid of {:} changes between' \
+                       .format( Field ) \
+                       + ' snapshots; use LeafElementLocations' )
+                exit()
+
+            Data[Field] = np.stack( [ View.ravel() for View in Views ] )
+
+        return Data
+
+    def ReadUnit( self, Field ):
+
+        from MakeBinaryDataFile import ReadBinaryHeader
+
+        self.MakeBinaryCache( Field )
+
+        return ReadBinaryHeader( self.DataDirectory, Field )[1]
+
+# End of AMReXSource
+
+def CompareSources( SourceA, SourceB, Field, Weights = None, FieldB = None ):
+
+    # Compare Field of SourceB to SourceA at the snapshot times of SourceA
+    # (see CompareRuns); the sources must share the grid.
+    # FieldB: the name of the field in SourceB, if it differs from Field
+
+    if FieldB is None: FieldB = Field
+
+    if not SourceA.GetX1().shape == SourceB.GetX1().shape:
+
+        print( 'CompareSources: the sources have different grids' )
+        exit()
+
+    return CompareRuns( SourceA.GetTime(), SourceA.GetField( Field ), \
+                        SourceB.GetTime(), SourceB.GetField( FieldB ), \
+                        Weights = Weights )
+
+# End of CompareSources
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+# --- Import libraries ---
+
+import numpy as np
+
+def FindFirstCrossings( GetValue, nSS, Thresholds, UseBisection = True, \
+                        indMax = None, Stride = None ):
+
+    # For each of the increasing Thresholds, find the first snapshot iSS
+    # ( 0 <= iSS < nSS ) with GetValue( iSS ) > Threshold, and the maximum
+    # of GetValue over all snapshots.
+    #
+    # With UseBisection, GetValue is assumed to rise to its maximum and
+    # not to exceed it afterwards (e.g., the central density through
+    # bounce). Unless the caller knows indMax, the index of the maximum
+    # (e.g., from the snapshot index), it is located first: GetValue is
+    # probed every Stride snapshots (default sqrt( nSS / 2 )), and the
+    # maximum is taken snapshot by snapshot around the first coarse probe
+    # followed by a smaller one. Each crossing is then found by bisection
+    # on [ 0, indMax ], so some 2 sqrt( 2 nSS ) + O(log nSS) snapshots are
+    # probed in all; thresholds not below the maximum are never crossed.
+    # If any probed values on [ 0, indMax ] decrease, any probed value
+    # (such as a coarse probe after bounce) exceeds the maximum, or a
+    # crossing has a larger probed value before it, this falls back to a
+    # linear scan over all snapshots.
+    #
+    # Returns ind ( -1 where a threshold is never crossed ), MaxValue and
+    # indMax.
+
+    Probed = {}
+
+    def Probe( iSS ):
+
+        if not iSS in Probed: Probed[iSS] = GetValue( iSS )
+
+        return Probed[iSS]
+
+    nT = len( Thresholds )
+
+    ind = np.full( nT, -1, np.int64 )
+
+    if UseBisection and indMax is None:
+
+        if Stride is None: Stride = max( 1, int( np.sqrt( nSS / 2 ) ) )
+
+        Coarse = list( range( 0, nSS, Stride ) )
+        if not Coarse[-1] == nSS - 1: Coarse.append( nSS - 1 )
+
+        Values = [ Probe( iSS ) for iSS in Coarse ]
+
+        # The maximum lies between the neighbors of the first coarse probe
+        # followed by a smaller one (the last one, if there is none)
+
+        iC = len( Coarse ) - 1
+        for i in range( len( Coarse ) - 1 ):
+            if Values[i+1] < Values[i]:
+                iC = i
+                break
+
+        Bracket = range( Coarse[max( 0, iC - 1 )], \
+                         Coarse[min( len( Coarse ) - 1, iC + 1 )] + 1 )
+
+        indMax = Bracket[np.argmax( [ Probe( iSS ) for iSS in Bracket ] )]
+
+    if UseBisection:
+
+        MaxValue = Probe( indMax )
+
+        # The first snapshot at the maximum, should the values plateau
+        # ( Probe( lo ) < MaxValue <= Probe( hi ) )
+
+        lo = -1
+        hi = indMax
+
+        while hi - lo > 1:
+
+            mid = ( lo + hi ) // 2
+
+            if Probe( mid ) >= MaxValue:
+                hi = mid
+            else:
+                lo = mid
+
+        indMax = hi
+
+        iLo = 0
+
+        for iT in range( nT ):
+
+            # This and all higher thresholds are never crossed
+
+            if not MaxValue > Thresholds[iT]: break
+
+            if Probe( iLo ) > Thresholds[iT]:
+
+                ind[iT] = iLo
+
+                continue
+
+            # Invariant: Probe( lo ) <= Threshold < Probe( hi )
+
+            lo = iLo
+            hi = indMax
+
+            while hi - lo > 1:
+
+                mid = ( lo + hi ) // 2
+
+                if Probe( mid ) > Thresholds[iT]:
+                    hi = mid
+                else:
+                    lo = mid
+
+            ind[iT] = hi
+            iLo     = hi
+
+        # Check the assumptions against everything probed: the values up to
+        # indMax do not decrease, none exceeds the maximum, and no snapshot
+        # before a crossing lies above its threshold
+
+        Indices = np.array( sorted( Probed ), np.int64 )
+        Values  = np.array( [ Probed[iSS] for iSS in Indices ] )
+
+        Rising = Values[Indices <= indMax]
+
+        IsValid = np.all( np.diff( Rising ) >= 0.0 ) \
+                    and np.all( Values <= MaxValue )
+
+        for iT in range( nT ):
+
+            if not IsValid: break
+
+            if ind[iT] < 0: continue
+
+            IsValid = Probe( ind[iT] ) > Thresholds[iT] \
+                        and np.all( Values[Indices < ind[iT]] \
+                                      <= Thresholds[iT] )
+
+        if IsValid:
+
+            print( '  Probed {:}/{:} snapshots'.format( len( Probed ), nSS ) )
+
+            return ind, MaxValue, indMax
+
+        print( '  Values are not non-decreasing up to the maximum,' \
+               + ' falling back to a linear scan' )
+
+        ind[:] = -1
+
+    Values = np.array( [ Probe( iSS ) for iSS in range( nSS ) ] )
+
+    for iT in range( nT ):
+
+        Crossed = np.nonzero( Values > Thresholds[iT] )[0]
+
+        if Crossed.shape[0] > 0: ind[iT] = Crossed[0]
+
+    indMax = np.argmax( Values )
+
+    return ind, Values[indMax], indMax
+
+# End of FindFirstCrossings
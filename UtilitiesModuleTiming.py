@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+# --- Import libraries ---
+
+import time
+import json
+import atexit
+from contextlib import contextmanager
+
+"""
+
+Stage-level timing of the analysis routines. Stages (HDF5 open, dataset
+reads, derived fields, cell averages, frame encoding, ...) are timed with
+
+  with Timer( 'Stage' ):
+      ...
+
+and bytes read are recorded with AddBytes( 'Stage', nBytes ). Both do
+nothing until EnableTiming is called, e.g., at the top of a script:
+
+  from UtilitiesModuleTiming import EnableTiming
+  EnableTiming( 'TimingReport.json' )
+
+The report (wall time, bytes and call count per stage) is then printed and
+written as JSON when the script exits. Work done in worker processes is
+timed as a whole by the parent process.
+
+"""
+
+UseTiming = False
+
+# Stage : { 'Time' : seconds, 'Bytes' : bytes, 'Calls' : count }
+Stages = {}
+
+tStart = None
+
+def EnableTiming( ReportFileName = 'TimingReport.json' ):
+
+    # Start recording; the report is written to ReportFileName at exit
+    # (or not at all if ReportFileName is None, see WriteTimingReport)
+
+    global UseTiming, tStart
+
+    UseTiming = True
+    tStart    = time.perf_counter()
+
+    if ReportFileName is not None:
+        atexit.register( WriteTimingReport, ReportFileName )
+
+    return
+
+# End of EnableTiming
+
+def AddTiming( Stage, Time, nBytes = 0, nCalls = 1 ):
+
+    if not UseTiming: return
+
+    if not Stage in Stages:
+        Stages[Stage] = { 'Time' : 0.0, 'Bytes' : 0, 'Calls' : 0 }
+
+    Stages[Stage]['Time' ] += Time
+    Stages[Stage]['Bytes'] += int( nBytes )
+    Stages[Stage]['Calls'] += nCalls
+
+    return
+
+# End of AddTiming
+
+def AddBytes( Stage, nBytes ):
+
+    AddTiming( Stage, 0.0, nBytes = nBytes, nCalls = 0 )
+
+    return
+
+# End of AddBytes
+
+@contextmanager
+def Timer( Stage, nBytes = 0 ):
+
+    # Time the enclosed block as one call of Stage
+
+    if not UseTiming:
+        yield
+        return
+
+    tLo = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        AddTiming( Stage, time.perf_counter() - tLo, nBytes = nBytes )
+
+# End of Timer
+
+def WriteTimingReport( ReportFileName = 'TimingReport.json' ):
+
+    if not UseTiming: return
+
+    TotalTime = time.perf_counter() - tStart
+
+    print( '\n  Timing report (total wall time: {:.3f} s)\n'.format \
+           ( TotalTime ) )
+    print( '  {:<28s} {:>12s} {:>7s} {:>12s} {:>8s}'.format \
+           ( 'Stage', 'Time [s]', '[%]', 'Bytes', 'Calls' ) )
+
+    for Stage in Stages:
+
+        print( '  {:<28s} {:>12.3f} {:>7.1f} {:>12d} {:>8d}'.format \
+               ( Stage, Stages[Stage]['Time'], \
+                 100.0 * Stages[Stage]['Time'] / max( TotalTime, 1.0e-300 ), \
+                 Stages[Stage]['Bytes'], Stages[Stage]['Calls'] ) )
+
+    if ReportFileName is not None:
+
+        with open( ReportFileName, 'w' ) as f:
+
+            json.dump( { 'TotalTime' : TotalTime, 'Stages' : Stages }, \
+                       f, indent = 2 )
+
+        print( '\n  Wrote {:}'.format( ReportFileName ) )
+
+    return
+
+# End of WriteTimingReport
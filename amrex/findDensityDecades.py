@@ -6,21 +6,40 @@ import matplotlib.pyplot as plt
 import sys
 sys.path.append( '../' )
 
-from UtilitiesModule import GetFileArray
-from MakeDataFile import MakeDataFile, ReadHeader
+from UtilitiesModule import GetFileArray, GetData
+from MakeDataFile import MakeDataFile
+from MakeBinaryDataFile import MakeBinaryDataFile, ReadBinaryDataFile
+from UtilitiesModuleTimeSeries import FindFirstCrossings
 from setGlobalVariables import *
 
 class DensityDecadesAMReX:
 
-  def __init__( self, plotFileDirectory, plotFileBaseName, dataFileDirectory ):
+  def __init__( self, plotFileDirectory, plotFileBaseName, dataFileDirectory, \
+                UseBisection = True, indMax = None ):
+
+    # UseBisection: read the central density of only O(sqrt(nSS))
+    #               plotfiles, to locate the maximum, and O(log nSS) per
+    #               decade (see FindFirstCrossings) instead of making data
+    #               files for all plotfiles
+    # indMax:       the snapshot of the maximum central density, if known
+    #               (e.g., indMax in densityDecades.txt of an earlier run
+    #               over the same plotfiles); saves locating it
 
     self.plotFileArray = GetFileArray( plotFileDirectory, plotFileBaseName )
     self.dataFileDirectory = dataFileDirectory
 
+    self.plotFileDirectory = plotFileDirectory
+    self.plotFileBaseName  = plotFileBaseName
+    self.UseBisection      = UseBisection
+    self.indMax            = indMax
+    self.Probed            = {}
+
     self.SSi = 0
     self.SSf = self.plotFileArray.shape[0] - 1
     self.nSS = self.plotFileArray.shape[0]
 
+    if self.UseBisection: return
+
     MakeDataFile( 'PF_D', plotFileDirectory, dataFileDirectory, \
                   plotFileBaseName, 'spherical', \
                   SSi = self.SSi, SSf = self.SSf, nSS = self.nSS, \
@@ -29,57 +48,63 @@ class DensityDecadesAMReX:
 
     if( not self.dataFileDirectory[-1] == '/' ): self.dataFileDirectory += '/'
 
-    return
+    # Pack the text files into the binary cache (once), then map it
 
-  def FindDensityDecades( self ):
+    plotFiles = [ plotFile[-8:] for plotFile in self.plotFileArray ]
 
-    self.DensityDecades = np.logspace( 10, 15, 6 )
-    self.FoundDecade    \
-      = np.array( [ False, False, False, False, False, False ], bool )
+    for Name in [ 'Time', 'PF_D' ]:
+      MakeBinaryDataFile( Name, self.dataFileDirectory, plotFiles, \
+                          Verbose = True )
 
-    self.ind = np.empty( (self.DensityDecades.shape[0]), np.int64 )
-    self.t   = np.empty( (self.DensityDecades.shape[0]), np.int64 )
+    self.PF_D = ReadBinaryDataFile( self.dataFileDirectory, 'PF_D' )
+    self.Time = ReadBinaryDataFile( self.dataFileDirectory, 'Time' )
 
-    Density    = 0.0
-    MaxDensity = 0.0
-    tMax       = 0.0
-    indMax     = 0
+    return
 
-    for t in range( self.nSS ):
+  def GetCentralValues( self, t ):
 
-      iSS = self.SSi \
-              + np.int64( ( self.SSf - self.SSi  ) / ( self.nSS - 1 ) * t )
+    # Central density and time of the t-th snapshot, from the data files
+    # or, with UseBisection, read from that single plotfile
 
-      if t % 100 == 0:
-        print( '  {:}/{:}'.format( t, self.nSS ) )
+    iSS = self.SSi \
+            + np.int64( ( self.SSf - self.SSi  ) / ( self.nSS - 1 ) * t )
 
-      dataDir \
-        = self.dataFileDirectory + self.plotFileArray[iSS][-8:] + '/'
+    if not self.UseBisection:
+      return self.PF_D[iSS][0], np.float64( self.Time[iSS] )
 
-      dataFile = dataDir + 'PF_D.dat'
-      timeFile = dataDir + 'Time.dat'
+    if not iSS in self.Probed:
 
-      DataShape, DataUnits, MinVal, MaxVal = ReadHeader( dataFile )
+      Data, DataUnit, X1, X2, X3, dX1, dX2, dX3, xl, xh, nX, Time \
+        = GetData( self.plotFileDirectory, self.plotFileBaseName, 'PF_D', \
+                   'spherical', True, \
+                   argv = [ 'x', str( self.plotFileArray[iSS] ) ], \
+                   MaxLevel = -1, \
+                   ReturnTime = True, ReturnMesh = True, Verbose = False )
 
-      Data = np.loadtxt( dataFile ).reshape( np.int64( DataShape ) )
-      Density = Data[0]
+      self.Probed[iSS] = [ Data[0,0,0], Time ]
 
-      Time = np.loadtxt( timeFile )
+    return self.Probed[iSS]
 
-      if Density > MaxDensity:
+  def FindDensityDecades( self ):
+
+    self.DensityDecades = np.logspace( 10, 15, 6 )
 
-        MaxDensity = Density
-        tMax       = Time
-        indMax     = t
+    self.ind, MaxDensity, indMax \
+      = FindFirstCrossings \
+          ( lambda t: self.GetCentralValues( t )[0], \
+            self.nSS, self.DensityDecades, \
+            UseBisection = self.UseBisection, indMax = self.indMax )
 
-      for iDec in range( self.DensityDecades.shape[0] ):
+    self.FoundDecade = self.ind >= 0
 
-        if Density > self.DensityDecades[iDec] \
-             and not self.FoundDecade[iDec]:
+    self.t = np.full( (self.DensityDecades.shape[0]), np.nan, np.float64 )
 
-          self.FoundDecade[iDec] = True
-          self.ind        [iDec] = t
-          self.t          [iDec] = Time
+    for iDec in range( self.DensityDecades.shape[0] ):
+
+      if self.FoundDecade[iDec]:
+        self.t[iDec] = self.GetCentralValues( self.ind[iDec] )[1]
+
+    tMax = self.GetCentralValues( indMax )[1]
 
     string = ''
     string += str( self.ind ) + '\n'
@@ -106,8 +131,13 @@ if __name__ == '__main__':
 
   dataFileDirectory = '.{:s}_movieData'.format( ID )
 
+  # Snapshot of the maximum central density, if known; None -> located
+  # by FindFirstCrossings
+  indMax = None
+
   DD = DensityDecadesAMReX \
-         ( plotFileDirectory, plotFileBaseName, dataFileDirectory )
+         ( plotFileDirectory, plotFileBaseName, dataFileDirectory, \
+           UseBisection = True, indMax = indMax )
   DD.FindDensityDecades()
 
   import os
@@ -2,13 +2,17 @@
 
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib import animation
 plt.style.use( '../publication.sty' )
 
 import sys
 sys.path.append( '../' )
 
-from MakeDataFile import MakeDataFile, ReadHeader
+from MakeDataFile import MakeDataFile
+from MakeBinaryDataFile import MakeBinaryDataFile, ReadBinaryDataFile, \
+                               ReadBinaryHeader
+from UtilitiesModuleMovie import SaveMovie, PlanFramesByChange, \
+                                 PlanFramesInTime, GetFrame
+from UtilitiesModuleExtrema import ExtremaReduction
 from setGlobalVariables import *
 
 #### ========== User Input ==========
@@ -81,8 +85,28 @@ else:
   yScale  = 1.0e0
   yLabel = ''
 
+# Percentiles of all values used as the y-limits if UseCustomLimits is
+# False, e.g., [ 0.1, 99.9 ] to clip outliers; None -> minimum and maximum
+# (from the headers of the binary cache, without reading the data, unless
+# X1Window is set)
+yPercentiles = None
+
+# Radial window [ x1L, x1H ] (km) shown in the movie; only the cells
+# covering it are read. None -> [ xL, xH ] of setGlobalVariables, reading
+# every cell
+X1Window = None
+
 MovieRunTime = 10.0 # seconds
 
+# Frames of the movie: 'All' snapshots, nFrames snapshots chosen so each
+# frame shows a similar change ('Change'), or nFrames frames uniform in
+# time, interpolated between snapshots ('Time'); the last two need the
+# same grid in every snapshot
+FramePlan = 'All'
+nFrames   = 300
+
+nWorkers = 1 # Number of processes used to render the frames
+
 #### ====== End of User Input =======
 
 DataDirectory = '.{:s}_movieData'.format( ID )
@@ -103,35 +127,67 @@ plotFileArray \
 plotFileArray = np.copy( plotFileArray[::plotEvery] )
 if nSS < 0: nSS = plotFileArray.shape[0]
 
-time = np.empty( nSS, np.float64 )
-X1_C = np.empty( nSS, object )
-data = np.empty( nSS, object )
+# Pack the text files into the binary cache (once), then map it
 
-vmin = +np.inf
-vmax = -np.inf
+for Name in [ 'Time', 'X1', Field ]:
+  MakeBinaryDataFile( Name, DataDirectory, plotFileArray[:nSS], \
+                      Verbose = Verbose )
+
+time = np.array( ReadBinaryDataFile( DataDirectory, 'Time' ), np.float64 )
+X1_C = ReadBinaryDataFile( DataDirectory, 'X1', X1Window = X1Window )
+data = ReadBinaryDataFile( DataDirectory, Field, X1Window = X1Window )
 
 for t in range( nSS ):
+  X1_C[t] = X1_C[t].ravel()
+  data[t] = data[t].ravel()
+
+DataShape, DataUnits, MinVal, MaxVal \
+  = ReadBinaryHeader( DataDirectory, Field )
 
-  FileDirectory = DataDirectory + plotFileArray[t] + '/'
+if yPercentiles is None and X1Window is None:
 
-  TimeFile   = FileDirectory + '{:}.dat'.format( 'Time' )
-  X1DataFile = FileDirectory + '{:}.dat'.format( 'X1' )
-  DataFile   = FileDirectory + '{:}.dat'.format( Field )
+  vmin = MinVal.min() / yScale
+  vmax = MaxVal.max() / yScale
 
-  time[t] = np.loadtxt( TimeFile )
-  X1_C[t] = np.loadtxt( X1DataFile ).flatten()
-  data[t] = np.loadtxt( DataFile ).flatten()
+else:
 
-  DataShape, DataUnits, MinVal, MaxVal = ReadHeader( DataFile )
+  # One pass over the memory-mapped snapshots
 
-  vmin = min( vmin, MinVal / yScale )
-  vmax = max( vmax, MaxVal / yScale )
+  Extrema = ExtremaReduction( Percentiles = yPercentiles )
+  for t in range( nSS ):
+    Extrema.Update( data[t], PerPoint = False )
+
+  vmin, vmax = np.array( Extrema.GetLimits( yPercentiles ) ) / yScale
 
 fig, ax = plt.subplots( 1, 1 )
 time_text = ax.text( 0.1, 0.9, '', transform = ax.transAxes, fontsize = 13 )
 
 line, = ax.plot( [],[], 'k-', label = r'$u$' )
 
+if not UseCustomLimits:
+  yMin = vmin
+  yMax = vmax
+
+# Frame t shows GetFrame( Y, FrameIndex, FrameWeight, t ) of each array Y
+
+if FramePlan == 'Change':
+
+  FrameIndex, FrameWeight \
+    = PlanFramesByChange \
+        ( time, [ data ], nFrames, [ yMin * yScale, yMax * yScale ], \
+          UseLogScale = UseLogScale_Y and yMin > 0.0 )
+
+elif FramePlan == 'Time':
+
+  FrameIndex, FrameWeight = PlanFramesInTime( time, nFrames )
+
+else:
+
+  FrameIndex  = np.arange( nSS )
+  FrameWeight = np.zeros( nSS )
+
+nFrames = FrameIndex.shape[0]
+
 def InitializeFrame():
 
   line.set_data([],[])
@@ -143,25 +199,18 @@ def InitializeFrame():
 
 def UpdateFrame( t ):
 
-  print('\r    {:}/{:}'.format( t+1, nSS ), end = '\r' )
+  print('\r    {:}/{:}'.format( t+1, nFrames ), end = '\r' )
 
   time_text.set_text( r'$t={:.16e}\ \mathrm{{ms}}$' \
-                      .format( time[t] ) )
+                      .format( GetFrame( time, FrameIndex, FrameWeight, t ) ) )
 
-  line.set_data( X1_C[t], data[t] / yScale )
+  line.set_data( X1_C[FrameIndex[t]], \
+                 GetFrame( data, FrameIndex, FrameWeight, t ) / yScale )
 
   ret = ( line, time_text )
 
   return ret
 
-anim = animation.FuncAnimation( fig, UpdateFrame, \
-                                init_func = InitializeFrame, \
-                                frames = nSS, \
-                                blit = True )
-if not UseCustomLimits:
-  yMin = vmin
-  yMax = vmax
-
 ax.set_title( r'$\texttt{{{:}}}$'.format( ID ), fontsize = 15 )
 
 ax.set_xscale( 'log' )
@@ -170,14 +219,18 @@ if UseLogScale_Y: ax.set_yscale( 'log' )
 ax.set_xlabel( xLabel )
 ax.set_ylabel( yLabel )
 
-ax.set_xlim( xL, xH )
+if X1Window is None:
+  ax.set_xlim( xL, xH )
+else:
+  ax.set_xlim( X1Window )
 ax.set_ylim( yMin, yMax )
 
-fps = max( 1, nSS / MovieRunTime )
+fps = max( 1, nFrames / MovieRunTime )
 
 print( '\n  Making movie' )
 print( '  ------------' )
-anim.save( MovieName, fps = fps, dpi = 300 )
+SaveMovie( fig, UpdateFrame, InitializeFrame, nFrames, MovieName, \
+           fps = fps, dpi = 300, nWorkers = nWorkers )
 print()
 
 import os
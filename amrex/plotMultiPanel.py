@@ -20,30 +20,78 @@ class MultiPanel:
     self.plotFileBaseName = 'YahilCollapse_XCFC.plt'
     self.snapShots = snapShots
 
+    self.plotFileArray = None
+
     return
 
-  def GetData( self, Field ):
+  def GetPlotFileArray( self ):
+
+    # The directory listing, made once
+
+    if self.plotFileArray is None:
+      self.plotFileArray \
+        = GetFileArray( self.plotFileDirectory, self.plotFileBaseName )
+
+    return self.plotFileArray
+
+  def GetFields( self, Fields ):
+
+    # Read Fields from each snapshot with GetData, so values, units and
+    # mesh are those of GetData( Field ). Returns { Field : Data },
+    # { Field : DataUnit }, X1, dX1, xl, xh and Time, with Data, X1, dX1
+    # ( nSS, ) arrays of ( nX1, ) arrays and Time ( nSS, ).
+    #
+    # Each plotfile is loaded, and its header and mesh hierarchy parsed,
+    # once: the dataset is held while GetData is called for each field, and
+    # yt hands the already parsed dataset to GetData's own yt.load (yt
+    # keeps loaded datasets, by path, for as long as they are referenced).
+
+    import yt
+
+    plotFileArray = self.GetPlotFileArray()
+
+    nSS = self.snapShots.shape[0]
+
+    Data     = {}
+    DataUnit = {}
+    for Field in Fields:
+      Data[Field] = np.empty( nSS, object )
 
-    plotFileArray \
-      = GetFileArray( self.plotFileDirectory, self.plotFileBaseName )
+    X1   = np.empty( nSS, object )
+    dX1  = np.empty( nSS, object )
+    Time = np.empty( nSS, np.float64 )
 
-    Data = np.empty( self.snapShots.shape[0], object )
-    X1   = np.empty( self.snapShots.shape[0], object )
-    dX1  = np.empty( self.snapShots.shape[0], object )
-    for iSS in range( self.snapShots.shape[0] ):
+    for iSS in range( nSS ):
 
-      d, DataUnit, r, X2, X3, dr, dX2, dX3, xl, xh, nX, Time \
-        = GetData( self.plotFileDirectory, self.plotFileBaseName, Field, \
-                   'spherical', True, \
-                   argv = ['x',str( plotFileArray[self.snapShots[iSS]] )], \
-                   MaxLevel = -1, \
-                   ReturnTime = True, ReturnMesh = True, Verbose = False )
-      Data[iSS] = d [:,0,0]
-      X1  [iSS] = r [:,0,0]
-      dX1 [iSS] = dr[:,0,0]
+      plotFile = str( plotFileArray[self.snapShots[iSS]] )
+
+      ds = yt.load( self.plotFileDirectory + plotFile )
+      ds.index
+
+      for Field in Fields:
+
+        d, DataUnit[Field], r, X2, X3, dr, dX2, dX3, xl, xh, nX, Time[iSS] \
+          = GetData( self.plotFileDirectory, self.plotFileBaseName, Field, \
+                     'spherical', True, \
+                     argv = [ 'x', plotFile ], \
+                     MaxLevel = -1, \
+                     ReturnTime = True, ReturnMesh = True, Verbose = False )
+
+        Data[Field][iSS] = d[:,0,0]
+
+      X1 [iSS] = r [:,0,0]
+      dX1[iSS] = dr[:,0,0]
+
+      del ds
 
     return Data, DataUnit, X1, dX1, xl, xh, Time
 
+  def GetData( self, Field ):
+
+    Data, DataUnit, X1, dX1, xl, xh, Time = self.GetFields( [ Field ] )
+
+    return Data[Field], DataUnit[Field], X1, dX1, xl, xh, Time[-1]
+
 if __name__ == '__main__':
 
   saveFig = False
@@ -65,12 +113,16 @@ if __name__ == '__main__':
     = MultiPanel \
         ( plotFileDirectory, snapShots = snapShots )
 
-  PF_D , unit_PF_D , X1, dX1, xl, xh, Time = MP.GetData( 'PF_D'      )
-  GF_b1, unit_GF_b1, X1, dX1, xl, xh, Time = MP.GetData( 'GF_Beta_1' )
-  PF_V1, unit_PF_V1, X1, dX1, xl, xh, Time = MP.GetData( 'PF_V1'     )
-  AF_P , unit_AF_P , X1, dX1, xl, xh, Time = MP.GetData( 'AF_P'      )
-  GF_CF, unit_GF_CF, X1, dX1, xl, xh, Time = MP.GetData( 'GF_Psi'    )
-  GF_Al, unit_GF_Al, X1, dX1, xl, xh, Time = MP.GetData( 'GF_Alpha'  )
+  Data, Units, X1, dX1, xl, xh, Time \
+    = MP.GetFields( [ 'PF_D', 'GF_Beta_1', 'PF_V1', 'AF_P', 'GF_Psi', \
+                      'GF_Alpha' ] )
+
+  PF_D  = Data['PF_D'     ]
+  GF_b1 = Data['GF_Beta_1']
+  PF_V1 = Data['PF_V1'    ]
+  AF_P  = Data['AF_P'     ]
+  GF_CF = Data['GF_Psi'   ]
+  GF_Al = Data['GF_Alpha' ]
 
   color = ['#377eb8', '#ff7f00', '#4daf4a', \
            '#f781bf', '#a65628', '#984ea3', \
@@ -91,7 +143,7 @@ if __name__ == '__main__':
   for iSS in range( nSS ):
 
     axs[0,0].semilogy( X1[iSS], PF_D [iSS], '-', c = color[iSS], \
-                       label = 'Time = {:.3e} ms'.format( Time ) )
+                       label = 'Time = {:.3e} ms'.format( Time[iSS] ) )
     axs[1,0].semilogy( X1[iSS], AF_P [iSS], '-', c = color[iSS] )
 
     if ( iSS == 0 ) :
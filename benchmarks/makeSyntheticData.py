@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+import os
+import numpy as np
+import h5py as h5
+
+import sys
+sys.path.append( '../' )
+
+from UtilitiesModuleHDF import FieldsTableHDF, GridFieldsHDF
+
+"""
+
+Writes synthetic Yahil-like collapse snapshots in the layout of native
+thornado output, i.e.,
+
+  <PathToData>_FluidFields_######.h5    : Time, Spatial Grid,
+                                          Fluid Fields/Primitive|Conserved|
+                                          Auxiliary|Diagnostic
+  <PathToData>_GeometryFields_######.h5 : Geometry Fields
+
+with every dataset listed in FieldsTableHDF, so that everything reading
+native output (ReadFieldsHDF, ProbeFieldsHDF, MakeCubeHDF, ...) can be
+run and timed without production data. Optionally, the binary cache read
+by the AMReX scripts (see MakeBinaryDataFile.py) is written for a few
+fields on the same grid.
+
+The central density grows from 1e10 to 2e15 g/cm^3 over the run, so every
+density decade searched for by findDensityDecades.py is crossed.
+
+Usage:
+  $ python3 makeSyntheticData.py
+
+"""
+
+def GetSyntheticGrid( nX, nNodes, xL = 1.0e-1, xH = 2.0e5 ):
+
+    # Logarithmically spaced elements on [ xL, xH ] km with nNodes
+    # Gauss-Legendre nodes each. Returns the node and element-center
+    # coordinates and the element widths.
+
+    xE  = np.logspace( np.log10( xL ), np.log10( xH ), nX + 1 )
+    X1C = 0.5 * ( xE[1:] + xE[:-1] )
+    dX1 = xE[1:] - xE[:-1]
+
+    eta = 0.5 * np.polynomial.legendre.leggauss( nNodes )[0]
+
+    X1 = ( X1C[:,np.newaxis] + eta * dX1[:,np.newaxis] ).reshape( -1 )
+
+    return X1, X1C, dX1
+
+# End of GetSyntheticGrid
+
+def GetSyntheticFields( X1, iSS, nSS, RunTime ):
+
+    # Fields of snapshot iSS at the nodes X1 [km]
+
+    Time = RunTime * iSS / max( 1, nSS - 1 )
+
+    Gamma = 1.30
+    Kappa = 6.0e27 / 7.0e9**Gamma
+
+    # Central density from 1e10 to 2e15 g/cm^3, core radius shrinking
+    # as rho_c^(-(2-Gamma)/2)
+    rho_c = 1.0e10 * 10.0**( 5.3 * iSS / max( 1, nSS - 1 ) )
+    r_c   = 1.0e3 * ( rho_c / 1.0e10 )**( -0.5 * ( 2.0 - Gamma ) )
+
+    x = X1 / r_c
+
+    D  = rho_c / ( 1.0 + x**2 )
+    P  = Kappa * D**Gamma
+    E  = P / ( Gamma - 1.0 )
+    V1 = -1.0e4 * x / ( 1.0 + x**2 ) * ( rho_c / 1.0e15 )**0.25
+    Cs = np.sqrt( Gamma * P / ( D + ( E + P ) / 2.99792458e10**2 ) ) / 1.0e5
+
+    Psi   = 1.0 + 0.05 * ( rho_c / 1.0e15 ) / ( 1.0 + x )
+    Alpha = 1.0 / Psi**2
+
+    Theta = np.pi / 2.0
+
+    Fields = {}
+
+    Fields['PF_D' ] = D
+    Fields['PF_V1'] = V1
+    Fields['PF_V2'] = np.zeros_like( X1 )
+    Fields['PF_V3'] = np.zeros_like( X1 )
+    Fields['PF_E' ] = E
+    Fields['PF_Ne'] = 0.5 * D / 1.66053904e-24
+    Fields['AF_P' ] = P
+    Fields['AF_Cs'] = Cs
+    Fields['AF_Gm'] = np.full_like( X1, Gamma )
+    Fields['AF_Ye'] = np.full_like( X1, 0.5 )
+
+    Fields['GF_Psi'   ] = Psi
+    Fields['GF_Alpha' ] = Alpha
+    Fields['GF_Phi_N' ] = -0.05 * ( rho_c / 1.0e15 ) / ( 1.0 + x )
+    Fields['GF_h_1'   ] = Psi**2
+    Fields['GF_h_2'   ] = Psi**2 * X1
+    Fields['GF_h_3'   ] = Psi**2 * X1 * np.sin( Theta )
+    Fields['GF_Gm_11' ] = Fields['GF_h_1']**2
+    Fields['GF_Gm_22' ] = Fields['GF_h_2']**2
+    Fields['GF_Gm_33' ] = Fields['GF_h_3']**2
+    Fields['GF_SqrtGm'] = Fields['GF_h_1'] * Fields['GF_h_2'] \
+                            * Fields['GF_h_3']
+
+    W = 1.0 / np.sqrt( 1.0 - Fields['GF_Gm_11'] * V1**2 / 2.99792458e5**2 )
+
+    Fields['CF_D' ] = W * D
+    Fields['CF_S1'] = W**2 * ( D + E + P ) * Fields['GF_Gm_11'] * V1
+    Fields['CF_S2'] = np.zeros_like( X1 )
+    Fields['CF_S3'] = np.zeros_like( X1 )
+    Fields['CF_E' ] = W**2 * ( D + E + P ) - P - W * D
+    Fields['CF_Ne'] = W * Fields['PF_Ne']
+
+    # Everything else (shift, diagnostics) is zero
+    for Field in FieldsTableHDF:
+        if not Field in Fields: Fields[Field] = np.zeros_like( X1 )
+
+    return Time, Fields
+
+# End of GetSyntheticFields
+
+def MakeSyntheticNativeData( PathToData, nSS, nX, nNodes, RunTime = 10.0, \
+                             Verbose = True ):
+
+    # Write nSS snapshots with nX elements of nNodes nodes each
+
+    Directory = os.path.dirname( os.path.abspath( PathToData ) )
+    if not os.path.isdir( Directory ): os.makedirs( Directory )
+
+    X1, X1C, dX1 = GetSyntheticGrid( nX, nNodes )
+
+    Grid = { 'X1'   : X1, \
+             'X1_C' : X1C, \
+             'X2'   : np.array( [ np.pi / 2.0 ] ), \
+             'X2_C' : np.array( [ np.pi / 2.0 ] ), \
+             'X3'   : np.array( [ np.pi ] ), \
+             'X3_C' : np.array( [ np.pi ] ) }
+
+    for iSS in range( nSS ):
+
+        if Verbose:
+            print( '\r    Writing snapshot: {:}/{:}'.format( iSS+1, nSS ), \
+                   end = '\r' )
+
+        Time, Fields = GetSyntheticFields( X1, iSS, nSS, RunTime )
+
+        FileName_Fluid \
+          = PathToData + '_FluidFields_' + str( iSS ).zfill( 6 ) + '.h5'
+        FileName_Geometry \
+          = PathToData + '_GeometryFields_' + str( iSS ).zfill( 6 ) + '.h5'
+
+        with h5.File( FileName_Fluid, 'w' ) as ff, \
+             h5.File( FileName_Geometry, 'w' ) as fg:
+
+            ff.create_dataset( 'Time', data = np.array( [ Time ] ) )
+
+            X = ff.create_group( 'Spatial Grid' )
+            for Field in GridFieldsHDF:
+                X.create_dataset( Field, data = Grid[Field] )
+
+            for Field in FieldsTableHDF:
+
+                File, Group, Dataset, Unit = FieldsTableHDF[Field]
+
+                if Field == 'Time': continue
+
+                if File == 'FF':
+                    f = ff
+                else:
+                    f = fg
+
+                f.create_dataset( Group + '/' + Dataset, \
+                                  data = Fields[Field][np.newaxis,np.newaxis] )
+
+    if Verbose:
+        print( '\n    Wrote {:} snapshots to {:}_*.h5'.format \
+               ( nSS, PathToData ) )
+
+    return
+
+# End of MakeSyntheticNativeData
+
+def MakeSyntheticBinaryCache( DataDirectory, Fields, nSS, nX, \
+                              RunTime = 10.0 ):
+
+    # Write the binary cache of MakeBinaryDataFile.py for Time, X1 and
+    # Fields, one plotfile per snapshot, holding the cell-center values on the
+    # grid of MakeSyntheticNativeData with one node per element
+
+    if not DataDirectory[-1] == '/': DataDirectory += '/'
+    if not os.path.isdir( DataDirectory ): os.makedirs( DataDirectory )
+
+    X1, X1C, dX1 = GetSyntheticGrid( nX, 1 )
+
+    PlotFiles = np.array( [ 'plt{:}'.format( str( iSS ).zfill( 8 ) ) \
+                            for iSS in range( nSS ) ] )
+
+    Data = {}
+    for Field in [ 'Time', 'X1' ] + Fields:
+        Data[Field] = np.empty( (nSS,nX), np.float64 )
+
+    for iSS in range( nSS ):
+
+        Time, Values = GetSyntheticFields( X1C, iSS, nSS, RunTime )
+
+        Data['Time'][iSS] = Time
+        Data['X1'  ][iSS] = X1C
+        for Field in Fields:
+            Data[Field][iSS] = Values[Field]
+
+    for Field in [ 'Time', 'X1' ] + Fields:
+
+        # Time is a scalar (rank 0) per plotfile
+        if Field == 'Time':
+            Ranks  = np.zeros( nSS, np.int64 )
+            Shapes = np.ones( (nSS,1), np.int64 )
+            Values = Data[Field][:,0]
+        else:
+            Ranks  = np.ones( nSS, np.int64 )
+            Shapes = np.full( (nSS,1), nX, np.int64 )
+            Values = Data[Field]
+
+        np.save( DataDirectory + '{:}.npy'.format( Field ), \
+                 np.ravel( Values ) )
+
+        np.savez( DataDirectory + '{:}_hdr.npz'.format( Field ), \
+                  PlotFiles = PlotFiles, \
+                  Offsets   = np.concatenate( ( [ 0 ], \
+                                np.cumsum( np.prod( Shapes, axis = 1 ) ) ) ), \
+                  Ranks     = Ranks, \
+                  Shapes    = Shapes, \
+                  MinVal    = Values.reshape( nSS, -1 ).min( axis = 1 ), \
+                  MaxVal    = Values.reshape( nSS, -1 ).max( axis = 1 ), \
+                  DataUnits = np.array( '' ) )
+
+    return PlotFiles
+
+# End of MakeSyntheticBinaryCache
+
+if __name__ == '__main__':
+
+    ############################ User Input ############################
+
+    OutputDirectory = 'SyntheticData/'
+
+    Problem = 'YahilCollapse'
+
+    nSS    = 200 # Number of snapshots
+    nX     = 256 # Number of elements
+    nNodes = 2   # Number of nodes per element
+
+    MakeBinaryCache = True
+
+    ############################
+
+    MakeSyntheticNativeData( OutputDirectory + Problem, nSS, nX, nNodes )
+
+    if MakeBinaryCache:
+
+        MakeSyntheticBinaryCache \
+          ( OutputDirectory + 'AMReX/', [ 'PF_D', 'PF_V1' ], nSS, nX )
+
+    os.system( 'rm -rf __pycache__' )
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import numpy as np
+import matplotlib
+matplotlib.use( 'Agg' )
+import matplotlib.pyplot as plt
+from matplotlib import animation
+
+import sys
+sys.path.append( '../' )
+sys.path.append( '../native/' )
+
+from UtilitiesModuleHDF import ReadFieldsHDF, ComputeCellAverageHDF, \
+                               MakeCubeHDF, GetCubeFileNameHDF
+from UtilitiesModuleMovie import SaveMovie
+from findDensityDecades import DensityDecades
+from makeSyntheticData import MakeSyntheticNativeData, \
+                              MakeSyntheticBinaryCache
+
+"""
+
+Times the main stages of the analysis scripts on synthetic data written
+by makeSyntheticData.py (generated on the first run):
+
+  - ReadFieldsHDF: serial, parallel, single precision and from the cube
+  - ComputeCellAverageHDF
+  - DensityDecades.FindDensityDecades, by bisection and by linear scan
+  - ReadBinaryDataFile (the AMReX scripts' binary cache)
+  - SaveMovie, serial and parallel (if ffmpeg is available)
+
+Each benchmark is run nRepeat times and the best and median wall-clock
+times are reported. Results are written to ResultsFileName; if
+CompareTo names an earlier results file, the ratio to its best times is
+printed and benchmarks slower by more than Tolerance are flagged.
+
+Files are read from the page cache after the first repetition, so the
+read timings measure decoding and copying rather than the disk.
+
+Usage:
+  $ python3 runBenchmarks.py
+
+"""
+
+############################ User Input ############################
+
+OutputDirectory = 'SyntheticData/'
+
+nSS    = 200 # Number of snapshots
+nX     = 256 # Number of elements
+nNodes = 2   # Number of nodes per element
+
+nRepeat  = 3
+nWorkers = 4 # Number of processes for the parallel benchmarks
+
+nFrames = 50 # Number of movie frames rendered
+
+ResultsFileName = 'BenchmarkResults.json'
+CompareTo       = None # e.g., 'BenchmarkResults_main.json'
+Tolerance       = 1.2
+
+############################
+
+Problem = 'YahilCollapse'
+
+if not OutputDirectory[-1] == '/': OutputDirectory += '/'
+
+PathToData = OutputDirectory + Problem
+Snapshots  = np.arange( nSS )
+
+if not os.path.isfile \
+         ( PathToData + '_FluidFields_' + str( nSS-1 ).zfill( 6 ) + '.h5' ):
+
+    MakeSyntheticNativeData( PathToData, nSS, nX, nNodes )
+
+    MakeSyntheticBinaryCache \
+      ( OutputDirectory + 'AMReX/', [ 'PF_D' ], nSS, nX )
+
+def TimeFunction( Function, nRepeat ):
+
+    Times = np.empty( nRepeat, np.float64 )
+
+    for i in range( nRepeat ):
+
+        tStart = time.perf_counter()
+
+        Function()
+
+        Times[i] = time.perf_counter() - tStart
+
+    return Times
+
+# End of TimeFunction
+
+def ReadFields( Fields, **kwargs ):
+
+    names = ReadFieldsHDF( PathToData, Snapshots, 'SPHERICAL', True, \
+                           Fields = Fields, **kwargs )
+
+    for Field in Fields:
+        names[Field]
+
+    return names
+
+# End of ReadFields
+
+def FindDensityDecades( UseBisection ):
+
+    # DensityDecades writes densityDecades.txt to the working directory
+
+    Directory = os.getcwd()
+    os.chdir( OutputDirectory )
+
+    try:
+        DD = DensityDecades( './', 0, nSS - 1 )
+        DD.FindDensityDecades( UseBisection = UseBisection )
+    finally:
+        os.chdir( Directory )
+
+    return
+
+# End of FindDensityDecades
+
+def RenderMovie( nWorkers ):
+
+    XC = names['X1_C'][1]
+    Y  = CellAverages['PF_D']
+
+    fig, ax = plt.subplots( 1, 1 )
+    ax.set_xscale( 'log' )
+    ax.set_yscale( 'log' )
+    ax.set_xlim( XC[0], XC[-1] )
+    ax.set_ylim( Y.min(), Y.max() )
+
+    line, = ax.plot( [], [], 'k-' )
+
+    def InitializeFrame():
+        line.set_data( [], [] )
+        return ( line, )
+
+    def UpdateFrame( t ):
+        line.set_data( XC, Y[t] )
+        return ( line, )
+
+    SaveMovie( fig, UpdateFrame, InitializeFrame, min( nFrames, nSS ), \
+               OutputDirectory + 'mov.Benchmark.mp4', fps = 25, \
+               dpi = 100, nWorkers = nWorkers )
+
+    plt.close( fig )
+
+    return
+
+# End of RenderMovie
+
+Fields = [ 'PF_D', 'PF_V1', 'PolytropicConstant', 'GF_SqrtGm' ]
+
+Benchmarks = {}
+
+Benchmarks['ReadFieldsHDF'] \
+  = lambda : ReadFields( Fields, UseCube = False )
+Benchmarks['ReadFieldsHDF (nWorkers = {:})'.format( nWorkers )] \
+  = lambda : ReadFields( Fields, UseCube = False, nWorkers = nWorkers )
+Benchmarks['ReadFieldsHDF (float32)'] \
+  = lambda : ReadFields( Fields, UseCube = False, dtype = np.float32 )
+Benchmarks['MakeCubeHDF'] \
+  = lambda : MakeCubeHDF( PathToData, Snapshots, nWorkers = nWorkers )
+Benchmarks['ReadFieldsHDF (cube)'] \
+  = lambda : ReadFields( Fields, UseCube = True )
+
+names = ReadFields( Fields, UseCube = False )
+
+Benchmarks['ComputeCellAverageHDF'] \
+  = lambda : ComputeCellAverageHDF( names, Fields[:-1] )
+Benchmarks['FindDensityDecades (bisection)'] \
+  = lambda : FindDensityDecades( True )
+Benchmarks['FindDensityDecades (linear)'] \
+  = lambda : FindDensityDecades( False )
+
+# The binary cache is read through MakeBinaryDataFile.py, which needs
+# thornado's MakeDataFile.py
+
+try:
+
+    from MakeBinaryDataFile import ReadBinaryDataFile
+
+    Benchmarks['ReadBinaryDataFile'] \
+      = lambda : np.stack( ReadBinaryDataFile \
+                             ( OutputDirectory + 'AMReX/', 'PF_D' ) )
+
+except ImportError:
+
+    print( '  Skipping ReadBinaryDataFile: MakeDataFile.py not found' )
+
+if animation.writers.is_available( 'ffmpeg' ):
+
+    CellAverages = ComputeCellAverageHDF( names, [ 'PF_D' ] )
+
+    Benchmarks['SaveMovie'] \
+      = lambda : RenderMovie( 1 )
+    Benchmarks['SaveMovie (nWorkers = {:})'.format( nWorkers )] \
+      = lambda : RenderMovie( nWorkers )
+
+else:
+
+    print( '  Skipping SaveMovie: ffmpeg not found' )
+
+Results = {}
+
+for Name in Benchmarks:
+
+    Times = TimeFunction( Benchmarks[Name], nRepeat )
+
+    Results[Name] = { 'Best'   : float( Times.min() ), \
+                      'Median' : float( np.median( Times ) ) }
+
+if os.path.isfile( GetCubeFileNameHDF( PathToData ) ):
+    os.remove( GetCubeFileNameHDF( PathToData ) )
+
+Previous = {}
+if CompareTo is not None:
+    with open( CompareTo ) as f:
+        Previous = json.load( f )['Results']
+
+print( '\n  nSS = {:}, nX = {:}, nNodes = {:}, nRepeat = {:}\n' \
+       .format( nSS, nX, nNodes, nRepeat ) )
+
+print( '  {:<36s} {:>10s} {:>10s}'.format( 'Benchmark', 'Best [s]', \
+                                           'Median [s]' ) )
+
+for Name in Results:
+
+    string = '  {:<36s} {:>10.4f} {:>10.4f}'.format \
+               ( Name, Results[Name]['Best'], Results[Name]['Median'] )
+
+    if Name in Previous:
+
+        Ratio = Results[Name]['Best'] / Previous[Name]['Best']
+
+        string += '  x{:.2f}'.format( Ratio )
+        if Ratio > Tolerance: string += '  SLOWER'
+
+    print( string )
+
+with open( ResultsFileName, 'w' ) as f:
+
+    json.dump( { 'nSS'     : nSS, \
+                 'nX'      : nX, \
+                 'nNodes'  : nNodes, \
+                 'nRepeat' : nRepeat, \
+                 'Results' : Results }, f, indent = 2 )
+
+print( '\n  Wrote {:}'.format( ResultsFileName ) )
+
+os.system( 'rm -rf __pycache__' )
@@ -6,7 +6,9 @@ import matplotlib.pyplot as plt
 import sys
 sys.path.append( '../' )
 
-from UtilitiesModuleHDF import ReadFieldsHDF
+from UtilitiesModuleHDF import ProbeFieldsHDF, ProbeSnapshotHDF, \
+                               ReadSnapshotIndexHDF, GetFromSnapshotIndexHDF
+from UtilitiesModuleTimeSeries import FindFirstCrossings
 from setGlobalVariables import *
 
 class DensityDecades:
@@ -21,59 +23,89 @@ class DensityDecades:
         self.Snapshots \
           = np.linspace( self.iLo, self.iHi, self.nSS, dtype = np.int64 )
 
+        self.Probed = {}
+
+        # Take the central densities from the snapshot index, if it
+        # covers all snapshots up to date (ReadSnapshotIndexHDF drops the
+        # records of rewritten snapshots), so that no data file is opened
+
+        Index = ReadSnapshotIndexHDF( self.DataDirectory + 'YahilCollapse' )
+
+        if all( [ SS in Index and 'PF_D' in Index[SS]['Fields'] \
+                  for SS in self.Snapshots ] ):
+
+            self.PF_D = GetFromSnapshotIndexHDF \
+                          ( Index, self.Snapshots, 'Central', 'PF_D' )
+            self.Time = GetFromSnapshotIndexHDF \
+                          ( Index, self.Snapshots, 'Time' )
+
         return
 
     def GetData( self ):
 
-        names \
-          = ReadFieldsHDF \
+        # Only the central node is read from each snapshot
+
+        Probes \
+          = ProbeFieldsHDF \
               ( PathToData = self.DataDirectory + 'YahilCollapse', \
                 Snapshots = self.Snapshots, \
                 CoordinateSystem = 'SPHERICAL', \
-                UsePhysicalUnits = True )
+                UsePhysicalUnits = True, \
+                Fields = [ 'PF_D' ], \
+                Indices = [ 0 ] )
+
+        self.PF_D = Probes['PF_D'][1][:,0]
 
-        self.nX = names['X1_C'][1].shape[0]
+        self.Time = Probes['Time'][1]
 
-        self.nNodes = np.int64( names['X1'][1].shape[0] / self.nX )
+        return
 
-        self.PF_D = names['PF_D'][1][:,0,0,0]
+    def GetCentralValues( self, iSS ):
 
-        self.Time = names['Time'][1]
+        # Central density and time of snapshot iSS, from the index or the
+        # loaded data if there, else probed from its file
 
-        return
+        if hasattr( self, 'PF_D' ): return self.PF_D[iSS], self.Time[iSS]
 
-    def FindDensityDecades( self ):
+        if not iSS in self.Probed:
 
-        self.DensityDecades = np.logspace( 10, 15, 6 )
-        self.FoundDecade    \
-          = np.array( [ False, False, False, False, False, False ], bool )
+            Values, Time \
+              = ProbeSnapshotHDF \
+                  ( self.DataDirectory + 'YahilCollapse', \
+                    self.Snapshots[iSS], [ 'PF_D' ], Indices = [ 0 ] )
+
+            self.Probed[iSS] = [ Values['PF_D'][0], Time ]
 
-        self.ind = np.empty( (self.DensityDecades.shape[0]), np.int64 )
-        self.t   = np.empty( (self.DensityDecades.shape[0]), np.int64 )
+        return self.Probed[iSS]
 
-        Density    = 0.0
-        MaxDensity = 0.0
-        tMax       = 0.0
-        indMax     = 0
+    def FindDensityDecades( self, UseBisection = True ):
 
-        for iSS in range( self.nSS ):
+        # UseBisection: probe the central densities of only O(sqrt(nSS))
+        #               snapshots (see FindFirstCrossings) instead of
+        #               reading one node of every file. Central densities
+        #               taken from the snapshot index are all scanned, as
+        #               they are already in memory.
+
+        if not UseBisection and not hasattr( self, 'PF_D' ): self.GetData()
+
+        self.DensityDecades = np.logspace( 10, 15, 6 )
 
-            Density = self.PF_D[iSS]
+        self.ind, MaxDensity, indMax \
+          = FindFirstCrossings \
+              ( lambda iSS: self.GetCentralValues( iSS )[0], \
+                self.nSS, self.DensityDecades, \
+                UseBisection = UseBisection and not hasattr( self, 'PF_D' ) )
 
-            if Density > MaxDensity:
+        self.FoundDecade = self.ind >= 0
 
-                MaxDensity = Density
-                tMax       = self.Time[iSS]
-                indMax     = iSS
+        self.t = np.full( (self.DensityDecades.shape[0]), np.nan, np.float64 )
 
-            for iDec in range( self.DensityDecades.shape[0] ):
+        for iDec in range( self.DensityDecades.shape[0] ):
 
-                if Density > self.DensityDecades[iDec] \
-                     and not self.FoundDecade[iDec]:
+            if self.FoundDecade[iDec]:
+                self.t[iDec] = self.GetCentralValues( self.ind[iDec] )[1]
 
-                    self.FoundDecade[iDec] = True
-                    self.ind        [iDec] = iSS
-                    self.t          [iDec] = self.Time[iSS]
+        tMax = self.GetCentralValues( indMax )[1]
 
         string = ''
         string += str( self.ind ) + '\n'
@@ -99,7 +131,6 @@ if __name__ == '__main__':
     iHi = 1100
 
     DD = DensityDecades( DataDirectory, iLo, iHi )
-    DD.GetData()
     DD.FindDensityDecades()
 
     import os
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+import sys
+sys.path.append( '../' )
+
+from UtilitiesModuleHDF import MakeCubeHDF
+from setGlobalVariables import *
+
+"""
+
+Packs all native thornado snapshots of a run into a single chunked
+time-series file, <Problem>_Cube.h5, next to the snapshot files.
+ReadFieldsHDF reads from it whenever it holds the requested snapshots.
+
+Usage:
+  $ python3 makeCubeHDF.py
+
+"""
+
+############################ User Input ############################
+
+THORNADO_DIR = HOME + 'Work/Codes/thornado/'
+
+RootPath = THORNADO_DIR + 'SandBox/YahilCollapse_XCFC/'
+suffix = 'Output/'
+
+Problem = 'YahilCollapse'
+
+SnapshotRange = [0,1467]
+nWorkers      = 1 # Number of processes used to read the snapshots
+
+############################
+
+nSS = SnapshotRange[1] - SnapshotRange[0] + 1
+
+Snapshots \
+  = np.linspace( SnapshotRange[0], SnapshotRange[1], nSS, \
+                 dtype = np.int64 )
+
+MakeCubeHDF( RootPath + suffix + Problem, Snapshots, nWorkers = nWorkers )
+
+import os
+os.system( 'rm -rf __pycache__' )
@@ -3,13 +3,16 @@
 import os
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib import animation
 plt.style.use( '../publication.sty' )
 
 import sys
 sys.path.append( '../' )
 
-from UtilitiesModuleHDF import ReadFieldsHDF
+from UtilitiesModuleHDF import ReadFieldsHDF, ComputeCellAverageHDF, \
+                               ComputeExtremaHDF, WriteTimeSeriesHDF
+from UtilitiesModuleMovie import SaveMovie, PlanFramesByChange, \
+                                 PlanFramesInTime, GetFrame
+from UtilitiesModuleTiming import EnableTiming
 from setGlobalVariables import *
 
 ############################ User Input ############################
@@ -31,15 +34,40 @@ UseSemiLogYScale = True
 SnapshotRange    = [0,1100]
 plotEvery        = 1
 WriteFile        = False
+WriteFileFormat  = 'HDF5' # 'HDF5': <Problem>_native_<Field>.h5 (see
+                          # WriteTimeSeriesHDF); 'Text': the legacy
+                          # <Problem>_native_<Field>.dat. Both hold the
+                          # cell averages divided by yScale (recorded in
+                          # the HDF5 file as the attribute 'yScale')
+nWorkers         = 1 # Number of processes used to render the frames
+UseSinglePrecision = False # Hold the fields in float32 for the movie
+                           # (see ReportPrecisionHDF for the error made)
+UseTiming = False # Print and write a timing report (TimingReport.json)
+FramePlan = 'All' # Frames of the movie: 'All' snapshots, nFrames snapshots
+                  # chosen so each frame shows a similar change ('Change'),
+                  # or nFrames frames uniform in time, interpolated between
+                  # snapshots ('Time')
+nFrames   = 300
 
 UseCustomLimits_Y = True
 yMin = 1.0
 yMax = 1.0e15
 
+# Percentiles of all values used as the y-limits if UseCustomLimits_Y is
+# False, e.g., [ 0.1, 99.9 ] to clip outliers; None -> minimum and maximum
+yPercentiles = None
+
+# Radial window [ x1L, x1H ] (km) of the movie; only the elements covering
+# it are read. None -> [ xL, xH ] of setGlobalVariables, reading every
+# element
+X1Window = None
+
 FigTitle = Problem
 
 ############################
 
+if UseTiming: EnableTiming( 'TimingReport.json' )
+
 nFields = len( Fields )
 
 nSS = SnapshotRange[1] - SnapshotRange[0] + 1
@@ -57,17 +85,26 @@ for iFd in range( 1, nFields ):
     tmp += '_' + Fields[iFd]
 SaveFileAs = 'mov.{:}_{:}_notdiff.mp4'.format( Problem, tmp )
 
+if UseSinglePrecision:
+  dtype = np.float32
+else:
+  dtype = np.float64
+
 Names = ReadFieldsHDF \
           ( PathToData, Snapshots, \
             CoordinateSystem = 'SPHERICAL', \
             UsePhysicalUnits = True, \
-            UseGeometryFields = True )
+            UseGeometryFields = True, \
+            Fields = Fields + [ 'GF_SqrtGm' ], \
+            dtype = dtype, \
+            X1Window = X1Window )
 TimeUnit = Names['Time'][0]
 Time     = Names['Time'][1]
 
 XC   = np.array( Names['X1_C'][1] )
 dX   = np.diff( XC )
 xlim = [ xL, xH ]
+if X1Window is not None: xlim = X1Window
 
 YN = np.empty( nFields, object )
 
@@ -76,12 +113,23 @@ for iFd in range( nFields ):
 
 if not UseCustomLimits_Y:
 
+  # Take the extrema from the snapshot index where it covers the movie,
+  # else reduce the loaded fields (see ComputeExtremaHDF)
+
+  Extrema \
+    = ComputeExtremaHDF( PathToData, Snapshots, Fields, \
+                         Percentiles = yPercentiles, X1Window = X1Window, \
+                         names = Names )
+
   yMin = +np.inf
   yMax = -np.inf
 
   for iFd in range( nFields ):
-    yMin = min( yMin, YN[iFd].min() )
-    yMax = max( yMax, YN[iFd].max() )
+
+    Limits = Extrema[Fields[iFd]].GetLimits( yPercentiles )
+
+    yMin = min( yMin, Limits[0] / yScale[iFd] )
+    yMax = max( yMax, Limits[1] / yScale[iFd] )
 
 ylim = [ yMin, yMax ]
 
@@ -128,42 +176,25 @@ ax.legend()
 
 XN = np.array( Names['X1'][1] )
 
-nNodes = XN.shape[0] // XC.shape[0]
-nX1    = XN.shape[0] // nNodes
-
-if   nNodes == 1:
-  wq = np.array( [ 1.0 ], np.float64 )
-elif   nNodes == 2:
-  wq = np.array( [ 0.5, 0.5 ], np.float64 )
-elif nNodes == 3:
-  wq = np.array( [ 5.0, 8.0, 5.0 ], np.float64 ) / 18.0
-else:
-  exit( 'Not available for nNodes = {:}'.format( nNodes ) )
-
-def computeCellAverage( Names, nNodes, iFd, nSS ):
-
-  SqrtGm = Names['GF_Sg'][1][:,0,0,:]
-
-  uK = np.empty( (nSS,nX1), np.float64 )
-
-  for iSS in range( nSS ):
-    for iX1 in range( nX1 ):
+nX1 = XC.shape[0]
 
-      iLo = nNodes * iX1
-      iHi = iLo + nNodes
+CellAverages = ComputeCellAverageHDF( Names, Fields, UseCache = True )
 
-      vK = np.sum( wq * SqrtGm[iSS,iLo:iHi] )
+YK = np.empty( nFields, object )
+for iFd in range( nFields ):
+  YK[iFd] = CellAverages[Fields[iFd]] / yScale[iFd]
 
-      uK[iSS,iX1] \
-        = np.sum( wq * YN[iFd][iSS,iLo:iHi] * SqrtGm[iSS,iLo:iHi] ) / vK
+if WriteFile and not WriteFileFormat == 'Text':
 
-  return uK
+  for iFd in range( nFields ):
 
-YK = np.empty( nFields, object )
-for iFd in range( nFields ):
-  YK[iFd] = computeCellAverage( Names, nNodes, iFd, nSS )
+    WriteTimeSeriesHDF \
+      ( '{:}_native_{:}.h5'.format( Problem, Fields[iFd] ), Fields[iFd], \
+        XC, Time, YK[iFd], \
+        [ Names['X1_C'][0], TimeUnit, Names[Fields[iFd]][0] ], \
+        yScale = yScale[iFd] )
 
-if WriteFile:
+elif WriteFile:
 
   header  = 'data[0,1:]  = XC [km]\n'
   header += 'data[1:,0]  = Time [ms]\n'
@@ -179,11 +210,31 @@ if WriteFile:
     YKK[1:,1:] = YK[iFd]
 
     np.savetxt( '{:}_native_{:}.dat'.format( Problem, Fields[iFd] ), \
-                uKK, header = header )
+                YKK, header = header )
 
   #os.system( 'rm -rf __pycache__' )
   #exit()
 
+# Frame t shows GetFrame( Y, FrameIndex, FrameWeight, t ) of each array Y
+
+if FramePlan == 'Change':
+
+  FrameIndex, FrameWeight \
+    = PlanFramesByChange \
+        ( Time, YK, nFrames, ylim, \
+          UseLogScale = UseSemiLogYScale and yMin > 0.0 )
+
+elif FramePlan == 'Time':
+
+  FrameIndex, FrameWeight = PlanFramesInTime( Time, nFrames )
+
+else:
+
+  FrameIndex  = np.arange( nSS )
+  FrameWeight = np.zeros( nSS )
+
+nFrames = FrameIndex.shape[0]
+
 # Intialize each new frame
 def InitializeFrame():
 
@@ -205,34 +256,29 @@ def InitializeFrame():
 # Animation function
 def UpdateFrame(t):
 
-  print( '  {:}/{:}'.format( t+1, nSS ) )
+  print( '  {:}/{:}'.format( t+1, nFrames ) )
 
   ret = []
 
   for iFd in range( nFields ):
 
-    linesN[iFd].set_data( XN, YN[iFd][t] )
+    linesN[iFd].set_data( XN, GetFrame( YN[iFd], FrameIndex, FrameWeight, t ) )
     ret.append( linesN[iFd] )
 
-    linesK[iFd].set_data( XC, YK[iFd][t] )
+    linesK[iFd].set_data( XC, GetFrame( YK[iFd], FrameIndex, FrameWeight, t ) )
     ret.append( linesK[iFd] )
 
-  time_text.set_text( r'$t={:.3e}\ \mathrm{{ms}}$'.format( Time[t] ) )
+  time_text.set_text( r'$t={:.3e}\ \mathrm{{ms}}$'.format \
+                      ( GetFrame( Time, FrameIndex, FrameWeight, t ) ) )
   ret.append( time_text )
   ret = ( ret )
 
   return ret
 
 # Call the animator
-anim = animation.FuncAnimation \
-         ( fig, \
-           UpdateFrame, \
-           init_func = InitializeFrame, \
-           frames    = nSS, \
-           interval  = 1000, \
-           blit      = True )
-
-anim.save( SaveFileAs, fps = max( 1, int( nSS / RunTime ) ), dpi = 300 )
+SaveMovie( fig, UpdateFrame, InitializeFrame, nFrames, SaveFileAs, \
+           fps = max( 1, int( nFrames / RunTime ) ), dpi = 300, \
+           nWorkers = nWorkers )
 
 os.system( 'rm -f *.pyc' )
 os.system( 'rm -rf __pycache__' )
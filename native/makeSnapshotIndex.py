@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append( '../' )
+
+from UtilitiesModuleHDF import UpdateSnapshotIndexHDF
+from setGlobalVariables import *
+
+"""
+
+Creates or updates <Problem>_Index.json next to the native thornado
+snapshot files. It records, for each snapshot, the file's name, mtime
+and size, the simulation time, the grid shape, and the min, max and
+central value of each field in Fields. Only new or changed snapshots
+are read, so it can be rerun while a simulation is still writing output.
+
+Usage:
+  $ python3 makeSnapshotIndex.py
+
+"""
+
+############################ User Input ############################
+
+THORNADO_DIR = HOME + 'Work/Codes/thornado/'
+
+RootPath = THORNADO_DIR + 'SandBox/YahilCollapse_XCFC/'
+suffix = 'Output/'
+
+Problem = 'YahilCollapse'
+
+Fields = [ 'PF_D', 'PF_V1', 'AF_P', 'GF_Psi', 'GF_Alpha' ]
+
+############################
+
+UpdateSnapshotIndexHDF( RootPath + suffix + Problem, Fields = Fields )
+
+import os
+os.system( 'rm -rf __pycache__' )
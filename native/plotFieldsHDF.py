@@ -7,7 +7,8 @@ plt.style.use( '../publication.sty' )
 import sys
 sys.path.append( '../' )
 
-from UtilitiesModuleHDF import ReadFieldsHDF
+from UtilitiesModuleHDF import ReadFieldsHDF, ComputeCellAverageHDF
+from setGlobalVariables import *
 
 field = 'PF_D'
 yLabel = r'$\rho\,\left[\mathrm{g\,cm}^{-3}\right]$'
@@ -23,66 +24,6 @@ useLogYScale = True
 #ylim = [ 1.0 - epsMin, 1.0 + epsMax ]
 #useLogYScale = False
 
-def ComputeCellAverage( names, iSS, field ):
-
-    rC = names['X1_C'][1]
-    nX = rC.shape[0]
-    del rC
-
-    r  = names['X1'][1]
-    nN = r.shape[0] // nX
-    del r
-
-    if nN == 2:
-        WeightsX = np.array( [ 0.5, 0.5 ], np.float64 )
-
-    SqrtGm = names['GF_Sg'][1][iSS,0,0,:]
-
-    uK = np.empty( nX, np.float64 )
-
-    if field == 'PolytropicConstant':
-
-        p   = names['AF_P' ][1][iSS,0,0,:]
-        rho = names['PF_D' ][1][iSS,0,0,:]
-        Gm  = names['AF_Gm'][1][iSS,0,0,:]
-
-        pK   = np.empty( nX, np.float64 )
-        rhoK = np.empty( nX, np.float64 )
-        GmK  = np.empty( nX, np.float64 )
-
-        for iX1 in range( nX ):
-
-            iLo = nN * iX1
-            iHi = iLo + nN
-
-            pK[iX1] \
-              = np.sum( WeightsX * p[iLo:iHi] * SqrtGm[iLo:iHi] ) \
-                  / np.sum( WeightsX * SqrtGm[iLo:iHi] )
-            rhoK[iX1] \
-              = np.sum( WeightsX * rho[iLo:iHi] * SqrtGm[iLo:iHi] ) \
-                  / np.sum( WeightsX * SqrtGm[iLo:iHi] )
-            GmK[iX1] \
-              = np.sum( WeightsX * Gm[iLo:iHi] * SqrtGm[iLo:iHi] ) \
-                  / np.sum( WeightsX * SqrtGm[iLo:iHi] )
-
-        uK = pK / rhoK**GmK
-
-    else:
-
-        uN = names[field][1][iSS,0,0,:]
-
-        for iX1 in range( nX ):
-
-            iLo = nN * iX1
-            iHi = iLo + nN
-
-            uK[iX1] \
-              = np.sum( WeightsX * uN[iLo:iHi] * SqrtGm[iLo:iHi] ) \
-                  / np.sum( WeightsX * SqrtGm[iLo:iHi] )
-
-    return uK
-# END ComputeCellAverage( names, iSS, field )
-
 THORNADO_DIR = HOME + 'Work/Codes/thornado/'
 
 plotfileDirectory \
@@ -95,15 +36,17 @@ names \
       ( plotfileDirectory, \
         snapshots, \
         CoordinateSystem = 'SPHERICAL', \
-        UsePhysicalUnits = True )
+        UsePhysicalUnits = True, \
+        Fields = [ field, 'GF_SqrtGm' ] )
 
 rC   = names['X1_C'][1]
 Time = names['Time'][1]
 
 fig, ax = plt.subplots( 1, 1 )
 
-rhoK0 = ComputeCellAverage( names, 0, field )
-rhoK1 = ComputeCellAverage( names, -1, field )
+rhoK = ComputeCellAverageHDF( names, [ field ], UseCache = True )[field]
+rhoK0 = rhoK[0]
+rhoK1 = rhoK[-1]
 
 ax.set_title( 'Yahil Collapse, Native thornado/Poseidon, Piecewise-Uniform Mesh' )
 ax.semilogx( rC, rhoK0 / yScale, '.' )
@@ -15,7 +15,7 @@ plt.rcParams['figure.figsize'] = [12,9]
 import sys
 sys.path.append( '../' )
 
-from UtilitiesModuleHDF import ReadFieldsHDF
+from UtilitiesModuleHDF import ReadFieldsHDF, ComputeCellAverageHDF
 from setGlobalVariables import *
 
 THORNADO_DIR = HOME + 'Work/Codes/thornado/'
@@ -36,12 +36,18 @@ class PlotFieldsHDF:
         return
 
 
-    def GetData( self ):
+    def GetData( self, Fields ):
+
+        # Fields: the fields to be plotted; they are read, with GF_SqrtGm
+        #         for the cell averages, in one pass over the snapshot files
+
+        self.Fields = list( Fields )
 
         self.names \
           = ReadFieldsHDF \
               ( self.PathToData, self.Snapshots, \
-                CoordinateSystem = 'SPHERICAL', UsePhysicalUnits = True )
+                CoordinateSystem = 'SPHERICAL', UsePhysicalUnits = True, \
+                Fields = self.Fields + [ 'GF_SqrtGm' ] )
 
         self.r    = self.names['X1'][1]
         self.rC   = self.names['X1_C'][1]
@@ -51,9 +57,8 @@ class PlotFieldsHDF:
 
         self.alpha = np.array( [ 1.0 ], np.float64 )
 
-        if self.nN == 2:
-
-          self.WeightsX = np.array( [ 0.5, 0.5 ], np.float64 )
+        # Cell averages for all snapshots, computed for all Fields at once
+        self.uK = {}
 
         if self.nFiles > 1:
 
@@ -64,21 +69,16 @@ class PlotFieldsHDF:
 
     def ComputeCellAverage( self, iSS, Field ):
 
-        SqrtGm = self.names['GF_Sg'][1][iSS,0,0,:]
-        uN     = self.names[Field  ][1][iSS,0,0,:]
+        if not Field in self.uK:
 
-        uK = np.empty( (self.nX), np.float64 )
+            Missing = [ F for F in self.Fields + [ Field ] \
+                          if not F in self.uK ]
 
-        for iX1 in range( self.nX ):
+            self.uK.update( ComputeCellAverageHDF \
+                              ( self.names, list( dict.fromkeys( Missing ) ), \
+                                UseCache = True ) )
 
-            iLo = self.nN*iX1
-            iHi = self.nN*(iX1+1)
-
-            uK[iX1] \
-              = np.sum( self.WeightsX * uN[iLo:iHi] * SqrtGm[iLo:iHi] ) \
-                  / np.sum( self.WeightsX * SqrtGm[iLo:iHi] )
-
-        return uK
+        return self.uK[Field][iSS]
 
 
     def AddPlot( self, ax, iSS, Field, c = 'k-', label = '', lw = 2.0, f = '' ):
@@ -109,17 +109,20 @@ if __name__ == '__main__':
     #PlotVariables = 'Fluid'
     PlotVariables = 'CFA'
 
+    PlotFields = { 'Fluid' : [ 'PF_D', 'PF_V1', 'AF_P' ], \
+                   'CFA'   : [ 'GF_Alpha', 'GF_Psi', 'GF_Beta_1', 'GF_Phi_N' ] }
+
     DataDirectory = THORNADO_DIR + 'SandBox/YahilCollapse_XCFC/'
     DataDirectory += 'Output/'
 
     Plot = PlotFieldsHDF( DataDirectory, Snapshots )
-    Plot.GetData()
+    Plot.GetData( PlotFields[PlotVariables] )
 
     FigTitle = 'Yahil Collapse (XCFC)'
 
     if PlotVariables == 'Fluid':
 
-        Fields = np.array( [ 'PF_D', 'PF_V1', 'AF_P' ], str )
+        Fields = np.array( PlotFields['Fluid'], str )
 
         nRows = 3
         nCols = 1
@@ -173,7 +176,7 @@ if __name__ == '__main__':
 
     if PlotVariables == 'CFA':
 
-        Fields = np.array( [ 'GF_al', 'GF_CF', 'GF_b1', 'GF_NP' ], str )
+        Fields = np.array( PlotFields['CFA'], str )
 
         nRows = 2
         nCols = 1
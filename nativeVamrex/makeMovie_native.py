@@ -3,13 +3,18 @@
 import os
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib import animation
 plt.style.use( '../publication.sty' )
 
 import sys
 sys.path.append( '../' )
 
-from UtilitiesModuleHDF import ReadFieldsHDF
+from UtilitiesModuleHDF import ReadFieldsHDF, IterFieldsHDF, \
+                               ComputeCellAverageHDF, ComputeExtremaHDF, \
+                               PlanIncrementalUpdateHDF, \
+                               WriteIncrementalStateHDF, WriteTimeSeriesHDF
+from UtilitiesModuleMovie import ExtendMovie, PlanFramesByChange, \
+                                 PlanFramesInTime, GetFrame
+from UtilitiesModuleTiming import EnableTiming
 from setGlobalVariables import *
 
 ############################ User Input ############################
@@ -28,6 +33,23 @@ Dimension        = 'X1'
 SnapshotRange    = [0,1467]
 plotEvery        = 1
 WriteFile        = True
+WriteFileFormat  = 'HDF5' # 'HDF5': <Problem>_native_<Field>.h5 (see
+                          # WriteTimeSeriesHDF); 'Text': the legacy
+                          # <Problem>_native_<Field>.dat
+nWorkers         = 1 # Number of processes used to read the snapshots
+                     # and to render the frames
+UseSinglePrecision = False # Hold the fields in float32 for the movie
+                           # (see ReportPrecisionHDF for the error made)
+UseTiming = False # Print and write a timing report (TimingReport.json)
+Incremental = False # Only process snapshots written since the last run
+                    # (e.g., of a simulation still running) and append them
+                    # to the data file or movie; SnapshotRange may extend
+                    # past the last snapshot written
+FramePlan = 'All' # Frames of the movie: 'All' snapshots, nFrames snapshots
+                  # chosen so each frame shows a similar change ('Change'),
+                  # or nFrames frames uniform in time, interpolated between
+                  # snapshots ('Time')
+nFrames   = 300
 
 if Fields[0] == 'PF_V1':
 
@@ -64,19 +86,42 @@ else:
   yScale = [ 1.0e0 ]
   labels = Fields
 
+# Percentiles of all values used as the y-limits, e.g., [ 0.1, 99.9 ] to
+# clip outliers; None -> minimum and maximum
+yPercentiles = None
+
+# Radial window [ x1L, x1H ] (km) of the movie and data files; only the
+# elements covering it are read. None -> [ xL, xH ] of setGlobalVariables,
+# reading every element
+X1Window = None
+
 figTitle = 'Yahil Collapse, 512 elements, Zoomed Grid'
 
 ############################
 
+if UseTiming: EnableTiming( 'TimingReport.json' )
+
 print( '\n  makeMovie_native.py' )
 print( '  -------------------' )
 print( '    plotfileDirectory: ', RootPath + suffix )
 print( '               Fields: ', Fields )
 print( '            WriteFile: ', WriteFile )
+print( '             X1Window: ', X1Window )
+print( '          Incremental: ', Incremental )
+print( '            FramePlan: ', FramePlan )
 print()
 
+if Incremental and not WriteFile and not FramePlan == 'All':
+
+  print( 'Incremental movies need FramePlan = \'All\'' )
+  exit()
+
 nFields = len( Fields )
 
+# As recorded in the incremental state; a product is only extended with
+# data of the same window
+if X1Window is not None: X1Window = [ float( x1 ) for x1 in X1Window ]
+
 nSS = SnapshotRange[1] - SnapshotRange[0] + 1
 
 Snapshots \
@@ -92,30 +137,207 @@ for iFd in range( 1, nFields ):
     tmp += '_' + Fields[iFd]
 SaveFileAs = 'mov.{:}_XCFC_{:}_native.mp4'.format( Problem, tmp )
 
+if WriteFile:
+
+  # Stream the cell averages to file one window of snapshots at a time
+
+  header  = 'data[0,1:]  = XC [km]\n'
+  header += 'data[1:,0]  = Time [ms]\n'
+  header += 'data[1:,1:] = uK'
+
+  if WriteFileFormat == 'Text':
+    Extension = '.dat'
+  else:
+    Extension = '.h5'
+
+  fileNames = [ '{:}_native_{:}{:}'.format( Problem, Fields[iFd], Extension ) \
+                for iFd in range( nFields ) ]
+
+  # One state file per format, so that the exports of the two formats
+  # can be kept up to date side by side
+
+  StateFileName \
+    = '{:}_native_{:}_{:}.json'.format( Problem, tmp, Extension[1:] )
+
+  iNew = 0
+
+  if Incremental:
+
+    Snapshots, iNew, State \
+      = PlanIncrementalUpdateHDF( PathToData, Snapshots, StateFileName )
+
+    # Start over if the files are gone, were not written in this format
+    # or for this window; rows of text files past the recorded sizes are
+    # from an interrupted run
+
+    if State.get( 'X1Window' ) != X1Window: iNew = 0
+
+    if iNew > 0:
+
+      for iFd in range( nFields ):
+
+        if      os.path.isfile( fileNames[iFd] ) \
+            and State.get( 'Format', 'Text' ) == WriteFileFormat \
+            and os.path.getsize( fileNames[iFd] ) \
+                  >= State['Sizes'][fileNames[iFd]]: continue
+
+        iNew = 0
+
+    if iNew > 0 and WriteFileFormat == 'Text':
+
+      for iFd in range( nFields ):
+        os.truncate( fileNames[iFd], State['Sizes'][fileNames[iFd]] )
+
+    print( '  Appending {:} of {:} snapshots'.format \
+           ( Snapshots.shape[0] - iNew, Snapshots.shape[0] ) )
+
+    if iNew == Snapshots.shape[0]:
+
+      os.system( 'rm -rf __pycache__' )
+      exit()
+
+  Files = np.empty( nFields, object )
+
+  for names \
+    in IterFieldsHDF \
+         ( PathToData, Snapshots[iNew:], \
+           CoordinateSystem = 'SPHERICAL', \
+           UsePhysicalUnits = True, \
+           UseGeometryFields = True, \
+           Fields = Fields + [ 'GF_SqrtGm' ], \
+           WindowSize = 100, \
+           nWorkers = nWorkers, \
+           X1Window = X1Window ):
+
+    XC = names['X1_C'][1]
+
+    CellAverages = ComputeCellAverageHDF( names, Fields )
+
+    if not WriteFileFormat == 'Text':
+
+      for iFd in range( nFields ):
+
+        WriteTimeSeriesHDF \
+          ( fileNames[iFd], Fields[iFd], XC, names['Time'][1], \
+            CellAverages[Fields[iFd]], \
+            [ names['X1_C'][0], names['Time'][0], names[Fields[iFd]][0] ], \
+            Offset = iNew + names.Offset )
+
+      continue
+
+    if names.Offset == 0:
+
+      for iFd in range( nFields ):
+
+        if iNew > 0:
+
+          Files[iFd] = open( fileNames[iFd], 'a' )
+
+        else:
+
+          Files[iFd] = open( fileNames[iFd], 'w' )
+
+          np.savetxt( Files[iFd], np.hstack( ( np.nan, XC ) )[np.newaxis], \
+                      header = header, fmt = '%+.16e' )
+
+    for iFd in range( nFields ):
+
+      np.savetxt( Files[iFd], \
+                  np.hstack( ( names['Time'][1][:,np.newaxis], \
+                               CellAverages[Fields[iFd]] ) ), \
+                  fmt = '%+.16e' )
+
+  print()
+  for iFd in range( nFields ):
+
+    if WriteFileFormat == 'Text': Files[iFd].close()
+
+    print( '  Wrote file ', fileNames[iFd] )
+
+  if Incremental:
+
+    WriteIncrementalStateHDF \
+      ( PathToData, Snapshots, StateFileName, \
+        Extra = { 'Format'   : WriteFileFormat, \
+                  'X1Window' : X1Window, \
+                  'Sizes'  : { fileName : os.path.getsize( fileName ) \
+                               for fileName in fileNames } } )
+
+  os.system( 'rm -rf __pycache__' )
+  exit()
+
+StateFileName = os.path.splitext( SaveFileAs )[0] + '.json'
+
+iNew = 0
+
+if Incremental:
+
+  # Only the frames of the new snapshots are rendered and appended to the
+  # movie, with the axis limits and frame rate of the first run
+
+  Snapshots, iNew, State \
+    = PlanIncrementalUpdateHDF( PathToData, Snapshots, StateFileName )
+  nSS = Snapshots.shape[0]
+
+  if not os.path.isfile( SaveFileAs ) \
+       or State.get( 'X1Window' ) != X1Window: iNew = 0
+
+  print( '  Appending {:} of {:} frames'.format( nSS - iNew, nSS ) )
+
+  if iNew == nSS:
+
+    os.system( 'rm -rf __pycache__' )
+    exit()
+
+if UseSinglePrecision:
+  dtype = np.float32
+else:
+  dtype = np.float64
+
 Names = ReadFieldsHDF \
-          ( PathToData, Snapshots, \
+          ( PathToData, Snapshots[iNew:], \
             CoordinateSystem = 'SPHERICAL', \
             UsePhysicalUnits = True, \
-            UseGeometryFields = True )
+            UseGeometryFields = True, \
+            Fields = Fields + [ 'GF_SqrtGm' ], \
+            nWorkers = nWorkers, \
+            dtype = dtype, \
+            X1Window = X1Window )
 TimeUnit = Names['Time'][0]
 Time     = Names['Time'][1]
 
 XC   = np.array( Names['X1_C'][1] )
 xlim = [ xL, xH ]
+if X1Window is not None: xlim = X1Window
 
 YN = np.empty( nFields, object )
 
 for iFd in range( nFields ):
   YN[iFd] = Names[Fields[iFd]][1][:,0,0,:]
 
-if not UseCustomLimits_Y:
+if iNew > 0:
+
+  yMin, yMax = State['ylim']
+
+elif not UseCustomLimits_Y:
+
+  # Take the extrema from the snapshot index where it covers the movie,
+  # else reduce the loaded fields (see ComputeExtremaHDF)
+
+  Extrema \
+    = ComputeExtremaHDF( PathToData, Snapshots, Fields, \
+                         Percentiles = yPercentiles, X1Window = X1Window, \
+                         names = Names )
 
   yMin = +np.inf
   yMax = -np.inf
 
   for iFd in range( nFields ):
-    yMin = min( yMin, YN[iFd].min() ) / yScale[iFd]
-    yMax = max( yMax, YN[iFd].max() ) / yScale[iFd]
+
+    Limits = Extrema[Fields[iFd]].GetLimits( yPercentiles )
+
+    yMin = min( yMin, Limits[0] / yScale[iFd] )
+    yMax = max( yMax, Limits[1] / yScale[iFd] )
 
 ylim = [ yMin, yMax ]
 
@@ -162,82 +384,40 @@ ax.legend()
 
 XN = np.array( Names['X1'][1] )
 
-nNodes = XN.shape[0] // XC.shape[0]
-nX1    = XN.shape[0] // nNodes
-
-if   nNodes == 1:
-  wq = np.array( [ 1.0 ], np.float64 )
-elif   nNodes == 2:
-  wq = np.array( [ 0.5, 0.5 ], np.float64 )
-elif nNodes == 3:
-  wq = np.array( [ 5.0, 8.0, 5.0 ], np.float64 ) / 18.0
-else:
-  exit( 'Not available for nNodes = {:}'.format( nNodes ) )
-
-def computeCellAverage( Names, nNodes, iFd, nSS ):
-
-  SqrtGm = Names['GF_SqrtGm'][1][:,0,0,:]
-
-  uK = np.empty( (nSS,nX1), np.float64 )
-
-  for iSS in range( nSS ):
-
-    print( '\r  Computing cell average: {:}/{:}'.format( iSS+1, nSS ), \
-           end = '\r' )
-
-    for iX1 in range( nX1 ):
-
-      iLo = nNodes * iX1
-      iHi = iLo + nNodes
-
-      vK = np.sum( wq * SqrtGm[iSS,iLo:iHi] )
-
-      if Fields[iFd] == 'PolytropicConstant':
-
-        p   = np.sum( wq * Names['AF_P' ][1][iSS,0,0,iLo:iHi] \
-                             * SqrtGm[iSS,iLo:iHi] ) / vK
-        rho = np.sum( wq * Names['PF_D' ][1][iSS,0,0,iLo:iHi] \
-                             * SqrtGm[iSS,iLo:iHi] ) / vK
-        Gmm = np.sum( wq * Names['AF_Gm'][1][iSS,0,0,iLo:iHi] \
-                             * SqrtGm[iSS,iLo:iHi] ) / vK
-
-        uK[iSS,iX1] = p / rho**Gmm
-
-      else:
-
-        uK[iSS,iX1] \
-          = np.sum( wq * YN[iFd][iSS,iLo:iHi] * SqrtGm[iSS,iLo:iHi] ) / vK
-
-  return uK
-
 print()
+print( '  Computing cell averages' )
+CellAverages = ComputeCellAverageHDF( Names, Fields )
+
 YK = np.empty( nFields, object )
 for iFd in range( nFields ):
-  YK[iFd] = computeCellAverage( Names, nNodes, iFd, nSS )
-  print()
+  YK[iFd] = CellAverages[Fields[iFd]]
 
-if WriteFile:
+# Frame t shows GetFrame( Y, FrameIndex, FrameWeight, t ) of each array Y
 
-  header  = 'data[0,1:]  = XC [km]\n'
-  header += 'data[1:,0]  = Time [ms]\n'
-  header += 'data[1:,1:] = uK'
+if FramePlan == 'Change':
 
-  YKK = np.empty( (nSS+1,nX1+1), np.float64 )
-  YKK[0,0 ]  = np.nan
-  YKK[0,1:]  = XC
-  YKK[1:,0]  = Time
+  FrameIndex, FrameWeight \
+    = PlanFramesByChange \
+        ( Time, [ YK[iFd] / yScale[iFd] for iFd in range( nFields ) ], \
+          nFrames, ylim, UseLogScale = UseLogScale_Y and yMin > 0.0 )
 
-  for iFd in range( nFields ):
+elif FramePlan == 'Time':
 
-    YKK[1:,1:] = YK[iFd]
+  FrameIndex, FrameWeight = PlanFramesInTime( Time, nFrames )
 
-    fileName = '{:}_native_{:}.dat'.format( Problem, Fields[iFd] )
-    np.savetxt( fileName, YKK, header = header, fmt = '%+.16e' )
+else:
 
-    print( '  Wrote file ', fileName )
+  # The arrays hold the snapshots from iNew on
 
-  os.system( 'rm -rf __pycache__' )
-  exit()
+  FrameIndex  = np.arange( nSS ) - iNew
+  FrameWeight = np.zeros( nSS )
+
+nFrames = FrameIndex.shape[0]
+
+if iNew > 0:
+  fps = State['fps']
+else:
+  fps = max( 1, int( nFrames / RunTime ) )
 
 # Intialize each new frame
 def InitializeFrame():
@@ -260,19 +440,23 @@ def InitializeFrame():
 # Animation function
 def UpdateFrame(t):
 
-  print( '\r          Updating frame: {:}/{:}'.format( t+1, nSS ), end = '\r' )
+  print( '\r          Updating frame: {:}/{:}'.format( t+1, nFrames ), \
+         end = '\r' )
 
   ret = []
 
   for iFd in range( nFields ):
 
-    linesN[iFd].set_data( XN, YN[iFd][t] / yScale[iFd] )
+    linesN[iFd].set_data \
+      ( XN, GetFrame( YN[iFd], FrameIndex, FrameWeight, t ) / yScale[iFd] )
     ret.append( linesN[iFd] )
 
-    linesK[iFd].set_data( XC, YK[iFd][t] / yScale[iFd] )
+    linesK[iFd].set_data \
+      ( XC, GetFrame( YK[iFd], FrameIndex, FrameWeight, t ) / yScale[iFd] )
     ret.append( linesK[iFd] )
 
-  time_text.set_text( r'$t={:.3e}\ \mathrm{{ms}}$'.format( Time[t] ) )
+  time_text.set_text( r'$t={:.3e}\ \mathrm{{ms}}$'.format \
+                      ( GetFrame( Time, FrameIndex, FrameWeight, t ) ) )
   ret.append( time_text )
   ret = ( ret )
 
@@ -280,16 +464,17 @@ def UpdateFrame(t):
 
 print()
 # Call the animator
-anim = animation.FuncAnimation \
-         ( fig, \
-           UpdateFrame, \
-           init_func = InitializeFrame, \
-           frames    = nSS, \
-           interval  = 1000, \
-           blit      = True )
-
-anim.save( SaveFileAs, fps = max( 1, int( nSS / RunTime ) ), dpi = 300 )
+ExtendMovie( fig, UpdateFrame, InitializeFrame, iNew, nFrames, SaveFileAs, \
+             fps = fps, dpi = 300, nWorkers = nWorkers )
 print()
 
+if Incremental:
+
+  WriteIncrementalStateHDF \
+    ( PathToData, Snapshots, StateFileName, \
+      Extra = { 'ylim'     : [ float( yMin ), float( yMax ) ], \
+                'fps'      : fps, \
+                'X1Window' : X1Window } )
+
 os.system( 'rm -f *.pyc' )
 os.system( 'rm -rf __pycache__' )
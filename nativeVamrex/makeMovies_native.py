@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+plt.style.use( '../publication.sty' )
+
+import sys
+sys.path.append( '../' )
+
+from UtilitiesModuleHDF import ReadFieldsHDF, ComputeCellAverageHDF, \
+                               ComputeExtremaHDF, WriteTimeSeriesHDF
+from UtilitiesModuleMovie import SaveMovie, PlanFramesByChange, \
+                                 PlanFramesInTime, GetFrame
+from UtilitiesModuleTiming import EnableTiming, Timer
+from setGlobalVariables import *
+
+"""
+
+Batch version of makeMovie_native.py: makes every movie in Movies and
+writes every data file in Exports. The cell averages of the union of the
+fields are taken from the on-disk cache (see GetCachedCellAverageHDF),
+which reads only the fields it lacks, in one pass. The nodal values the
+movies show are read, in one pass, only when the first movie is made.
+
+Usage:
+  $ python3 makeMovies_native.py
+
+"""
+
+############################ User Input ############################
+
+THORNADO_DIR = HOME + 'Work/Codes/thornado/'
+
+RootPath = THORNADO_DIR + 'SandBox/YahilCollapse_XCFC/'
+suffix = 'Output/'
+
+Problem = 'YahilCollapse'
+
+RunTime = 10.0 # seconds
+
+# One movie per list of fields (drawn on the same axes)
+Movies = [ [ 'PF_D' ], [ 'PF_V1' ], [ 'AF_P' ], [ 'PolytropicConstant' ] ]
+
+# Fields whose cell averages are written to <Problem>_native_<Field>.h5
+# (as by makeMovie_native.py with WriteFile = True)
+Exports = [ 'PF_D', 'PF_V1' ]
+ExportFormat = 'HDF5' # 'HDF5' (see WriteTimeSeriesHDF) or 'Text' (legacy
+                      # <Problem>_native_<Field>.dat)
+
+SnapshotRange    = [0,1467]
+plotEvery        = 1
+nWorkers         = 1 # Number of processes used to read the snapshots
+                     # and to render the frames
+UseSinglePrecision = False # Hold the fields in float32
+                           # (see ReportPrecisionHDF for the error made)
+UseTiming = False # Print and write a timing report (TimingReport.json)
+FramePlan = 'All' # Frames of the movies: 'All' snapshots, nFrames
+                  # snapshots chosen so each frame shows a similar change
+                  # ('Change'), or nFrames frames uniform in time,
+                  # interpolated between snapshots ('Time')
+nFrames   = 300
+
+# Percentiles of all values used as the y-limits, e.g., [ 0.1, 99.9 ] to
+# clip outliers; None -> minimum and maximum
+yPercentiles = None
+
+# Radial window [ x1L, x1H ] (km) of the movies and data files; only the
+# elements covering it are read. None -> [ xL, xH ] of setGlobalVariables,
+# reading every element
+X1Window = None
+
+# Field : [ yScale, label, UseLogScale_Y, ylim ( None -> from the data ) ];
+# the settings of a movie are those of its first field
+FieldSettings \
+  = { 'PF_V1' : [ 2.99792458e5, r'$v/c$', False, None ], \
+      'PF_D'  : [ 1.0e0, r'$\rho\ \left[\mathrm{g\,cm}^{-3}\right]$', \
+                  True, None ], \
+      'AF_P'  : [ 1.0e0, r'$p\ \left[\mathrm{erg\,cm}^{-3}\right]$', \
+                  True, None ], \
+      'PolytropicConstant' \
+              : [ 6.0e27 / 7.0e9**1.30, r'$K/K_{\mathrm{exact}}$', \
+                  False, [ 1.0 - 1.0e-2, 1.0 + 1.0e-2 ] ] }
+
+figTitle = 'Yahil Collapse, 512 elements, Zoomed Grid'
+
+############################
+
+if UseTiming: EnableTiming( 'TimingReport.json' )
+
+print( '\n  makeMovies_native.py' )
+print( '  --------------------' )
+print( '    plotfileDirectory: ', RootPath + suffix )
+print( '               Movies: ', Movies )
+print( '              Exports: ', Exports )
+print()
+
+nSS = SnapshotRange[1] - SnapshotRange[0] + 1
+
+Snapshots \
+  = np.linspace( SnapshotRange[0], SnapshotRange[1], nSS, \
+                 dtype = np.int64 )
+Snapshots = np.copy( Snapshots[::plotEvery] )
+nSS = Snapshots.shape[0]
+
+PathToData = RootPath + suffix + Problem
+
+# Every field of every movie and export, once
+
+Fields = []
+for Field in sum( Movies, [] ) + Exports:
+  if not Field in Fields: Fields.append( Field )
+
+if UseSinglePrecision:
+  dtype = np.float32
+else:
+  dtype = np.float64
+
+Names = ReadFieldsHDF \
+          ( PathToData, Snapshots, \
+            CoordinateSystem = 'SPHERICAL', \
+            UsePhysicalUnits = True, \
+            UseGeometryFields = True, \
+            Fields = Fields + [ 'GF_SqrtGm' ], \
+            nWorkers = nWorkers, \
+            dtype = dtype, \
+            X1Window = X1Window )
+
+Time = Names['Time'][1]
+XN   = np.array( Names['X1'  ][1] )
+XC   = np.array( Names['X1_C'][1] )
+xlim = [ xL, xH ]
+if X1Window is not None: xlim = X1Window
+
+print()
+print( '  Computing cell averages' )
+CellAverages = ComputeCellAverageHDF( Names, Fields, UseCache = True )
+
+for Field in Exports:
+
+  if not ExportFormat == 'Text':
+
+    fileName = '{:}_native_{:}.h5'.format( Problem, Field )
+
+    WriteTimeSeriesHDF \
+      ( fileName, Field, XC, Time, CellAverages[Field], \
+        [ Names['X1_C'][0], Names['Time'][0], Names[Field][0] ] )
+
+    print( '  Wrote file ', fileName )
+
+    continue
+
+  header  = 'data[0,1:]  = XC [km]\n'
+  header += 'data[1:,0]  = Time [ms]\n'
+  header += 'data[1:,1:] = uK'
+
+  fileName = '{:}_native_{:}.dat'.format( Problem, Field )
+
+  with Timer( 'Write data files' ):
+
+    np.savetxt( fileName, \
+                np.vstack( ( np.hstack( ( np.nan, XC ) ), \
+                             np.hstack( ( Time[:,np.newaxis], \
+                                          CellAverages[Field] ) ) ) ), \
+                header = header, fmt = '%+.16e' )
+
+  print( '  Wrote file ', fileName )
+
+def MakeMovie( Fields ):
+
+  nFields = len( Fields )
+
+  Settings = FieldSettings.get( Fields[0], [ 1.0e0, Fields[0], False, None ] )
+
+  UseLogScale_Y = Settings[2]
+  ylim          = Settings[3]
+
+  YN = [ Names[Field][1][:,0,0,:] for Field in Fields ]
+
+  yScale = [ FieldSettings.get( Field, [ 1.0e0 ] )[0] for Field in Fields ]
+  labels = [ FieldSettings.get( Field, [ 1.0e0, Field ] )[1] \
+             for Field in Fields ]
+
+  tmp = Fields[0]
+  for iFd in range( 1, nFields ):
+      tmp += '_' + Fields[iFd]
+  SaveFileAs = 'mov.{:}_XCFC_{:}_native.mp4'.format( Problem, tmp )
+
+  if ylim is None:
+
+    # Take the extrema from the snapshot index where it covers the movie,
+    # else reduce the loaded fields (see ComputeExtremaHDF)
+
+    Extrema \
+      = ComputeExtremaHDF( PathToData, Snapshots, Fields, \
+                           Percentiles = yPercentiles, X1Window = X1Window, \
+                           names = Names )
+
+    yMin = +np.inf
+    yMax = -np.inf
+
+    for iFd in range( nFields ):
+
+      Limits = Extrema[Fields[iFd]].GetLimits( yPercentiles )
+
+      yMin = min( yMin, Limits[0] / yScale[iFd] )
+      yMax = max( yMax, Limits[1] / yScale[iFd] )
+
+    ylim = [ yMin, yMax ]
+
+  yMin, yMax = ylim
+
+  # Animation program adapted from
+  # https://jakevdp.github.io/blog/2012/08/18/matplotlib-animation-tutorial/
+  fig, ax = plt.subplots( 1, 1 )
+  ax.set_title( '{:}'.format( figTitle ) )
+
+  time_text = plt.text( 0.1, 0.8, '', transform = ax.transAxes )
+
+  ax.set_xlim( xlim )
+  ax.set_xscale( 'log' )
+  ax.set_xlabel( xLabel )
+
+  ax.xaxis.set_tick_params \
+    ( which = 'both', top = True, left = False, bottom = True, right = False )
+  ax.yaxis.set_tick_params \
+    ( which = 'both', top = False, left = True, bottom = False, right = True )
+
+  ax.set_ylim( ylim )
+  if UseLogScale_Y:
+    if( yMin < 0.0 ):
+      ax.set_yscale( 'symlog' )
+    else:
+      ax.set_yscale( 'log' )
+
+  # colorblind-friendly palette: https://gist.github.com/thriveth/8560036
+  color = ['#377eb8', '#ff7f00', '#4daf4a', \
+           '#f781bf', '#a65628', '#984ea3', \
+           '#999999', '#e41a1c', '#dede00']
+
+  linesN = np.empty( nFields, object )
+  linesK = np.empty( nFields, object )
+  for iFd in range( nFields ):
+    linesN[iFd], = ax.plot( [], [], '.', color = color[iFd], \
+                            label = labels[iFd] + ' (N)' )
+    linesK[iFd], = ax.plot( [], [], '.', color = color[iFd+1], \
+                            label = labels[iFd] + ' (K)' )
+
+  ax.grid()
+  ax.legend()
+
+  # Frame t shows GetFrame( Y, FrameIndex, FrameWeight, t ) of each array Y
+
+  if FramePlan == 'Change':
+
+    FrameIndex, FrameWeight \
+      = PlanFramesByChange \
+          ( Time, [ CellAverages[Fields[iFd]] / yScale[iFd] \
+                    for iFd in range( nFields ) ], \
+            nFrames, ylim, UseLogScale = UseLogScale_Y and yMin > 0.0 )
+
+  elif FramePlan == 'Time':
+
+    FrameIndex, FrameWeight = PlanFramesInTime( Time, nFrames )
+
+  else:
+
+    FrameIndex  = np.arange( nSS )
+    FrameWeight = np.zeros( nSS )
+
+  nFramesMovie = FrameIndex.shape[0]
+
+  # Intialize each new frame
+  def InitializeFrame():
+
+    ret = []
+    for iFd in range( nFields ):
+
+        linesN[iFd].set_data([],[])
+        ret.append( linesN[iFd] )
+
+        linesK[iFd].set_data([],[])
+        ret.append( linesK[iFd] )
+
+    time_text.set_text('')
+    ret.append( time_text )
+    ret = ( ret )
+
+    return ret
+
+  # Animation function
+  def UpdateFrame(t):
+
+    print( '\r          Updating frame: {:}/{:}'.format( t+1, nFramesMovie ), \
+           end = '\r' )
+
+    ret = []
+
+    for iFd in range( nFields ):
+
+      linesN[iFd].set_data \
+        ( XN, GetFrame( YN[iFd], FrameIndex, FrameWeight, t ) \
+                / yScale[iFd] )
+      ret.append( linesN[iFd] )
+
+      linesK[iFd].set_data \
+        ( XC, GetFrame( CellAverages[Fields[iFd]], FrameIndex, FrameWeight, \
+                        t ) / yScale[iFd] )
+      ret.append( linesK[iFd] )
+
+    time_text.set_text( r'$t={:.3e}\ \mathrm{{ms}}$'.format \
+                        ( GetFrame( Time, FrameIndex, FrameWeight, t ) ) )
+    ret.append( time_text )
+    ret = ( ret )
+
+    return ret
+
+  print()
+  print( '  Making ', SaveFileAs )
+  SaveMovie( fig, UpdateFrame, InitializeFrame, nFramesMovie, SaveFileAs, \
+             fps = max( 1, int( nFramesMovie / RunTime ) ), dpi = 300, \
+             nWorkers = nWorkers )
+  print()
+
+  plt.close( fig )
+
+  return
+
+# End of MakeMovie
+
+for MovieFields in Movies:
+  MakeMovie( MovieFields )
+
+os.system( 'rm -f *.pyc' )
+os.system( 'rm -rf __pycache__' )
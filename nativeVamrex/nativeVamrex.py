@@ -2,13 +2,15 @@
 
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib import animation
 plt.style.use( '../publication.sty' )
 
 import sys
 sys.path.append( '../' )
 
-from MakeDataFile import MakeDataFile, ReadHeader
+from UtilitiesModuleMovie import SaveMovie
+from UtilitiesModuleComparison import CompareRuns
+from UtilitiesModuleSource import AMReXSource, NativeSource, CompareSources
+from UtilitiesModuleHDF import ReadTimeSeriesHDF
 from setGlobalVariables import *
 
 """
@@ -40,8 +42,35 @@ plotfileBaseName = ID + '.plt'
 # Field to plot
 Field  = 'PF_V1'
 FieldT = 'PF_V1'
-dataT = np.loadtxt( '{:}_native_{:}.dat'.format( rootName, FieldT ) )
-X1_C = np.copy( dataT[0,1:] )
+
+# Format of the native data file written by makeMovie_native.py:
+# 'HDF5' (<rootName>_native_<FieldT>.h5) or 'Text' (legacy .dat); or
+# 'Snapshots' to read the native snapshots NativeSnapshotRange in
+# NativePathToData directly (see NativeSource), without exporting them
+NativeFileFormat = 'HDF5'
+NativePathToData \
+  = HOME + 'Work/Codes/thornado/SandBox/YahilCollapse_XCFC/Output/' \
+      + rootName
+NativeSnapshotRange = [0,1467]
+
+SourceT = None
+
+if NativeFileFormat == 'Text':
+  dataT = np.loadtxt( '{:}_native_{:}.dat'.format( rootName, FieldT ) )
+  X1_C  = np.copy( dataT[0,1:] )
+  timeT = np.copy( dataT[1:,0 ] )
+  dataT = np.copy( dataT[1:,1:] )
+elif NativeFileFormat == 'Snapshots':
+  SourceT \
+    = NativeSource( NativePathToData, \
+                    np.arange( NativeSnapshotRange[0], \
+                               NativeSnapshotRange[1] + 1 ), \
+                    UseCache = True )
+  X1_C = SourceT.GetX1()
+else:
+  X1_C, timeT, dataT, UnitsT \
+    = ReadTimeSeriesHDF( '{:}_native_{:}.h5'.format( rootName, FieldT ), \
+                         FieldT )
 X2_C = [np.pi/2.0]
 X3_C = [np.pi]
 LeafElementLocations = []
@@ -118,59 +147,54 @@ vmax = -np.inf
 
 MovieRunTime = 10.0 # seconds
 
+nWorkers = 1 # Number of processes used to render the frames
+
 #### ====== End of User Input =======
 
 DataDirectory = '.{:s}_movieData'.format( ID )
 MovieName     = 'mov.{:s}_{:s}_nativeVamrex.mp4'.format( ID, Field )
 
-# Append "/" if not present
-if not plotfileDirectory[-1] == '/': plotfileDirectory += '/'
-if not DataDirectory    [-1] == '/': DataDirectory     += '/'
-
-plotfileArray \
-  = MakeDataFile( Field, plotfileDirectory, DataDirectory, \
-                  plotfileBaseName, 'spherical', \
-                  SSi = SSi, SSf = SSf, nSS = nSS, \
-                  forceChoiceD = False, owD = False, \
-                  forceChoiceF = False, owF = False, \
-                  UsePhysicalUnits = True, \
-                  MaxLevel = MaxLevel, Verbose = Verbose, \
-                  LEL = LeafElementLocations )
-if nSS < 0:
-  plotfileArray = np.copy( plotfileArray[::plotEvery] )
-else:
-  plotfileArray = np.copy( plotfileArray[SSi:SSf+1:plotEvery] )
+# Data files are made (once) by MakeDataFile and read through the binary
+# cache, see AMReXSource
 
-nSS = min( plotfileArray.shape[0], dataT[1:,0].shape[0] )
+Source = AMReXSource( plotfileDirectory, plotfileBaseName, DataDirectory, \
+                      SSi = SSi, SSf = SSf, nSS = nSS, plotEvery = plotEvery, \
+                      MaxLevel = MaxLevel, \
+                      LeafElementLocations = LeafElementLocations, \
+                      Verbose = Verbose )
 
-nX = np.shape( X1_C )[0]
+nSS = Source.GetTime().shape[0]
 
-timeT = np.copy( dataT[1:nSS+1:plotEvery,0 ] )
-dataT = np.copy( dataT[1:nSS+1:plotEvery,1:] )
-timeA = np.empty( timeT.shape, np.float64 )
-dataA = np.empty( dataT.shape, np.float64 )
-dataD = np.empty( dataT.shape, np.float64 )
+# Native snapshots are matched to AMReX snapshots by time, not by index
 
 print()
-print( '  Computing relative difference array' )
-for iSS in range( nSS ):
+print( '  Computing differences' )
 
-    FileDirectory = DataDirectory + plotfileArray[iSS] + '/'
+if SourceT is None:
+  Comparison = CompareRuns( Source.GetTime(), Source.GetField( Field ), \
+                            timeT, dataT )
+else:
+  Comparison = CompareSources( Source, SourceT, Field, FieldB = FieldT )
 
-    TimeFile = FileDirectory + '{:}.dat'.format( 'Time' )
-    DataFile = FileDirectory + '{:}.dat'.format( Field )
+if Comparison['Index'].shape[0] < nSS:
+  print( '  Dropped {:} AMReX snapshots outside the native time span' \
+         .format( nSS - Comparison['Index'].shape[0] ) )
 
-    timeA[iSS] = np.loadtxt( TimeFile )
-    dataA[iSS] = np.loadtxt( DataFile ).flatten()
+nSS   = Comparison['Index'].shape[0]
+timeA = Comparison['Time' ]
+dataA = Comparison['DataA']
+dataT = Comparison['DataB']
+dataD = Comparison['Relative']
 
-    for iX1 in range( nX ):
-        print( '\r  iSS: {:}/{:}'.format( iSS, nSS ), end = '\r' )
-        dataD[iSS,iX1] \
-          = max( np.abs( dataA[iSS,iX1] - dataT[iSS,iX1] ) \
-                   / ( 0.5 * np.abs( dataA[iSS,iX1] + dataT[iSS,iX1] ) ), \
-                 1.0e-17 )
-print()
-print(dataD.min(), dataD.max() )
+Norms = Comparison['Norms']['Relative']
+
+print( '  Relative difference: min {:.3e}, max {:.3e}, max L1 {:.3e}' \
+       .format( dataD.min(), dataD.max(), Norms['L1'].max() ) )
+
+np.savetxt( '{:}_{:}_nativeVamrex_norms.dat'.format( ID, Field ), \
+            np.vstack( ( timeA, Norms['L1'], Norms['L2'], Norms['LInf'] ) ).T, \
+            header = 'Time [ms], L1, L2, LInf of the relative difference', \
+            fmt = '%+.16e' )
 
 fig, axs = plt.subplots( 2, 1, figsize = (10,6) )
 fig.suptitle( '{:}'.format( figTitle ), fontsize = 15 )
@@ -203,8 +227,8 @@ def UpdateFrame( t ):
 
     time_textA.set_text( r'$t_{{\mathrm{{amrex}}}}={:.16e}\ \mathrm{{ms}}\ {:d}$' \
                          .format( timeA[t], t ) )
-    time_textT.set_text( r'$t_{{\mathrm{{thrnd}}}}={:.16e}\ \mathrm{{ms}}$' \
-                         .format( timeT[t] ) )
+    time_textT.set_text( r'$u_{\mathrm{thrnd}}\ \mathrm{interpolated\ to}' \
+                         + r'\ t_{\mathrm{amrex}}$' )
 
     lineA.set_data( X1_C, dataA[t] / yScale )
     lineT.set_data( X1_C, dataT[t] / yScale )
@@ -220,11 +244,6 @@ for i in range( 2 ):
     for xx in xRef:
         axs[i].axvline( xx, color = 'b', alpha = 0.3 )
 
-anim = animation.FuncAnimation( fig, UpdateFrame, \
-                                init_func = InitializeFrame, \
-                                frames = nSS, \
-                                blit = True )
-
 if not UseCustomLimits:
   yMin = min( dataA.min(), dataT.min() ) / yScale
   yMax = max( dataA.max(), dataT.max() ) / yScale
@@ -247,7 +266,8 @@ fps = max( 1, nSS / MovieRunTime )
 
 print( '\n  Making movie' )
 print( '  ------------' )
-anim.save( MovieName, fps = fps, dpi = 300 )
+SaveMovie( fig, UpdateFrame, InitializeFrame, nSS, MovieName, \
+           fps = fps, dpi = 300, nWorkers = nWorkers )
 print()
 
 import os
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import types
+from collections import Counter
+
+import numpy as np
+
+"""
+
+AMReXSource with X1Window must cut each field on the cells of a current X1
+cache, packing it when the cache directory is fresh and repacking it when
+the X1 text files change. MakeDataFile (which needs yt) is replaced by a
+stand-in that writes the text files of a plotfile as MakeDataFile does:
+one value per line, no header.
+
+"""
+
+RootDirectory = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+plotFileBaseName = 'YahilCollapse_XCFC.plt'
+
+nSS = 3
+
+def GetPlotFiles():
+
+    return np.array( [ plotFileBaseName + '{:08d}'.format( i ) \
+                       for i in range( nSS ) ] )
+
+# End of GetPlotFiles
+
+def Value( Field, iSS, X1 ):
+
+    return ( len( Field ) + 10.0 * iSS ) * X1
+
+# End of Value
+
+def WriteTextFiles( DataDirectory, X1 ):
+
+    # X1, Time and PF_D of every plotfile, for cell centers X1
+
+    for iSS, plotFile in enumerate( GetPlotFiles() ):
+
+        Directory = os.path.join( DataDirectory, plotFile )
+        os.makedirs( Directory, exist_ok = True )
+
+        np.savetxt( os.path.join( Directory, 'X1.dat' ), X1 )
+        np.savetxt( os.path.join( Directory, 'Time.dat' ), [ float( iSS ) ] )
+        np.savetxt( os.path.join( Directory, 'PF_D.dat' ), \
+                    Value( 'PF_D', iSS, X1 ) )
+
+# End of WriteTextFiles
+
+def ImportSource( monkeypatch, X1 ):
+
+    Calls = Counter()
+
+    def MakeDataFile( Field, plotFileDirectory, DataDirectory, \
+                      plotFileBaseName, CoordinateSystem, **kwargs ):
+
+        # Existing text files are kept, as with owF = False
+
+        Calls[Field] += 1
+
+        if not os.path.isfile( os.path.join( DataDirectory, \
+                                             GetPlotFiles()[0], 'X1.dat' ) ):
+            WriteTextFiles( DataDirectory, X1 )
+
+        return GetPlotFiles()
+
+    monkeypatch.setitem( sys.modules, 'MakeDataFile', \
+                         types.SimpleNamespace( MakeDataFile = MakeDataFile, \
+                                                ReadHeader = None ) )
+
+    monkeypatch.syspath_prepend( RootDirectory )
+
+    for Module in [ 'MakeBinaryDataFile', 'UtilitiesModuleSource' ]:
+        monkeypatch.delitem( sys.modules, Module, raising = False )
+
+    import UtilitiesModuleSource
+
+    return UtilitiesModuleSource, Calls
+
+# End of ImportSource
+
+def test_windowed_read_on_fresh_cache( monkeypatch, tmp_path ):
+
+    nX = 10
+    X1 = ( np.arange( nX ) + 0.5 ) / nX
+
+    Module, Calls = ImportSource( monkeypatch, X1 )
+
+    DataDirectory = str( tmp_path / 'data' )
+
+    Source = Module.AMReXSource( '/plotfiles/', plotFileBaseName, \
+                                 DataDirectory, X1Window = [ 0.3, 0.6 ] )
+
+    Data = Source.GetField( 'PF_D' )
+
+    # Cells 2 to 6 cover [ 0.3, 0.6 ] (see GetWindowSlice)
+
+    Window = X1[2:7]
+
+    assert os.path.isfile( os.path.join( DataDirectory, 'X1.npy' ) )
+    assert Calls['PF_D'] == 1
+
+    assert Data.shape == ( nSS, Window.shape[0] )
+    for iSS in range( nSS ):
+        assert np.allclose( Data[iSS], Value( 'PF_D', iSS, Window ) )
+
+    assert np.allclose( Source.GetX1(), Window )
+    assert np.allclose( Source.GetTime(), np.arange( nSS ) )
+
+# End of test_windowed_read_on_fresh_cache
+
+def test_windowed_read_follows_new_grid( monkeypatch, tmp_path ):
+
+    nX = 10
+    X1 = ( np.arange( nX ) + 0.5 ) / nX
+
+    Module, Calls = ImportSource( monkeypatch, X1 )
+
+    DataDirectory = str( tmp_path / 'data' )
+
+    Module.AMReXSource( '/plotfiles/', plotFileBaseName, DataDirectory, \
+                        X1Window = [ 0.3, 0.6 ] ).GetField( 'PF_D' )
+
+    # The run is extracted again on a finer grid
+
+    nX = 20
+    X1 = ( np.arange( nX ) + 0.5 ) / nX
+
+    WriteTextFiles( DataDirectory, X1 )
+
+    Data = Module.AMReXSource( '/plotfiles/', plotFileBaseName, \
+                               DataDirectory, X1Window = [ 0.3, 0.6 ] ) \
+             .GetField( 'PF_D' )
+
+    # Cells 5 to 12 cover [ 0.3, 0.6 ]
+
+    Window = X1[5:13]
+
+    assert Data.shape == ( nSS, Window.shape[0] )
+    for iSS in range( nSS ):
+        assert np.allclose( Data[iSS], Value( 'PF_D', iSS, Window ) )
+
+# End of test_windowed_read_follows_new_grid
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import types
+import weakref
+import importlib.util
+from collections import Counter
+
+import numpy as np
+import matplotlib
+matplotlib.use( 'Agg' )
+import matplotlib.pyplot as plt
+
+"""
+
+MultiPanel.GetFields must parse each plotfile once, however many fields
+are requested, and return exactly what thornado's GetData returns for
+each field. yt (with its cache of loaded datasets), thornado's
+UtilitiesModule.GetData (which loads the plotfile itself and converts
+the field), MakeDataFile and publication.sty are replaced by stand-ins,
+so the test runs without them.
+
+"""
+
+RootDirectory = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+nX = 8
+
+class FakeDataset:
+
+    # A plotfile; Parses counts how often one is parsed
+
+    Parses = Counter()
+
+    def __init__( self, Path ):
+
+        self.Path = Path
+
+        FakeDataset.Parses[os.path.basename( Path )] += 1
+
+        self.index = None
+
+# End of FakeDataset
+
+def MakeFakeYt():
+
+    # yt.load returns the dataset already loaded from the same path while
+    # it is referenced, as yt's own cache of datasets does
+
+    Cache = weakref.WeakValueDictionary()
+
+    def load( Path ):
+
+        Key = os.path.abspath( Path )
+
+        if not Key in Cache:
+            ds = FakeDataset( Path )
+            Cache[Key] = ds
+
+        return Cache[Key]
+
+    return types.SimpleNamespace( load = load )
+
+# End of MakeFakeYt
+
+def Value( Field, Time, i ):
+
+    # GetData's value of Field, after its conversion to physical units
+
+    return ( len( Field ) + 10.0 * Time ) * ( 1.0 + i )
+
+# End of Value
+
+def Unit( Field ):
+
+    return { 'PF_D' : 'g/cm**3', 'PF_V1' : 'km/s' }.get( Field, '' )
+
+# End of Unit
+
+def MakeFakeGetData( plotFiles, Calls ):
+
+    def GetData( plotFileDirectory, plotFileBaseName, Field, \
+                 CoordinateSystem, UsePhysicalUnits, argv = [ 'a' ], \
+                 MaxLevel = -1, ReturnTime = False, ReturnMesh = False, \
+                 Verbose = True ):
+
+        # Loads the plotfile itself, as thornado's GetData does
+
+        ds = sys.modules['yt'].load( plotFileDirectory + argv[1] )
+
+        Calls[( argv[1], Field )] += 1
+
+        Time = float( list( plotFiles ).index( argv[1] ) )
+
+        dr = 1.0 / nX
+        r  = ( np.arange( nX ) + 0.5 ) * dr
+
+        Data = Value( Field, Time, np.arange( nX ) ).reshape( nX, 1, 1 )
+
+        return Data, Unit( Field ), \
+               r.reshape( nX, 1, 1 ), None, None, \
+               np.full( (nX,1,1), dr ), None, None, \
+               np.array( [ 0.0, 0.0, 0.0 ] ), \
+               np.array( [ 1.0, np.pi, 2.0 * np.pi ] ), \
+               [ nX, 1, 1 ], Time
+
+    return GetData
+
+# End of MakeFakeGetData
+
+def ImportMultiPanel( monkeypatch, plotFiles ):
+
+    FakeDataset.Parses = Counter()
+
+    Calls = Counter()
+
+    monkeypatch.setitem( sys.modules, 'yt', MakeFakeYt() )
+    monkeypatch.setitem( sys.modules, 'UtilitiesModule', \
+                         types.SimpleNamespace \
+                           ( GetFileArray = lambda d, b : plotFiles, \
+                             GetData = MakeFakeGetData( plotFiles, Calls ) ) )
+    monkeypatch.setitem( sys.modules, 'MakeDataFile', \
+                         types.SimpleNamespace( MakeDataFile = None, \
+                                                ReadHeader = None ) )
+
+    monkeypatch.setattr( plt.style, 'use', lambda Style : None )
+
+    monkeypatch.syspath_prepend( RootDirectory )
+
+    Spec = importlib.util.spec_from_file_location \
+             ( 'plotMultiPanel', \
+               os.path.join( RootDirectory, 'amrex', 'plotMultiPanel.py' ) )
+    Module = importlib.util.module_from_spec( Spec )
+    Spec.loader.exec_module( Module )
+
+    return Module, Calls
+
+# End of ImportMultiPanel
+
+def test_GetFields_parses_each_plotfile_once( monkeypatch ):
+
+    plotFiles = np.array( [ 'YahilCollapse_XCFC.plt{:08d}'.format( i ) \
+                            for i in range( 4 ) ] )
+
+    Module, Calls = ImportMultiPanel( monkeypatch, plotFiles )
+
+    snapShots = np.array( [ 1, 3 ], np.int64 )
+    Fields    = [ 'PF_D', 'GF_Beta_1', 'PF_V1', 'AF_P', 'GF_Psi', 'GF_Alpha' ]
+
+    MP = Module.MultiPanel( '/data/', snapShots = snapShots )
+
+    Data, Units, X1, dX1, xl, xh, Time = MP.GetFields( Fields )
+
+    assert FakeDataset.Parses == Counter( { str( plotFiles[iSS] ) : 1 \
+                                            for iSS in snapShots } )
+
+    # Every field still goes through GetData, once per snapshot
+
+    assert Calls == Counter( { ( str( plotFiles[iSS] ), Field ) : 1 \
+                               for iSS in snapShots for Field in Fields } )
+
+    assert np.array_equal( Time, [ 1.0, 3.0 ] )
+
+    for iSS in range( snapShots.shape[0] ):
+
+        assert np.allclose( X1 [iSS], ( np.arange( nX ) + 0.5 ) / nX )
+        assert np.allclose( dX1[iSS], 1.0 / nX )
+
+        for Field in Fields:
+            assert np.array_equal( Data[Field][iSS], \
+                                   Value( Field, Time[iSS], np.arange( nX ) ) )
+
+    for Field in Fields:
+        assert Units[Field] == Unit( Field )
+
+# End of test_GetFields_parses_each_plotfile_once
+
+def test_GetData_is_one_parse_per_plotfile( monkeypatch ):
+
+    plotFiles = np.array( [ 'YahilCollapse_XCFC.plt{:08d}'.format( i ) \
+                            for i in range( 3 ) ] )
+
+    Module, Calls = ImportMultiPanel( monkeypatch, plotFiles )
+
+    MP = Module.MultiPanel( '/data/', snapShots = np.array( [ 0, 2 ] ) )
+
+    Data, DataUnit, X1, dX1, xl, xh, Time = MP.GetData( 'PF_V1' )
+
+    assert sum( FakeDataset.Parses.values() ) == 2
+    assert DataUnit == 'km/s'
+    assert Time == 2.0
+
+# End of test_GetData_is_one_parse_per_plotfile